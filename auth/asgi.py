@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auth.settings')
+# Serve catalogue reads from the async-native views (see auth/urls_async.py)
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'auth.urls_async')
+# Each ASGI request runs its queries on a fresh thread, so persistent
+# connections would pile up; use DATABASE_POOL instead
+os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 # BASE_DIR = Path(__file__).resolve().parent.parent
@@ -54,10 +56,12 @@ INSTALLED_APPS = [
     'corsheaders',
     'users',
     'hotels',
-    'restaurants'
+    'restaurants',
+    'core',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,19 +72,50 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-endpoint request metrics (core.metrics); each worker flushes its
+# histograms to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds
+METRICS_ENABLED = True
+METRICS_FLUSH_INTERVAL = 30
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 
 ]
+# Browsers may send Idempotency-Key on bookings/reservations and read whether
+# the response was replayed (core.idempotency)
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 
-ROOT_URLCONF = 'auth.urls'
+# auth/asgi.py switches to auth.urls_async, which serves catalogue reads
+# from async-native views
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'auth.urls')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # Keyset (cursor) pagination for every list endpoint; ?page_size= overrides
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # Sliding-window limits for the auth views (users.throttling), per client IP
+    # and per submitted email
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_email': '10/min',
+        'register_ip': '10/hour',
+        'register_email': '5/hour',
+        'otp_send_ip': '20/hour',
+        'otp_send_email': '5/hour',
+        'otp_verify_ip': '30/hour',
+        'otp_verify_email': '10/hour',
+    },
 }
 
+# Where throttle counters live: users.throttling.CacheCounterStore (in the
+# THROTTLE_CACHE_ALIAS cache) or users.throttling.DatabaseCounterStore
+THROTTLE_STORE = 'users.throttling.CacheCounterStore'
+THROTTLE_CACHE_ALIAS = 'default'
+
 AUTHENTICATION_BACKENDS = [
     'users.authentication.EmailBackend',  # custom backend
     'django.contrib.auth.backends.ModelBackend',  # fallback
@@ -91,6 +126,12 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# Views using users.authentication.StatelessJWTAuthentication read the user
+# from token claims; the full User row, when needed, comes from a per-process
+# cache of USER_CACHE_SIZE entries kept for USER_CACHE_TTL seconds
+USER_CACHE_TTL = 30
+USER_CACHE_SIZE = 1024
+
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -98,6 +139,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+METRICS_DIR = BASE_DIR / 'var' / 'metrics'
+
 
 TEMPLATES = [
     {
@@ -117,15 +160,148 @@ TEMPLATES = [
 WSGI_APPLICATION = 'auth.wsgi.application'
 
 
+# Cache
+# Catalogue responses and their version counters (core.cache) live here; use a
+# shared backend (Redis/Memcached/file) when running several worker processes
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'servnex-default',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+CATALOGUE_CACHE_ALIAS = 'default'
+CATALOGUE_CACHE_TIMEOUT = 300
+
+# Password-reset OTPs (users.otp) live in their table only, trimmed by
+# `manage.py purge_otps`
+OTP_TTL_SECONDS = 600
+
+# First responses to POSTs carrying an Idempotency-Key (core.idempotency) are
+# kept in the IdempotencyKey table and replayed to retries for this long;
+# `manage.py purge_idempotency_keys` deletes older ones
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+
+
+# Structured logging (core.logs): app loggers write one JSON line per event to
+# stderr from a background thread; high-volume events are sampled and
+# passwords/OTPs/tokens are redacted
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'core.logs.JSONFormatter'},
+    },
+    'filters': {
+        'sample': {
+            '()': 'core.logs.SamplingFilter',
+            'rates': {'auth.login.succeeded': 0.1},
+        },
+    },
+    'handlers': {
+        'json': {
+            'class': 'core.logs.QueueingHandler',
+            'formatter': 'json',
+            'filters': ['sample'],
+        },
+    },
+    'loggers': {
+        app: {'handlers': ['json'], 'level': 'INFO', 'propagate': False}
+        for app in ('core', 'users', 'hotels', 'restaurants')
+    },
+}
+
+# Tests capture events with assertLogs instead of printing them
+TEST_RUNNER = 'core.testing.QuietLogsTestRunner'
+
+
+# Background jobs (core.jobs), run by `manage.py run_jobs --workers N`.
+# Failed jobs retry after JOBS_BACKOFF_SECONDS * 2**(attempt-1), capped at
+# JOBS_BACKOFF_MAX, and land in the DeadJob table after JOBS_MAX_ATTEMPTS.
+JOBS_MAX_ATTEMPTS = 5
+JOBS_BACKOFF_SECONDS = 10
+JOBS_BACKOFF_MAX = 3600
+# A running job whose worker hasn't finished it within this many seconds is retried
+JOBS_LEASE_SECONDS = 300
+JOBS_POLL_INTERVAL = 1.0
+
+
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Configured from the environment:
+#   DATABASE_ENGINE        django.db.backends.sqlite3 (default) or e.g. .postgresql
+#   DATABASE_NAME          file path for SQLite, database name otherwise
+#   DATABASE_USER / _PASSWORD / _HOST / _PORT
+#   DATABASE_CONN_MAX_AGE  seconds to keep connections open (default 60)
+#   DATABASE_POOL          "1" to use psycopg's connection pool (PostgreSQL)
+#   DATABASE_REPLICAS      comma-separated replica SQLite files, or replica
+#                          hosts for other engines; catalogue list views read
+#                          from them (core.routers)
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'django.db.backends.sqlite3')
+SQLITE = DATABASE_ENGINE.endswith('sqlite3')
+
+
+def database(name, host=''):
+    config = {
+        'ENGINE': DATABASE_ENGINE,
+        'NAME': name,
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
+    if SQLITE:
+        config['OPTIONS'] = {
+            # Writers take the lock at BEGIN, so booking admission never
+            # has to upgrade a read lock mid-transaction
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            # WAL lets readers run alongside the writer; NORMAL sync is safe under WAL
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA mmap_size=134217728;'
+            ),
+        }
+    else:
+        config.update({
+            'USER': os.environ.get('DATABASE_USER', ''),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': host or os.environ.get('DATABASE_HOST', ''),
+            'PORT': os.environ.get('DATABASE_PORT', ''),
+        })
+        if os.environ.get('DATABASE_POOL') == '1':
+            # The pool replaces persistent connections
+            config['CONN_MAX_AGE'] = 0
+            config['OPTIONS'] = {'pool': True}
+    return config
+
+
+DATABASES = {
+    'default': database(os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3')),
 }
+if SQLITE:
+    # File-backed test database: the in-memory one uses shared-cache table
+    # locks, which don't behave like the real file under concurrent writers
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+
+DATABASE_REPLICA_ALIASES = []
+for index, replica in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    if SQLITE:
+        DATABASES[alias] = database(replica.strip())
+    else:
+        DATABASES[alias] = database(DATABASES['default']['NAME'], host=replica.strip())
+    # Tests read replicas through the primary's test database
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICA_ALIASES.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
 
 
 # Password validation
@@ -167,4 +343,6 @@ STATIC_URL = 'static/'
 
 # costom user model 
 
-AUTH_USER_MODEL="users.User"
\ No newline at end of file
+AUTH_USER_MODEL="users.User"
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
@@ -24,6 +24,7 @@ urlpatterns = [
     path('',include('users.urls')),
     path('api/',include('hotels.urls')),
     path('api/',include('restaurants.urls')),
+    path('api/',include('core.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,16 @@
+"""
+URLconf for ASGI deployments, selected by auth/asgi.py.
+
+Catalogue reads are served by async-native views (core.async_views).
+Every other route, and every write on those paths, is the same as in
+auth/urls.py.
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/', include('hotels.async_urls')),
+    path('api/', include('restaurants.async_urls')),
+    *sync_urlpatterns,
+]
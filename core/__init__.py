@@ -0,0 +1 @@
+# Shared API plumbing used by the hotels, restaurants and users apps
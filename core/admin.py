@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from . import jobs
+from .models import DeadJob, Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by']
+    list_filter = ['status', 'task']
+    readonly_fields = ['attempts', 'locked_by', 'locked_at', 'last_error', 'created_at']
+
+
+@admin.register(DeadJob)
+class DeadJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'attempts', 'created_at', 'failed_at']
+    list_filter = ['task']
+    readonly_fields = ['task', 'payload', 'attempts', 'last_error', 'created_at', 'failed_at']
+    actions = ['requeue']
+
+    @admin.action(description="Requeue selected jobs")
+    def requeue(self, request, queryset):
+        count = jobs.requeue(queryset)
+        self.message_user(request, f"Requeued {count} jobs.")
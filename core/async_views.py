@@ -0,0 +1,115 @@
+"""
+Async-native read views for ASGI deployments.
+
+Under ASGI a sync DRF view is run in a thread pool, so every request hops
+off the event loop and back. Views built on AsyncAPIView run on the event
+loop and leave it only for database work, which goes through Django's async
+ORM (``aget``, ``aaggregate``). Lookups that don't depend on each other are
+awaited together with asyncio.gather, so neither waits for the other to be
+issued. Django still runs the queries of one request on that request's
+connection, one at a time.
+
+The views reuse the DRF pieces that don't touch the database: filter
+backends, serializers and the JSON renderer. That way they return the same
+payload as the sync view on the same path. Paging goes through the
+configured pagination class, which has no async API, in a single
+sync_to_async call.
+
+Only reads are async. Any other method on the same path is handed to
+``fallback``, the existing DRF view, which authenticates and runs exactly
+as under WSGI. The reads themselves are public, but a request that sends
+credentials has them checked first, as the sync views do: a bad or expired
+token gets 401 rather than a (possibly cached) 200.
+
+auth/urls_async.py routes the catalogue paths to these views, and
+auth/asgi.py selects that URLconf. WSGI deployments keep auth/urls.py.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from users.authentication import StatelessJWTAuthentication
+
+from .cache import aget_versions, cached_response, get_cache, response_entry, response_key, stored_response
+
+
+class AsyncAPIView(View):
+    """
+    Base for async read endpoints.
+
+    Subclasses implement ``async def get`` and return ``self.render(data)``.
+    ``fallback`` (an ``as_view()`` keyword) serves every other method.
+    ``cache_models`` opts GETs into the catalogue response cache, like
+    CatalogueCacheMixin.
+    """
+    fallback = None
+    authentication_classes = [StatelessJWTAuthentication]
+    cache_models = ()
+    filter_backends = ()
+    renderer = JSONRenderer()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Like DRF views: writes are delegated to views that authenticate with JWTs, not cookies
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and self.fallback is not None:
+            return await sync_to_async(self.fallback)(request, *args, **kwargs)
+
+        cache_key = None
+        try:
+            if 'HTTP_AUTHORIZATION' in request.META:
+                self.authenticate(request)
+            elif self.cache_models and request.method == 'GET':
+                view_name = request.resolver_match.view_name if request.resolver_match else type(self).__name__
+                cache_key = response_key(request, view_name, await aget_versions(self.cache_models))
+                entry = await get_cache().aget(cache_key)
+                if entry is not None:
+                    return cached_response(request, entry)
+
+            response = await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            response = self.render({'detail': NotFound(*exc.args).detail}, status=404)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            response = self.render(detail, status=exc.status_code)
+            if isinstance(exc, (AuthenticationFailed, NotAuthenticated)):
+                response['WWW-Authenticate'] = self.authentication_classes[0]().authenticate_header(request)
+
+        if cache_key is None or response.status_code != 200:
+            return response
+        entry = response_entry(response)
+        await get_cache().aset(cache_key, entry, timeout=getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 300))
+        return stored_response(request, response, entry)
+
+    def authenticate(self, request):
+        """
+        Check the request's credentials as DRF would, raising AuthenticationFailed
+        for a bad or expired token. The authenticators only read the token's
+        claims, so this stays on the event loop.
+        """
+        drf_request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        return drf_request.user
+
+    def render(self, data, status=200):
+        return HttpResponse(self.renderer.render(data), status=status, content_type='application/json')
+
+    def filter_queryset(self, request, queryset):
+        drf_request = Request(request)
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(drf_request, queryset, self)
+        return queryset
+
+    async def paginate(self, request, queryset):
+        """One page of ``queryset`` and its paginator, paged as the sync list views are."""
+        paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, Request(request), view=self)
+        return page, paginator
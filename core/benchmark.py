@@ -0,0 +1,388 @@
+"""
+Load-test harness for the API.
+
+``seed()`` fills the (throwaway) database with synthetic hotels, rooms,
+bookings, restaurants and reservations; ``replay()`` fires a weighted mix of
+requests, described one per line in a JSON-lines file, through Django's test
+client so every middleware, serializer and query runs in-process
+(``replay_concurrent()`` keeps many requests in flight, through the WSGI or
+the ASGI handler); the stats helpers turn the timings into throughput and
+p50/p95/p99 per endpoint and compare them against a stored baseline.
+
+Driven by the ``benchmark`` and ``benchmark_async`` management commands.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as clock, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import search
+from hotels import amenities, inventory
+from hotels import dashboard as hotel_dashboard
+from hotels.models import HotelDataModel, Room, Booking
+from restaurants import capacity
+from restaurants import dashboard as restaurant_dashboard
+from restaurants.models import RestaurantDataModel, TableReservation
+
+User = get_user_model()
+
+BENCHMARK_PASSWORD = 'benchmark-pass'
+
+CITIES = {
+    'Kochi': ['Fort Kochi', 'Kakkanad', 'Edappally', 'Marine Drive'],
+    'Bengaluru': ['Indiranagar', 'Koramangala', 'Whitefield', 'Jayanagar'],
+    'Mumbai': ['Bandra', 'Andheri', 'Colaba', 'Powai'],
+    'Delhi': ['Connaught Place', 'Saket', 'Karol Bagh', 'Dwarka'],
+    'Chennai': ['T Nagar', 'Adyar', 'Velachery', 'Mylapore'],
+}
+HOTEL_BADGES = [choice for choice, _ in HotelDataModel.BADGE_CHOICES]
+RESTAURANT_BADGES = [choice for choice, _ in RestaurantDataModel.BADGE_CHOICES]
+PRICE_RANGES = [choice for choice, _ in RestaurantDataModel.PRICE_RANGE_CHOICES]
+CUISINES = ['Indian', 'Chinese', 'Italian', 'Mexican', 'Kerala', 'Continental', 'Thai']
+AMENITIES = ['WiFi', 'Pool', 'Parking', 'Breakfast', 'Gym', 'Spa', 'AC', 'Room Service', 'Bar']
+ROOM_TYPES = [('Standard', 2, 0), ('Deluxe', 2, 1), ('Family Suite', 4, 2), ('Dormitory Bed', 1, 0)]
+
+DEFAULT_SIZES = {
+    'users': 200,
+    'hotels': 2000,
+    'rooms_per_hotel': 3,
+    'bookings': 20000,
+    'restaurants': 2000,
+    'reservations': 20000,
+}
+
+
+def _pick_location(rng):
+    city = rng.choice(list(CITIES))
+    return city, rng.choice(CITIES[city])
+
+
+def seed(sizes=None, rng=None, batch_size=2000, log=None):
+    """
+    Bulk-create a synthetic dataset and rebuild the derived capacity tables.
+
+    Rows are inserted with bulk_create (no per-row signals), so the night
+    inventory, amenity links, table slot occupancy and search index are
+    rebuilt once at the end.
+    """
+    sizes = {**DEFAULT_SIZES, **(sizes or {})}
+    rng = rng or random.Random(0)
+    log = log or (lambda message: None)
+    today = date.today()
+
+    password = make_password(BENCHMARK_PASSWORD)
+    User.objects.bulk_create(
+        [
+            User(email=f'bench{i}@example.com', first_name=f'Bench {i}', password=password,
+                 role='Hotel' if i % 10 == 0 else 'User')
+            for i in range(sizes['users'])
+        ],
+        batch_size=batch_size,
+    )
+    user_ids = list(User.objects.filter(email__startswith='bench').values_list('id', flat=True))
+    owner_ids = user_ids[::10] or user_ids
+    log(f"users: {len(user_ids)}")
+
+    hotels = []
+    for i in range(sizes['hotels']):
+        city, area = _pick_location(rng)
+        price = Decimal(rng.randrange(800, 25000, 50))
+        hotels.append(HotelDataModel(
+            owner_id=rng.choice(owner_ids), name=f'Hotel {i}', city=city, area=area,
+            badge=rng.choice(HOTEL_BADGES), price=price, old_price=price * Decimal('1.2'),
+            total_rooms=rng.randint(5, 60),
+            description=f'Benchmark hotel {i} in {area}, {city}.',
+            amenities=', '.join(rng.sample(AMENITIES, rng.randint(2, 6))),
+            image='hotels/taj_hotel.jpg', room_image1='hotels/rooms/room1.avif',
+        ))
+    HotelDataModel.objects.bulk_create(hotels, batch_size=batch_size)
+    hotel_rows = list(HotelDataModel.objects.values_list('id', 'price'))
+    log(f"hotels: {len(hotel_rows)}")
+
+    rooms = []
+    for hotel_id, price in hotel_rows:
+        for room_type, adults, children in rng.sample(ROOM_TYPES, min(sizes['rooms_per_hotel'], len(ROOM_TYPES))):
+            rooms.append(Room(
+                hotel_id=hotel_id, room_type=room_type, price=price * Decimal(adults) / 2,
+                adults=adults, children=children, total_rooms=rng.randint(2, 20),
+                amenities=', '.join(rng.sample(AMENITIES, 3)),
+            ))
+    Room.objects.bulk_create(rooms, batch_size=batch_size)
+    log(f"rooms: {len(rooms)}")
+    room_ids = {}
+    for room_id, hotel_id in Room.objects.values_list('id', 'hotel_id'):
+        room_ids.setdefault(hotel_id, []).append(room_id)
+
+    bookings = []
+    for _ in range(sizes['bookings']):
+        check_in = today + timedelta(days=rng.randint(-60, 180))
+        guests = rng.randint(1, 4)
+        hotel_id = rng.choice(hotel_rows)[0]
+        # Half the bookings name a room type, when the hotel has any
+        room_id = rng.choice(room_ids[hotel_id]) if hotel_id in room_ids and rng.random() < 0.5 else None
+        bookings.append(Booking(
+            user_id=rng.choice(user_ids), hotel_id=hotel_id, room_id=room_id,
+            check_in=check_in, check_out=check_in + timedelta(days=rng.randint(1, 5)),
+            status=rng.choices(['confirmed', 'cancelled', 'completed'], [85, 10, 5])[0],
+            number_of_guests=guests, rooms_booked=(guests + 1) // 2,
+        ))
+    Booking.objects.bulk_create(bookings, batch_size=batch_size)
+    log(f"bookings: {len(bookings)}")
+
+    restaurants = []
+    for i in range(sizes['restaurants']):
+        city, area = _pick_location(rng)
+        restaurants.append(RestaurantDataModel(
+            owner_id=rng.choice(owner_ids), name=f'Restaurant {i}', city=city, area=area,
+            badge=rng.choice(RESTAURANT_BADGES), cuisine_type=rng.choice(CUISINES),
+            price_range=rng.choice(PRICE_RANGES),
+            average_cost_for_two=Decimal(rng.randrange(300, 6000, 50)),
+            total_tables=rng.randint(5, 40), rating=Decimal(rng.randint(25, 50)) / 10,
+            description=f'Benchmark restaurant {i} in {area}, {city}.',
+            image='restaurants/restaurant_inside-1.jpg',
+        ))
+    RestaurantDataModel.objects.bulk_create(restaurants, batch_size=batch_size)
+    restaurant_ids = list(RestaurantDataModel.objects.values_list('id', flat=True))
+    log(f"restaurants: {len(restaurant_ids)}")
+
+    reservations = []
+    for _ in range(sizes['reservations']):
+        guests = rng.randint(1, 8)
+        reservations.append(TableReservation(
+            user_id=rng.choice(user_ids), restaurant_id=rng.choice(restaurant_ids),
+            reservation_date=today + timedelta(days=rng.randint(-30, 60)),
+            reservation_time=clock(rng.randint(11, 22), rng.choice([0, 15, 30, 45])),
+            number_of_guests=guests, tables_reserved=(guests + 3) // 4,
+            status=rng.choices(['confirmed', 'cancelled', 'completed'], [85, 10, 5])[0],
+        ))
+    TableReservation.objects.bulk_create(reservations, batch_size=batch_size)
+    log(f"reservations: {len(reservations)}")
+
+    log(f"night inventory rows: {inventory.rebuild()}")
+    log(f"amenity links: {amenities.rebuild()}")
+    log(f"table slot rows: {capacity.rebuild()}")
+    log(f"dashboard stats rows: {hotel_dashboard.rebuild() + restaurant_dashboard.rebuild()}")
+    log(f"search index rows: {search.rebuild()}")
+    return sizes
+
+
+def load_mix(path):
+    """Read request specs (one JSON object per line, '#' lines ignored)."""
+    specs = []
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                specs.append(json.loads(line))
+    return specs
+
+
+class _Fixtures:
+    """Random ids and dates substituted into request templates."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.hotel_ids = list(HotelDataModel.objects.values_list('id', flat=True))
+        self.restaurant_ids = list(RestaurantDataModel.objects.values_list('id', flat=True))
+        self.cities = list(CITIES)
+        self.users = list(User.objects.filter(email__startswith='bench')[:50])
+        self.tokens = {user.id: str(RefreshToken.for_user(user).access_token) for user in self.users}
+
+    def values(self):
+        rng = self.rng
+        check_in = date.today() + timedelta(days=rng.randint(1, 120))
+        city = rng.choice(self.cities)
+        user = rng.choice(self.users)
+        return {
+            'hotel_id': rng.choice(self.hotel_ids),
+            'restaurant_id': rng.choice(self.restaurant_ids),
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=rng.randint(1, 4))).isoformat(),
+            'date': check_in.isoformat(),
+            'time': f'{rng.randint(12, 21)}:{rng.choice(["00", "30"])}',
+            'guests': rng.randint(1, 4),
+            'city': city,
+            'area': rng.choice(CITIES[city]),
+            'email': user.email,
+            'password': BENCHMARK_PASSWORD,
+            '_user': user,
+        }
+
+
+def _fill(template, values):
+    if isinstance(template, str):
+        return template.format(**values)
+    if isinstance(template, dict):
+        return {key: _fill(value, values) for key, value in template.items()}
+    if isinstance(template, list):
+        return [_fill(value, values) for value in template]
+    return template
+
+
+def _request(spec, values, tokens):
+    """The method, path, body and extra headers for one request built from ``spec``."""
+    path = _fill(spec['path'], values)
+    headers = {}
+    if spec.get('auth'):
+        headers['HTTP_AUTHORIZATION'] = f"Bearer {tokens[values['_user'].id]}"
+    method = spec.get('method', 'GET').upper()
+    body = json.dumps(_fill(spec.get('body', {}), values)) if method != 'GET' else None
+    return method, path, body, headers
+
+
+def _send(client, method, path, body, headers):
+    """Send through a test Client or AsyncClient; the latter returns an awaitable."""
+    if method == 'GET':
+        return client.get(path, **headers)
+    return client.generic(method, path, body, content_type='application/json', **headers)
+
+
+def replay(specs, total_requests, rng=None, warmup=50, client=None):
+    """
+    Send ``total_requests`` requests picked from ``specs`` by weight.
+
+    Returns ``(timings, elapsed)`` where ``timings`` maps each spec name to a
+    list of ``(milliseconds, status_code)`` and ``elapsed`` is the wall time
+    of the measured part in seconds.
+    """
+    rng = rng or random.Random(1)
+    client = client or Client()
+    fixtures = _Fixtures(rng)
+    weights = [spec.get('weight', 1) for spec in specs]
+
+    def send(spec):
+        return _send(client, *_request(spec, fixtures.values(), fixtures.tokens))
+
+    for _ in range(warmup):
+        send(rng.choices(specs, weights)[0])
+
+    timings = {spec['name']: [] for spec in specs}
+    started = time.perf_counter()
+    for _ in range(total_requests):
+        spec = rng.choices(specs, weights)[0]
+        start = time.perf_counter()
+        response = send(spec)
+        timings[spec['name']].append(((time.perf_counter() - start) * 1000, response.status_code))
+    return timings, time.perf_counter() - started
+
+
+def replay_concurrent(specs, total_requests, concurrency, asgi=False, rng=None, warmup=50):
+    """
+    Like replay(), with ``concurrency`` requests in flight at once.
+
+    Requests go through the WSGI handler with one thread per request in
+    flight. With ``asgi`` they go through the ASGI handler on one event loop
+    instead, using the URLconf auth/asgi.py selects. The same ``rng`` seed
+    produces the same requests in the same order in both modes.
+    """
+    rng = rng or random.Random(1)
+    fixtures = _Fixtures(rng)
+    weights = [spec.get('weight', 1) for spec in specs]
+    plan = [
+        (spec['name'], _request(spec, fixtures.values(), fixtures.tokens))
+        for spec in rng.choices(specs, weights, k=warmup + total_requests)
+    ]
+    warm, measured = plan[:warmup], plan[warmup:]
+    timings = {spec['name']: [] for spec in specs}
+
+    if asgi:
+        async def run(batch, record):
+            client = AsyncClient()
+            slots = asyncio.Semaphore(concurrency)
+
+            async def send(name, request):
+                async with slots:
+                    start = time.perf_counter()
+                    response = await _send(client, *request)
+                    if record:
+                        timings[name].append(((time.perf_counter() - start) * 1000, response.status_code))
+
+            await asyncio.gather(*(send(name, request) for name, request in batch))
+
+        with override_settings(ROOT_URLCONF='auth.urls_async'):
+            asyncio.run(run(warm, record=False))
+            started = time.perf_counter()
+            asyncio.run(run(measured, record=True))
+            return timings, time.perf_counter() - started
+
+    local = threading.local()
+
+    def send(item):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        name, request = item
+        start = time.perf_counter()
+        response = _send(local.client, *request)
+        return name, (time.perf_counter() - start) * 1000, response.status_code
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(send, warm))
+        started = time.perf_counter()
+        for name, ms, status in pool.map(send, measured):
+            timings[name].append((ms, status))
+        elapsed = time.perf_counter() - started
+    return timings, elapsed
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(timings, elapsed):
+    """
+    Per-endpoint request count, error count, throughput and latency percentiles.
+
+    Any 4xx or 5xx response counts as an error. ``rps`` is the number of
+    requests to the endpoint completed per second of the measured run, so
+    the per-endpoint figures add up to the overall one.
+    """
+    results = {}
+    for name, samples in timings.items():
+        if not samples:
+            continue
+        latencies = sorted(ms for ms, _ in samples)
+        results[name] = {
+            'requests': len(samples),
+            'errors': sum(1 for _, code in samples if code >= 400),
+            'rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+        }
+    total = sum(len(samples) for samples in timings.values())
+    results['__all__'] = {
+        'requests': total,
+        'errors': sum(result['errors'] for result in results.values()),
+        'rps': round(total / elapsed, 1) if elapsed else 0.0,
+    }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Endpoints whose p95 (or overall throughput) got worse than the baseline
+    by more than ``tolerance`` (0.25 = 25%). Returns a list of messages.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if 'p95' in current and previous.get('p95') and current['p95'] > previous['p95'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95']}ms vs baseline {previous['p95']}ms")
+        if name == '__all__' and previous.get('rps') and current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f"overall throughput {current['rps']} req/s vs baseline {previous['rps']} req/s")
+    return regressions
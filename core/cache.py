@@ -0,0 +1,166 @@
+"""
+Response cache for the public catalogue endpoints.
+
+Anonymous GETs on views using CatalogueCacheMixin are cached as rendered
+bytes, per view, host, Accept header and full query string. Every key also
+embeds a version number for each model the view depends on. Saving or
+deleting one of those models bumps its version (core.signals), so stale
+entries are never read again and simply age out.
+
+Every cached response carries an ETag. A client sending a matching
+If-None-Match gets a 304 without the body being built or rendered.
+
+Versions and payloads live in the cache alias named by CATALOGUE_CACHE_ALIAS.
+With several worker processes that alias must be a shared backend
+(Redis/Memcached/file), or invalidations made in one worker won't reach the
+others.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+
+VERSION_PREFIX = 'catalogue-version'
+ENTRY_PREFIX = 'catalogue-response'
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOGUE_CACHE_ALIAS', 'default')]
+
+
+def _version_key(model):
+    return f'{VERSION_PREFIX}:{model._meta.label_lower}'
+
+
+def get_versions(models):
+    """Current version of each model; missing counters start at a fresh timestamp."""
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A time-based start can't collide with versions used before an eviction
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(models):
+    """Async get_versions()."""
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    cache = get_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def _etag(content):
+    return f'"{hashlib.sha1(content).hexdigest()}"'
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    candidates = [value.strip() for value in header.split(',')]
+    return etag in candidates or '*' in candidates
+
+
+def response_key(request, view_name, versions):
+    """Cache key for ``request`` on ``view_name`` under the given model ``versions``."""
+    identity = '|'.join([
+        request.scheme, request.get_host(), request.META.get('HTTP_ACCEPT', ''), request.get_full_path(),
+    ])
+    digest = hashlib.sha1(identity.encode()).hexdigest()
+    return f"{ENTRY_PREFIX}:{view_name}:{'.'.join(map(str, versions))}:{digest}"
+
+
+def response_entry(response):
+    """What gets cached for a rendered response: (content, content type, ETag)."""
+    return response.content, response['Content-Type'], _etag(response.content)
+
+
+def cached_response(request, entry):
+    """Rebuild a response from a cache entry, or a 304 when the client already has it."""
+    content, content_type, etag = entry
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=content_type)
+    # Same headers as the response that was stored, so downstream caches key it the same way
+    patch_vary_headers(response, ['Accept'])
+    response['ETag'] = etag
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def stored_response(request, response, entry):
+    """Tag a freshly cached response; a matching If-None-Match turns it into a 304."""
+    etag = entry[2]
+    patch_vary_headers(response, ['Accept'])
+    response['ETag'] = etag
+    response['X-Cache'] = 'MISS'
+    if _etag_matches(request, etag):
+        not_modified = HttpResponseNotModified()
+        patch_vary_headers(not_modified, ['Accept'])
+        not_modified['ETag'] = etag
+        return not_modified
+    return response
+
+
+class CatalogueCacheMixin:
+    """
+    Cache ``list``/``retrieve`` responses for anonymous users.
+
+    Views set ``cache_models`` to the models whose writes must invalidate
+    them, e.g. ``(HotelDataModel,)``.
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _cache_key(self, request):
+        view_name = request.resolver_match.view_name if request.resolver_match else type(self).__name__
+        return response_key(request, view_name, get_versions(self.cache_models))
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        self._catalogue_cache_key = self._cache_key(request)
+        entry = get_cache().get(self._catalogue_cache_key)
+        if entry is None:
+            return handler(request, *args, **kwargs)
+
+        return cached_response(request, entry)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_catalogue_cache_key', None)
+        if key is None or response.has_header('X-Cache') or response.status_code != 200:
+            return response
+
+        # Render now so the bytes can be stored; rendering again later is a no-op
+        metrics.timed_render(request._request, response.render)
+        entry = response_entry(response)
+        get_cache().set(key, entry, timeout=getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 300))
+        return stored_response(request, response, entry)
@@ -0,0 +1,113 @@
+"""
+Daily aggregate tables behind the owner dashboards.
+
+Every booking or reservation adds counts to one row per hotel/restaurant
+and day (see hotels.dashboard and restaurants.dashboard). A row's
+"footprint" is ``{(owner_id, day): {counter: n}}``. Writes apply the
+difference between the stored row's footprint and the saved one, the same
+way the night inventory follows bookings. A dashboard then sums a few
+pre-aggregated rows per day instead of reading every booking.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+DEFAULT_WINDOW_DAYS = 30
+MAX_WINDOW_DAYS = 366
+
+
+def apply_change(model, owner_field, previous, current):
+    """Move the counts in ``model`` from the ``previous`` footprint to ``current`` (either may be None)."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for footprint, sign in ((previous, -1), (current, 1)):
+        for key, counts in (footprint or {}).items():
+            for counter, n in counts.items():
+                deltas[key][counter] += sign * n
+
+    # Days that change by the same amounts share one UPDATE (all nights of a stay, typically)
+    days_by_change = defaultdict(list)
+    for (owner_id, day), counts in deltas.items():
+        change = tuple(sorted((counter, n) for counter, n in counts.items() if n))
+        if change:
+            days_by_change[(owner_id, change)].append(day)
+    if not days_by_change:
+        return
+
+    # Releases only touch rows their claim created, so only claims insert missing rows
+    model.objects.bulk_create(
+        [model(**{owner_field: owner_id}, date=day)
+         for (owner_id, change), days in days_by_change.items()
+         if any(n > 0 for _, n in change) for day in days],
+        ignore_conflicts=True,
+    )
+    for (owner_id, change), days in days_by_change.items():
+        model.objects.filter(**{owner_field: owner_id}, date__in=days).update(
+            **{counter: F(counter) + n for counter, n in change}
+        )
+
+
+def rebuild(model, owner_field, footprints, stale):
+    """
+    Replace the rows in ``stale`` (a queryset of ``model``) with the sum of
+    ``footprints``. Returns the number of rows written.
+    """
+    totals = defaultdict(lambda: defaultdict(int))
+    for footprint in footprints:
+        for key, counts in (footprint or {}).items():
+            for counter, n in counts.items():
+                totals[key][counter] += n
+
+    with transaction.atomic():
+        stale.delete()
+        model.objects.bulk_create(
+            [model(**{owner_field: owner_id}, date=day, **counts) for (owner_id, day), counts in totals.items()],
+            batch_size=1000,
+        )
+    return len(totals)
+
+
+def date_window(params):
+    """
+    ``(start, end)``, both inclusive, from ``?start=&end=``: by default the
+    last DEFAULT_WINDOW_DAYS days up to today.
+    """
+    try:
+        end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+        start = parse_date(params['start']) if params.get('start') else end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    except ValueError:
+        start = end = None
+    if not start or not end:
+        raise ValidationError({"detail": "Dates must be YYYY-MM-DD."})
+    if start > end:
+        raise ValidationError({"detail": "start must not be after end."})
+    if (end - start).days >= MAX_WINDOW_DAYS:
+        raise ValidationError({"detail": f"The window can span at most {MAX_WINDOW_DAYS} days."})
+    return start, end
+
+
+def window_days(start, end):
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def sums(stats, owner_field, counters):
+    """
+    Counter totals per owner and per day over ``stats``, in two grouped queries:
+    ``({owner_id: {counter: n}}, {day: {counter: n}})``.
+    """
+    aggregates = {f'sum_{counter}': Sum(counter) for counter in counters}
+
+    def totals(row):
+        return {counter: row[f'sum_{counter}'] or 0 for counter in counters}
+
+    by_owner = {row[owner_field]: totals(row) for row in stats.values(owner_field).annotate(**aggregates).order_by()}
+    by_day = {row['date']: totals(row) for row in stats.values('date').annotate(**aggregates).order_by()}
+    return by_owner, by_day
+
+
+def percent(part, whole):
+    return round(100 * part / whole, 1) if whole else 0.0
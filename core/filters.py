@@ -0,0 +1,28 @@
+from decimal import Decimal, InvalidOperation
+
+from rest_framework.exceptions import ValidationError
+
+
+def decimal_param(params, name):
+    """Read an optional numeric query parameter, rejecting junk with a 400."""
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValidationError({name: "Must be a number."})
+
+
+def int_param(params, name, default=None, minimum=None):
+    """Read an optional whole-number query parameter, rejecting junk (or anything below ``minimum``) with a 400."""
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValidationError({name: "Must be a whole number."})
+    if minimum is not None and number < minimum:
+        raise ValidationError({name: f"Must be at least {minimum}."})
+    return number
@@ -0,0 +1,116 @@
+"""
+Idempotency keys for create endpoints.
+
+A client that may retry a POST sends an ``Idempotency-Key`` header (any
+unique string, such as a UUID per attempted booking). The first successful
+response for a (user, endpoint, key) is stored for IDEMPOTENCY_TTL_SECONDS.
+Retries with the same key get that stored response back, marked with
+``Idempotent-Replayed: true``, without running validation, capacity checks
+or the insert again. So a retried booking can never become two bookings.
+
+Keys are ``IdempotencyKey`` rows with a unique (view, user, key)
+constraint. The row is inserted in the same transaction as the create, so:
+
+- A retry racing the first request waits on the database for it to commit
+  (or fails its insert and reads the committed row), then gets its
+  response. This holds across any number of workers.
+- Failed requests roll the key back with everything else. Nothing was
+  created, so the client may correct the request and retry with the same
+  key.
+- Reusing a key with a different body gets 422.
+- Requests without the header behave as before.
+
+``manage.py purge_idempotency_keys`` deletes rows older than the TTL.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def cutoff(now=None):
+    """Keys created before this have expired."""
+    return (now or timezone.now()) - timedelta(seconds=getattr(settings, 'IDEMPOTENCY_TTL_SECONDS', 86400))
+
+
+def fingerprint(data):
+    """A digest of a request body, whether parsed from JSON or a form."""
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def purge(now=None):
+    """Delete expired keys; returns how many rows went."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lte=cutoff(now)).delete()
+    return deleted
+
+
+class IdempotentCreateMixin:
+    """
+    Honour ``Idempotency-Key`` on a DRF view's ``create``.
+
+    Keys are scoped to the authenticated user and to the view class, so two
+    users (or two endpoints) can never replay each other's responses.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        lookup = {
+            'scope': type(self).__name__,
+            'user_id': request.user.id,
+            'key': hashlib.sha256(key.encode()).hexdigest(),
+        }
+        body = fingerprint(request.data)
+
+        stored = IdempotencyKey.objects.filter(**lookup, created_at__gt=cutoff()).first()
+        if stored is not None:
+            return self._replay(stored, body)
+
+        with transaction.atomic():
+            IdempotencyKey.objects.filter(**lookup, created_at__lte=cutoff()).delete()
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(**lookup, fingerprint=body)
+            except IntegrityError:
+                # A concurrent request with this key committed first
+                return self._replay(IdempotencyKey.objects.get(**lookup), body)
+
+            response = super().create(request, *args, **kwargs)
+            if not status.is_success(response.status_code):
+                transaction.set_rollback(True)
+                return response
+            record.status = response.status_code
+            record.data = response.data
+            record.headers = {name: value for name, value in response.items() if name == 'Location'}
+            record.save(update_fields=['status', 'data', 'headers'])
+        return response
+
+    def _replay(self, stored, body):
+        if stored.fingerprint != body:
+            return Response(
+                {"detail": f"This {HEADER} was already used with a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(
+            stored.data, status=stored.status,
+            headers={**stored.headers, 'Idempotent-Replayed': 'true'},
+        )
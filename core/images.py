@@ -0,0 +1,187 @@
+"""
+Resized, recompressed variants of uploaded listing images.
+
+For every image field on a listing, ``refresh()`` writes a thumb, card and
+full-size rendition in JPEG, WebP and (when Pillow has AVIF support) AVIF
+next to the original::
+
+    hotels/taj_hotel.jpg -> hotels/taj_hotel__thumb.jpg, hotels/taj_hotel__thumb.webp, ...
+
+The model's ``image_derivatives`` JSON records, per field, which source file
+the variants were built from and which formats exist, so serializers can
+emit the URLs without touching the filesystem. Encoding takes seconds, so
+saves only queue a ``core.tasks.refresh_image_derivatives`` job (see
+core.signals). Until it has run, a replaced image has no variants listed
+rather than the previous image's. A file that can't be read as an image
+gets an entry with no formats, so it isn't queued again on every save.
+"""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+# Longest edges are bounded by these boxes; images are never upscaled
+VARIANT_SIZES = {
+    'thumb': (320, 240),
+    'card': (800, 600),
+    'full': (1600, 1200),
+}
+
+# Pillow format name, file extension and encoder options per output format
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', 'webp', {'quality': 75, 'method': 4}),
+    'avif': ('AVIF', 'avif', {'quality': 55, 'speed': 8}),
+}
+
+
+def available_formats():
+    formats = ['jpeg']
+    if features.check('webp'):
+        formats.append('webp')
+    if features.check('avif'):
+        formats.append('avif')
+    return formats
+
+
+def derivative_name(source_name, variant, fmt):
+    stem, _ = os.path.splitext(source_name)
+    return f'{stem}__{variant}.{FORMATS[fmt][1]}'
+
+
+def _render(image, fmt):
+    pil_format, _, options = FORMATS[fmt]
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def build(fieldfile):
+    """
+    Write every variant of ``fieldfile`` and return its manifest entry,
+    ``{'source': name, 'formats': [...]}``, or None if it can't be read.
+    """
+    storage = fieldfile.storage
+    try:
+        with storage.open(fieldfile.name, 'rb') as handle:
+            source = Image.open(handle)
+            source = ImageOps.exif_transpose(source)
+            source.load()
+    except (OSError, UnidentifiedImageError):
+        return None
+
+    if source.mode not in ('RGB', 'RGBA'):
+        source = source.convert('RGBA' if 'transparency' in source.info or 'A' in source.getbands() else 'RGB')
+
+    formats = available_formats()
+    for variant, box in VARIANT_SIZES.items():
+        resized = source.copy()
+        resized.thumbnail(box, Image.Resampling.LANCZOS)
+        for fmt in formats:
+            name = derivative_name(fieldfile.name, variant, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(_render(resized, fmt)))
+    return {'source': fieldfile.name, 'formats': formats}
+
+
+def delete(storage, entry):
+    for variant in VARIANT_SIZES:
+        for fmt in entry.get('formats', ()):
+            name = derivative_name(entry['source'], variant, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+
+
+def is_stale(instance, field_names):
+    """Whether any field's variants are missing, or were built from a file it no longer holds."""
+    manifest = instance.image_derivatives or {}
+    for field_name in field_names:
+        entry = manifest.get(field_name)
+        if (entry['source'] if entry else None) != (getattr(instance, field_name).name or None):
+            return True
+    return False
+
+
+def refresh(instance, field_names, force=False):
+    """
+    Bring ``instance.image_derivatives`` in line with its image fields.
+
+    Variants are (re)built only for fields whose file changed since the last
+    run (or all of them with ``force``); variants of replaced or cleared
+    files are deleted. Saves the manifest with a queryset update so no save
+    signals fire again. Returns True if anything changed.
+    """
+    manifest = dict(instance.image_derivatives or {})
+    changed = False
+    for field_name in field_names:
+        fieldfile = getattr(instance, field_name)
+        entry = manifest.get(field_name)
+        current = fieldfile.name if fieldfile else None
+        if entry and (force or entry['source'] != current):
+            if entry['source'] != current:
+                delete(fieldfile.storage, entry)
+            manifest.pop(field_name)
+            changed = True
+            entry = None
+        if current and entry is None:
+            # An unreadable file is recorded with no formats; ``force`` retries it
+            manifest[field_name] = build(fieldfile) or {'source': current, 'formats': []}
+            changed = True
+
+    if changed:
+        instance.image_derivatives = manifest
+        type(instance).objects.filter(pk=instance.pk).update(image_derivatives=manifest)
+    return changed
+
+
+def variant_urls(instance, field_names, build_url):
+    """
+    ``{field: {variant: {format: url}}}`` for the fields that have variants.
+
+    ``build_url`` turns a storage URL into what the client sees (usually
+    ``request.build_absolute_uri``).
+    """
+    return manifest_urls(
+        instance.image_derivatives,
+        {field_name: getattr(instance, field_name).name for field_name in field_names},
+        lambda field_name, name: build_url(getattr(instance, field_name).storage.url(name)),
+    )
+
+
+def manifest_urls(manifest, sources, file_url):
+    """
+    variant_urls() straight from a manifest, e.g. one read with ``.values()``.
+
+    ``sources`` maps each image field to the file it holds now; entries
+    built from another file are left out. ``file_url(field_name, name)``
+    returns the URL the client sees for a stored file.
+    """
+    manifest = manifest or {}
+    urls = {}
+    for field_name, source in sources.items():
+        entry = manifest.get(field_name)
+        if not entry or not entry['formats'] or not source or entry['source'] != source:
+            continue
+        urls[field_name] = {
+            variant: {
+                fmt: file_url(field_name, derivative_name(entry['source'], variant, fmt))
+                for fmt in entry['formats']
+            }
+            for variant in VARIANT_SIZES
+        }
+    return urls
+
+
+def preview_url(instance, field_name, variant='thumb', fmt='jpeg'):
+    """URL of one variant, falling back to the original until variants exist."""
+    fieldfile = getattr(instance, field_name)
+    entry = (instance.image_derivatives or {}).get(field_name)
+    if entry and entry['source'] == fieldfile.name and fmt in entry['formats']:
+        return fieldfile.storage.url(derivative_name(entry['source'], variant, fmt))
+    return fieldfile.url
@@ -0,0 +1,161 @@
+"""
+Database-backed background jobs.
+
+Slow side effects such as sending email are enqueued as ``Job`` rows and
+executed by worker processes (``manage.py run_jobs``) instead of inside the
+request::
+
+    jobs.enqueue('users.tasks.send_otp_email', user_id=user.id)
+
+The row is written in the caller's transaction, so a job whose request
+rolls back is never run. Workers claim a due job with a conditional UPDATE,
+so no two workers run the same job. This needs no row locking and works on
+SQLite. A failed job is retried with exponential backoff. After
+``max_attempts`` failures it moves to ``DeadJob`` for inspection; the admin
+can requeue it from there. A worker that dies mid-job loses its claim after
+JOBS_LEASE_SECONDS, and the job is retried.
+
+Payloads must be JSON-serializable keyword arguments. They are stored,
+copied to DeadJob and shown in the admin, so pass ids and let the task read
+secrets such as OTPs itself. Tasks should be
+idempotent, because a job can run more than once when a worker dies after
+the task finished but before the row was deleted.
+"""
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import logs
+from .models import DeadJob, Job
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(task, *, delay=None, max_attempts=None, **payload):
+    """Queue ``task`` (a dotted path) to run with ``payload`` as keyword arguments."""
+    run_at = timezone.now() + timedelta(seconds=delay) if delay else timezone.now()
+    return Job.objects.create(
+        task=task,
+        payload=payload,
+        run_at=run_at,
+        max_attempts=max_attempts or _setting('JOBS_MAX_ATTEMPTS', 5),
+    )
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number ``attempts``: exponential, capped, jittered."""
+    base = _setting('JOBS_BACKOFF_SECONDS', 10)
+    delay = min(base * 2 ** (attempts - 1), _setting('JOBS_BACKOFF_MAX', 3600))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker, now=None):
+    """
+    Take the oldest due job for ``worker`` and return it, or None.
+
+    Jobs held by a worker for longer than the lease count as due again.
+    """
+    now = now or timezone.now()
+    stale = now - timedelta(seconds=_setting('JOBS_LEASE_SECONDS', 300))
+    due = (
+        Q(status='queued', run_at__lte=now)
+        | Q(status='running', locked_at__lt=stale)
+    )
+    candidates = Job.objects.filter(due).order_by('run_at', 'id').values_list('id', 'status', 'locked_at')[:10]
+    for job_id, status, locked_at in candidates:
+        # Only one worker can move the row out of the state it was read in
+        claimed = Job.objects.filter(id=job_id, status=status, locked_at=locked_at).update(
+            status='running', locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def execute(job):
+    """Run a claimed job; delete it on success, reschedule or bury it on failure."""
+    try:
+        import_string(job.task)(**job.payload)
+    except Exception:
+        fail(job, traceback.format_exc())
+        return False
+    Job.objects.filter(id=job.id, locked_by=job.locked_by).delete()
+    return True
+
+
+def fail(job, error):
+    if job.attempts >= job.max_attempts:
+        logs.event(logger, 'job.dead', logging.ERROR, job_id=job.id, task=job.task, attempts=job.attempts)
+        with transaction.atomic():
+            DeadJob.objects.create(
+                task=job.task, payload=job.payload, attempts=job.attempts,
+                last_error=error, created_at=job.created_at,
+            )
+            Job.objects.filter(id=job.id).delete()
+        return
+    delay = backoff(job.attempts)
+    logs.event(
+        logger, 'job.retry', logging.WARNING,
+        job_id=job.id, task=job.task, attempts=job.attempts, retry_in=round(delay, 1),
+    )
+    Job.objects.filter(id=job.id, locked_by=job.locked_by).update(
+        status='queued', locked_by='', locked_at=None, last_error=error,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def requeue(dead_jobs):
+    """Move dead jobs back onto the queue with a fresh attempt budget. Returns how many."""
+    count = 0
+    with transaction.atomic():
+        for dead in dead_jobs:
+            enqueue(dead.task, **dead.payload)
+            dead.delete()
+            count += 1
+    return count
+
+
+def run_pending(worker=None, limit=None):
+    """
+    Run due jobs in this process until none are left (or ``limit`` ran).
+
+    Returns the number of jobs executed. Used by ``run_jobs --burst`` and by
+    tests, which can then inspect ``mail.outbox``.
+    """
+    worker = worker or worker_name()
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim(worker)
+        if job is None:
+            break
+        execute(job)
+        ran += 1
+    return ran
+
+
+def work(stop=None, poll_interval=None):
+    """Worker loop: run due jobs, sleeping when the queue is empty, until ``stop()``."""
+    poll_interval = poll_interval or _setting('JOBS_POLL_INTERVAL', 1.0)
+    worker = worker_name()
+    while not (stop and stop()):
+        close_old_connections()
+        if not run_pending(worker, limit=100):
+            time.sleep(poll_interval)
@@ -0,0 +1,162 @@
+"""
+Structured application logging.
+
+Code logs an event name plus keyword fields::
+
+    logs.event(logger, 'booking.created', booking_id=booking.id, hotel_id=booking.hotel_id)
+
+The handlers configured in settings.LOGGING turn each record into one JSON
+line:
+
+- QueueingHandler only puts the record on a bounded in-memory queue. A
+  background thread formats and writes it, so a request never waits on
+  stdout or a slow disk. When the queue is full, records are dropped and
+  counted rather than blocking the caller.
+- SamplingFilter keeps only a fraction of named high-volume events, for
+  example successful logins. Warnings and errors are always kept.
+- JSONFormatter redacts sensitive fields (passwords, OTPs, tokens) before
+  anything is written, and masks email addresses.
+"""
+import atexit
+import json
+import logging
+import os
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+
+REDACTED = '[REDACTED]'
+DEFAULT_REDACT_KEYS = (
+    'password', 'confirm_password', 'otp', 'token', 'access', 'refresh',
+    'secret', 'authorization', 'cookie',
+)
+
+
+def event(logger, name, level=logging.INFO, **fields):
+    """Log ``name`` with ``fields`` as structured data."""
+    if logger.isEnabledFor(level):
+        logger.log(level, name, extra={'data': fields})
+
+
+def mask_email(value):
+    local, _, domain = str(value).partition('@')
+    if not domain:
+        return REDACTED
+    return f'{local[:1]}***@{domain}'
+
+
+class JSONFormatter(logging.Formatter):
+
+    def __init__(self, redact_keys=DEFAULT_REDACT_KEYS, mask_emails=True):
+        super().__init__()
+        self.redact_keys = {key.lower() for key in redact_keys}
+        self.mask_emails = mask_emails
+
+    def redact(self, value, key=None):
+        if key is not None:
+            lowered = key.lower()
+            if lowered in self.redact_keys:
+                return REDACTED
+            if self.mask_emails and 'email' in lowered and isinstance(value, str):
+                return mask_email(value)
+        if isinstance(value, dict):
+            return {k: self.redact(v, str(k)) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.redact(item) for item in value]
+        return value
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        data = getattr(record, 'data', None)
+        if data:
+            entry.update(self.redact(data))
+        sample_rate = getattr(record, 'sample_rate', None)
+        if sample_rate is not None:
+            entry['sample_rate'] = sample_rate
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep ``rates[event]`` of the records for each listed event (0..1).
+
+    Kept records carry ``sample_rate`` so totals can be scaled back up.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.msg)
+        if rate is None:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class QueueingHandler(QueueHandler):
+    """
+    Hand records to a background thread that writes them to ``target``
+    (stderr by default). The formatter configured on this handler is used
+    by the target.
+    """
+
+    def __init__(self, target=None, queue_size=10000):
+        super().__init__(Queue(queue_size))
+        self.target = target or logging.StreamHandler(sys.stderr)
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._start_lock = threading.Lock()
+        self._start_listener()
+        atexit.register(self.flush_and_stop)
+
+    def _start_listener(self):
+        self._pid = os.getpid()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Resolve the message and traceback now; the formatting itself happens on the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            # Forked child (e.g. run_jobs workers): the listener thread didn't survive the fork
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self.queue = Queue(self.queue_size)
+                    self._start_listener()
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+    def flush_and_stop(self):
+        if self._pid == os.getpid() and self.listener._thread is not None:
+            self.listener.stop()
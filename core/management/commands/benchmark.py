@@ -0,0 +1,100 @@
+import json
+import random
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import benchmark
+
+BENCHMARK_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with synthetic data, replay a request mix against "
+        "the API in-process and report throughput and p50/p95/p99 per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mix', default=str(BENCHMARK_DIR / 'request_mix.jsonl'),
+                            help="JSON-lines file describing the request mix.")
+        parser.add_argument('--requests', type=int, default=2000, help="Measured requests to send.")
+        parser.add_argument('--warmup', type=int, default=50, help="Unmeasured requests sent first.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for data and request order.")
+        for name, default in benchmark.DEFAULT_SIZES.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, dest=name)
+        parser.add_argument('--baseline', default=str(BENCHMARK_DIR / 'baseline.json'),
+                            help="Baseline results to compare against.")
+        parser.add_argument('--save-baseline', action='store_true',
+                            help="Write this run's results as the new baseline.")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed slowdown before a run counts as a regression (0.25 = 25%%).")
+        parser.add_argument('--keepdb', action='store_true',
+                            help="Reuse an already seeded benchmark database.")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] for name in benchmark.DEFAULT_SIZES}
+        specs = benchmark.load_mix(options['mix'])
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            rng = random.Random(options['seed'])
+            from hotels.models import HotelDataModel
+            if not (options['keepdb'] and HotelDataModel.objects.exists()):
+                started = time.perf_counter()
+                benchmark.seed(sizes, rng=rng, log=lambda message: self.stderr.write(f"  seeded {message}"))
+                self.stderr.write(f"Seeding took {time.perf_counter() - started:.1f}s")
+
+            timings, elapsed = benchmark.replay(
+                specs, options['requests'], rng=random.Random(options['seed'] + 1), warmup=options['warmup']
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        results = benchmark.summarize(timings, elapsed)
+        run = {'sizes': sizes, 'requests': options['requests'], 'results': results}
+        if options['json']:
+            self.stdout.write(json.dumps(run, indent=2))
+        else:
+            self._print_table(results)
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps(run, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {baseline_path}"))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write("No baseline to compare against (use --save-baseline).")
+            return
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get('sizes') != sizes:
+            self.stdout.write(self.style.WARNING(
+                "Baseline was recorded with different dataset sizes; comparison may be meaningless."
+            ))
+        regressions = benchmark.compare(results, baseline.get('results', {}), options['tolerance'])
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def _print_table(self, results):
+        overall = results['__all__']
+        self.stdout.write(
+            f"{overall['requests']} requests, {overall['rps']} req/s overall, {overall['errors']} errors (4xx/5xx)"
+        )
+        self.stdout.write(f"{'endpoint':<24}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name, result in sorted(results.items()):
+            if name == '__all__':
+                continue
+            self.stdout.write(
+                f"{name:<24}{result['requests']:>9}{result['errors']:>8}{result['rps']:>9}"
+                f"{result['p50']:>9}{result['p95']:>9}{result['p99']:>9}"
+            )
@@ -0,0 +1,87 @@
+import json
+import random
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import benchmark
+
+BENCHMARK_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database, then replay the same concurrent read mix through the "
+        "sync WSGI views and the async ASGI views and compare throughput and latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mix', default=str(BENCHMARK_DIR / 'async_mix.jsonl'),
+                            help="JSON-lines file describing the request mix.")
+        parser.add_argument('--requests', type=int, default=2000, help="Measured requests per server.")
+        parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight at once.")
+        parser.add_argument('--warmup', type=int, default=50, help="Unmeasured requests sent first.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for data and request order.")
+        for name, default in benchmark.DEFAULT_SIZES.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, dest=name)
+        parser.add_argument('--keepdb', action='store_true',
+                            help="Reuse an already seeded benchmark database.")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] for name in benchmark.DEFAULT_SIZES}
+        specs = benchmark.load_mix(options['mix'])
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            from hotels.models import HotelDataModel
+            if not (options['keepdb'] and HotelDataModel.objects.exists()):
+                started = time.perf_counter()
+                benchmark.seed(sizes, rng=random.Random(options['seed']),
+                               log=lambda message: self.stderr.write(f"  seeded {message}"))
+                self.stderr.write(f"Seeding took {time.perf_counter() - started:.1f}s")
+
+            results = {}
+            for server in ('wsgi', 'asgi'):
+                timings, elapsed = benchmark.replay_concurrent(
+                    specs, options['requests'], options['concurrency'], asgi=server == 'asgi',
+                    rng=random.Random(options['seed'] + 1), warmup=options['warmup'],
+                )
+                results[server] = benchmark.summarize(timings, elapsed)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        run = {'sizes': sizes, 'requests': options['requests'], 'concurrency': options['concurrency'],
+               'results': results}
+        if options['json']:
+            self.stdout.write(json.dumps(run, indent=2))
+            return
+        self._print_table(results['wsgi'], results['asgi'], options['concurrency'])
+
+    def _print_table(self, wsgi, asgi, concurrency):
+        self.stdout.write(f"{concurrency} requests in flight")
+        for server, results in (('WSGI (sync views)', wsgi), ('ASGI (async views)', asgi)):
+            overall = results['__all__']
+            self.stdout.write(
+                f"{server:<20}{overall['requests']:>7} requests {overall['rps']:>9} req/s "
+                f"{overall['errors']:>5} errors (4xx/5xx)"
+            )
+        self.stdout.write(
+            f"{'endpoint':<24}{'wsgi p50':>10}{'asgi p50':>10}{'wsgi p95':>10}{'asgi p95':>10}"
+        )
+        for name in sorted(wsgi):
+            if name == '__all__' or name not in asgi:
+                continue
+            self.stdout.write(
+                f"{name:<24}{wsgi[name]['p50']:>10}{asgi[name]['p50']:>10}"
+                f"{wsgi[name]['p95']:>10}{asgi[name]['p95']:>10}"
+            )
+        ratio = asgi['__all__']['rps'] / wsgi['__all__']['rps'] if wsgi['__all__']['rps'] else 0
+        self.stdout.write(self.style.SUCCESS(f"ASGI throughput is {ratio:.2f}x WSGI on this mix."))
@@ -0,0 +1,79 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from core import benchmark, images
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a hotel list response built by HotelListSerializer against the .values() "
+        "fast path (HotelListRowSerializer) on a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Hotels in the list.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per serializer.")
+        parser.add_argument('--keepdb', action='store_true',
+                            help="Reuse an already seeded benchmark database.")
+
+    def handle(self, *args, **options):
+        from hotels.models import HotelDataModel
+        from hotels.serializers import HotelListRowSerializer, HotelListSerializer
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            if not (options['keepdb'] and HotelDataModel.objects.count() >= options['rows']):
+                benchmark.seed({
+                    'users': 200, 'hotels': options['rows'], 'rooms_per_hotel': 0,
+                    'bookings': 0, 'restaurants': 0, 'reservations': 0,
+                })
+                # Every listing gets a full set of variants, as after build_image_derivatives
+                HotelDataModel.objects.update(image_derivatives={
+                    'image': {'source': 'hotels/taj_hotel.jpg', 'formats': list(images.FORMATS)},
+                })
+            request = RequestFactory().get('/api/hotels/')
+            renderer = JSONRenderer()
+            queryset = HotelDataModel.objects.order_by('-id')[:options['rows']]
+
+            def model_serializer():
+                hotels = queryset.select_related('owner')
+                return renderer.render(HotelListSerializer(hotels, many=True, context={'request': request}).data)
+
+            def row_serializer():
+                rows = HotelListRowSerializer(context={'request': request})
+                return renderer.render(rows.serialize(queryset.values(*rows.columns)))
+
+            if model_serializer() != row_serializer():
+                raise CommandError("The two serializers produced different JSON.")
+            timings = {
+                name: self._time(build, options['repeat'])
+                for name, build in (('HotelListSerializer', model_serializer),
+                                    ('HotelListRowSerializer', row_serializer))
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        self.stdout.write(f"{options['rows']} hotels, query + serialize + render, {options['repeat']} runs")
+        self.stdout.write(f"{'serializer':<26}{'median ms':>11}{'best ms':>10}")
+        for name, samples in timings.items():
+            self.stdout.write(f"{name:<26}{statistics.median(samples):>11.1f}{min(samples):>10.1f}")
+        speedup = statistics.median(timings['HotelListSerializer']) / statistics.median(timings['HotelListRowSerializer'])
+        self.stdout.write(self.style.SUCCESS(f"Identical output; the row serializer is {speedup:.1f}x faster."))
+
+    @staticmethod
+    def _time(build, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
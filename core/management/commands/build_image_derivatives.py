@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core import cache, images
+from hotels.models import HotelDataModel
+from restaurants.models import RestaurantDataModel
+
+MODELS = {'hotels': HotelDataModel, 'restaurants': RestaurantDataModel}
+
+
+class Command(BaseCommand):
+    help = "Build thumb/card/full image variants for listings that don't have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', choices=sorted(MODELS), action='append', dest='models',
+            help="Only process this catalogue (can be repeated).",
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Rebuild variants even where they are already up to date.",
+        )
+
+    def handle(self, *args, **options):
+        for label in options['models'] or sorted(MODELS):
+            model = MODELS[label]
+            queryset = model.objects.only('id', 'image_derivatives', *model.IMAGE_FIELDS).order_by('id')
+            updated = 0
+            for obj in queryset.iterator(chunk_size=200):
+                if images.refresh(obj, model.IMAGE_FIELDS, force=options['force']):
+                    updated += 1
+            if updated:
+                # Manifests were saved with queryset updates, which bypass the cache signals
+                cache.bump_version(model)
+            self.stdout.write(self.style.SUCCESS(f"Updated image variants for {updated} {label}."))
@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import metrics
+
+
+class Command(BaseCommand):
+    help = "Print per-endpoint request metric percentiles collected by RequestMetricsMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help="Print the raw report as JSON.")
+        parser.add_argument('--endpoint', help="Only show endpoints whose name contains this text.")
+        parser.add_argument(
+            '--metric', action='append', choices=metrics.METRICS,
+            help="Metric(s) to show (default: all).",
+        )
+        parser.add_argument('--reset', action='store_true', help="Delete the stored snapshots afterwards.")
+
+    def handle(self, *args, **options):
+        report = metrics.report(include_live=False)
+        if options['endpoint']:
+            report = {name: data for name, data in report.items() if options['endpoint'] in name}
+        selected = options['metric'] or metrics.METRICS
+
+        if options['json']:
+            self.stdout.write(json.dumps(
+                {name: {metric: data[metric] for metric in selected} for name, data in report.items()},
+                indent=2,
+            ))
+        elif not report:
+            self.stdout.write("No metrics recorded yet.")
+        else:
+            columns = ['count', 'mean'] + [f'p{pct}' for pct in metrics.PERCENTILES] + ['max']
+            for name, data in report.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(f"  {'metric':<16}" + ''.join(f'{column:>11}' for column in columns))
+                for metric in selected:
+                    summary = data[metric]
+                    self.stdout.write(
+                        f"  {metric:<16}" + ''.join(f'{summary[column]:>11}' for column in columns)
+                    )
+
+        if options['reset']:
+            metrics.clear()
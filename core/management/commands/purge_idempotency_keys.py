@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import idempotency
+
+
+class Command(BaseCommand):
+    help = "Delete Idempotency-Key records older than IDEMPOTENCY_TTL_SECONDS (run periodically, e.g. from cron)."
+
+    def handle(self, *args, **options):
+        deleted = idempotency.purge()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
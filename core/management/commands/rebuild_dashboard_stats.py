@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from hotels import dashboard as hotel_dashboard
+from restaurants import dashboard as restaurant_dashboard
+
+
+class Command(BaseCommand):
+    help = "Rebuild the hotel and restaurant owner dashboard daily stats from bookings and reservations."
+
+    def handle(self, *args, **options):
+        hotel_rows = hotel_dashboard.rebuild()
+        restaurant_rows = restaurant_dashboard.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {hotel_rows} hotel and {restaurant_rows} restaurant daily stats rows."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over hotels and restaurants."
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING(
+                "Full-text index needs SQLite FTS5; search falls back to icontains on this database."
+            ))
+            return
+        rows = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} listings."))
@@ -0,0 +1,67 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+def _worker(poll_interval):
+    stopping = []
+
+    def request_stop(signum, frame):
+        stopping.append(signum)
+
+    # Finish the job in hand, then exit
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    jobs.work(stop=lambda: bool(stopping), poll_interval=poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the core.Job queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help="Number of worker processes.")
+        parser.add_argument(
+            '--burst', action='store_true',
+            help="Run every job that is due, then exit (no polling).",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=None,
+            help="Seconds to sleep when the queue is empty (default: JOBS_POLL_INTERVAL).",
+        )
+
+    def handle(self, *args, **options):
+        if options['burst']:
+            ran = jobs.run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Ran {ran} jobs."))
+            return
+
+        workers = max(1, options['workers'])
+        self.stdout.write(f"Starting {workers} job worker(s).")
+        if workers == 1:
+            _worker(options['poll_interval'])
+            return
+
+        # Forked children must open their own database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=_worker, args=(options['poll_interval'],), name=f'job-worker-{index}')
+            for index in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        def forward_stop(signum, frame):
+            # Each child finishes the job in hand, then exits
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, forward_stop)
+        signal.signal(signal.SIGINT, forward_stop)
+        for process in processes:
+            process.join()
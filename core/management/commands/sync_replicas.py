@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database onto the replica files (local stand-in for replication)."
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError("Replicas of non-SQLite databases are kept in sync by the database itself.")
+        replicas = replica_aliases()
+        if not replicas:
+            self.stdout.write(self.style.WARNING("No replicas configured (set DATABASE_REPLICAS)."))
+            return
+
+        primary.ensure_connection()
+        for alias in replicas:
+            connections[alias].close()
+            target = sqlite3.connect(str(connections[alias].settings_dict['NAME']))
+            try:
+                # Online backup: consistent copy even while the primary takes writes
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(f"Synced {alias}."))
@@ -0,0 +1,236 @@
+"""
+In-process request metrics.
+
+RequestMetricsMiddleware records, per resolved URL name, the query count,
+DB time, render (serialization) time, total time and response size of every
+request into fixed-bucket histograms. Recording is a bisect plus a few
+integer adds under a lock, cheap enough to leave on in production.
+
+Each process periodically writes its histograms to ``METRICS_DIR/<pid>.json``
+so the admin endpoint and the ``metrics_report`` command can merge the
+numbers of every worker, not just the one that happens to serve them.
+Files whose process is gone (a restarted or recycled worker) are deleted
+when the numbers are next collected, so METRICS_DIR must be local to the
+host the workers run on.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+METRICS = ('queries', 'db_ms', 'render_ms', 'total_ms', 'response_bytes')
+PERCENTILES = (50, 90, 95, 99)
+
+# Geometric bucket bounds, ~12% apart, from 0.05 up to ~5e9: wide enough for
+# milliseconds, query counts and byte sizes with the same layout.
+BUCKET_BOUNDS = tuple(0.05 * 1.12 ** i for i in range(230))
+
+
+class Histogram:
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def record(self, value):
+        index = bisect_left(BUCKET_BOUNDS, value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, hits in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + hits
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th value (capped at the max seen)."""
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        data = {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'max': round(self.max, 3),
+        }
+        for pct in PERCENTILES:
+            data[f'p{pct}'] = round(self.percentile(pct), 3)
+        return data
+
+    def to_dict(self):
+        return {'count': self.count, 'total': self.total, 'max': self.max, 'buckets': self.buckets}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.max = data['max']
+        histogram.buckets = {int(index): hits for index, hits in data['buckets'].items()}
+        return histogram
+
+
+class MetricsRegistry:
+    """Histograms per endpoint and metric for the current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, endpoint, **values):
+        with self._lock:
+            histograms = self._endpoints.get(endpoint)
+            if histograms is None:
+                histograms = self._endpoints[endpoint] = {name: Histogram() for name in METRICS}
+            for name, value in values.items():
+                histograms[name].record(value)
+        self._maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                for endpoint, histograms in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def _maybe_flush(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 30)
+        now = time.monotonic()
+        if now - self._last_flush < interval:
+            return
+        self._last_flush = now
+        self.flush()
+
+    def flush(self):
+        """Write this process's histograms to METRICS_DIR/<pid>.json."""
+        directory = metrics_dir()
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(temp_path, path)
+
+
+registry = MetricsRegistry()
+
+
+def metrics_dir():
+    directory = getattr(settings, 'METRICS_DIR', None)
+    return str(directory) if directory else None
+
+
+def timed_render(request, render):
+    """Call ``render()`` and add the time it took to ``request``'s render_ms."""
+    start = time.perf_counter()
+    try:
+        return render()
+    finally:
+        request._metrics_render_seconds = (
+            getattr(request, '_metrics_render_seconds', 0.0) + time.perf_counter() - start
+        )
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        return True
+    return True
+
+
+def prune():
+    """Delete the snapshots of processes that no longer run; returns how many went."""
+    directory = metrics_dir()
+    if not directory or not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for name in os.listdir(directory):
+        pid = name.split('.', 1)[0]
+        if not pid.isdigit() or _pid_alive(int(pid)):
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def _merge_into(merged, snapshot):
+    for endpoint, histograms in snapshot.items():
+        target = merged.setdefault(endpoint, {name: Histogram() for name in METRICS})
+        for name, data in histograms.items():
+            if name in target:
+                target[name].merge(Histogram.from_dict(data))
+
+
+def collect(include_live=True):
+    """
+    Merge the snapshots of every process (and this process's live numbers).
+
+    Returns ``{endpoint: {metric: Histogram}}``.
+    """
+    merged = {}
+    prune()
+    directory = metrics_dir()
+    own_file = f'{os.getpid()}.json'
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if not name.endswith('.json') or (include_live and name == own_file):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as handle:
+                    _merge_into(merged, json.load(handle))
+            except (OSError, ValueError):
+                continue
+    if include_live:
+        _merge_into(merged, registry.snapshot())
+    return merged
+
+
+def report(include_live=True):
+    """Percentile summaries per endpoint and metric, ready to serialize."""
+    return {
+        endpoint: {name: histogram.summary() for name, histogram in histograms.items()}
+        for endpoint, histograms in sorted(collect(include_live).items())
+    }
+
+
+def clear():
+    """Drop live numbers and every stored snapshot."""
+    registry.reset()
+    directory = metrics_dir()
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(directory, name))
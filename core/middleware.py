@@ -0,0 +1,124 @@
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+
+class QueryTimer:
+    """connection.execute_wrapper hook counting queries and the time spent in them."""
+
+    __slots__ = ('queries', 'seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+# The current request's QueryTimer. Context variables follow the request into
+# sync_to_async threads, which is where its queries run under ASGI.
+_active_timer = ContextVar('query_timer', default=None)
+
+
+def _time_queries(execute, sql, params, many, context):
+    timer = _active_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection):
+    """
+    Time ``connection``'s queries for whichever request runs them. Every thread
+    has its own connection objects, so this is called as each is created
+    (core.signals) rather than from the middleware's own thread.
+    """
+    if _time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_queries)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, DB time, render time, total time and response size
+    for every request, keyed by the resolved URL name (see core.metrics).
+
+    Runs natively in both modes, so under ASGI it adds no thread hop in
+    front of async views.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        timer, start = self._start(request)
+        token = _active_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _active_timer.reset(token)
+        return self._record(request, response, timer, start)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        timer, start = self._start(request)
+        token = _active_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _active_timer.reset(token)
+        return self._record(request, response, timer, start)
+
+    def _start(self, request):
+        request._metrics_render_seconds = 0.0
+        return QueryTimer(), time.perf_counter()
+
+    def _record(self, request, response, timer, start):
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+
+        if response.streaming:
+            size = 0
+        else:
+            size = len(response.content)
+        metrics.registry.record(
+            match.view_name or match._func_path,
+            queries=timer.queries,
+            db_ms=timer.seconds * 1000,
+            render_ms=request._metrics_render_seconds * 1000,
+            total_ms=elapsed * 1000,
+            response_bytes=size,
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time just the render() call
+        if self.enabled:
+            render = response.render
+            response.render = lambda: metrics.timed_render(request, render)
+        return response
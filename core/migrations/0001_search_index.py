@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from core import search
+
+    if not search.is_supported(schema_editor.connection):
+        return
+    schema_editor.execute(search.CREATE_SQL)
+
+    Hotel = apps.get_model('hotels', 'HotelDataModel')
+    Restaurant = apps.get_model('restaurants', 'RestaurantDataModel')
+    rows = [
+        [hotel.pk * 2 + search.KINDS['hotel'], hotel.name, hotel.city, hotel.area,
+         hotel.badge or '', hotel.description or '']
+        for hotel in Hotel.objects.all()
+    ] + [
+        [restaurant.pk * 2 + search.KINDS['restaurant'], restaurant.name, restaurant.city, restaurant.area,
+         f"{restaurant.badge} {restaurant.cuisine_type}", restaurant.description or '']
+        for restaurant in Restaurant.objects.all()
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        search._insert_batch(cursor, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    from core import search
+
+    if search.is_supported(schema_editor.connection):
+        schema_editor.execute(search.DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0013_catalogue_filter_indexes'),
+        ('restaurants', '0003_catalogue_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
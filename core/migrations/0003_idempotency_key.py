@@ -0,0 +1,35 @@
+# Generated by Django 5.2.11 on 2026-10-18 11:19
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_job_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(help_text='The view the key was used on', max_length=100)),
+                ('key', models.CharField(help_text="SHA-256 of the client's key", max_length=64)),
+                ('fingerprint', models.CharField(help_text='SHA-256 of the request body', max_length=64)),
+                ('status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('data', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('headers', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'user', 'key'), name='unique_idempotency_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+"""
+View mixins shared across the API apps.
+"""
+
+
+def eager_load(queryset, serializer_class):
+    """Apply the relations ``serializer_class`` declares to ``queryset``."""
+    select_related = getattr(serializer_class, 'select_related_fields', ())
+    prefetch_related = getattr(serializer_class, 'prefetch_related_fields', ())
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+class EagerLoadingMixin:
+    """
+    Apply the relations a serializer declares to the view's queryset.
+
+    Serializers list the foreign keys they read in ``select_related_fields``
+    (and reverse/many relations in ``prefetch_related_fields``); views using
+    this mixin fetch them with the page instead of one query per row.
+    """
+
+    def get_queryset(self):
+        return eager_load(super().get_queryset(), self.get_serializer_class())
@@ -0,0 +1,86 @@
+"""
+Default pagination for list endpoints.
+
+Lists are paged with opaque keyset cursors (DRF's CursorPagination): each
+page continues from the last row of the previous one with a ``WHERE id < ...``
+instead of an OFFSET, so deep pages cost the same as the first and rows added
+in between don't shift the window.
+
+A keyset needs a non-null sort key. When a client orders by a nullable column
+(``?ordering=price``), the page falls back to limit/offset instead. Both
+kinds of page have the same shape, ``{"next", "previous", "results"}``, and
+clients just follow the links; there is no ``count`` in either.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class OffsetPagination(LimitOffsetPagination):
+    """Limit/offset paging, used only for orderings a keyset can't follow."""
+    default_limit = api_settings.PAGE_SIZE
+    limit_query_param = 'page_size'
+    max_limit = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        # One row past the page says whether there is a next one, without a COUNT(*)
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.count = self.offset + len(rows)
+        return rows[:self.limit]
+
+    def get_paginated_response(self, data):
+        # Shaped like a keyset page, so clients can't tell which one served them
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        del response_schema['properties']['count']
+        response_schema['required'].remove('count')
+        return response_schema
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on a stable ordering, ``-id`` unless the view sets
+    ``keyset_ordering`` (e.g. ``('-created_at', '-id')``).
+
+    Clients pick the page size with ``?page_size=`` up to ``max_page_size``.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        keyset_ordering = getattr(view, 'keyset_ordering', None)
+        if keyset_ordering:
+            self.ordering = keyset_ordering
+        return super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.offset_pagination = None
+        if not self.supports_keyset(queryset.model, self.get_ordering(request, queryset, view)):
+            self.offset_pagination = OffsetPagination()
+            return self.offset_pagination.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.offset_pagination is not None:
+            return self.offset_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    @staticmethod
+    def supports_keyset(model, ordering):
+        """A cursor can only be built on a real, non-nullable column."""
+        try:
+            field = model._meta.get_field(ordering[0].lstrip('-'))
+        except FieldDoesNotExist:
+            return ordering[0].lstrip('-') == 'pk'
+        return not field.null
@@ -0,0 +1,62 @@
+"""
+Read-replica routing.
+
+Replicas are the aliases listed in DATABASE_REPLICA_ALIASES (built from
+the DATABASE_REPLICAS environment variable in settings). Reads go to a
+random replica only inside ``replica_reads()``. Everything else, including
+every write and any read made while admitting a booking, stays on the
+primary. A view has to opt in explicitly, and only pages that tolerate
+replication lag do so: ReplicaReadsMixin does this for catalogue listing.
+
+Replicas never receive migrations; they are copies of the primary (kept in
+sync by the database's own replication, or by ``manage.py sync_replicas``
+for local SQLite stand-ins).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICA_ALIASES', [])
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if replicas and _replica_reads.get():
+            return random.choice(replicas)
+        # No opinion: Django falls back to the instance's database, then the primary
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
+
+
+class ReplicaReadsMixin:
+    """Serve ``list`` from a read replica when replicas are configured."""
+
+    def list(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().list(request, *args, **kwargs)
@@ -0,0 +1,164 @@
+"""
+Full-text search over hotels and restaurants.
+
+On SQLite the listings are mirrored into an FTS5 virtual table,
+``core_search_index``, created by core's migrations. Prefix indexes make
+``taj*``-style queries cheap, and results are ranked with bm25, with name
+matches weighted above location, category and description.
+
+Rows are keyed by rowid: ``id * 2`` for hotels and ``id * 2 + 1`` for
+restaurants. Re-indexing or removing one listing is then a rowid lookup
+and never scans the index. Signals in core.signals keep the table in step
+with saves and deletes. ``rebuild()`` repopulates it from scratch.
+
+Other database backends have no FTS5 table. There, search() falls back to
+unranked ``icontains`` matching on the same fields.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from hotels.models import HotelDataModel
+from restaurants.models import RestaurantDataModel
+
+TABLE = 'core_search_index'
+KINDS = {'hotel': 0, 'restaurant': 1}
+# bm25 column weights: name, city, area, category, description
+WEIGHTS = (10.0, 4.0, 4.0, 2.0, 1.0)
+
+CREATE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(
+        name, city, area, category, description,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+"""
+DROP_SQL = f"DROP TABLE IF EXISTS {TABLE}"
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_supported(using=None):
+    return (using or connection).vendor == 'sqlite'
+
+
+def _rowid(kind, object_id):
+    return object_id * 2 + KINDS[kind]
+
+
+def _document(kind, obj):
+    category = obj.badge if kind == 'hotel' else f"{obj.badge} {obj.cuisine_type}"
+    return (obj.name, obj.city, obj.area, category or '', obj.description or '')
+
+
+def index(kind, obj):
+    """Insert or refresh one listing in the index."""
+    if not is_supported():
+        return
+    rowid = _rowid(kind, obj.pk)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [rowid])
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, name, city, area, category, description) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)",
+            [rowid, *_document(kind, obj)],
+        )
+
+
+def unindex(kind, object_id):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [_rowid(kind, object_id)])
+
+
+def rebuild(batch_size=2000):
+    """Repopulate the whole index from the listing tables. Returns rows indexed."""
+    if not is_supported():
+        return 0
+    sources = (
+        ('hotel', HotelDataModel.objects.only('name', 'city', 'area', 'badge', 'description')),
+        ('restaurant', RestaurantDataModel.objects.only(
+            'name', 'city', 'area', 'badge', 'cuisine_type', 'description')),
+    )
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        for kind, queryset in sources:
+            batch = []
+            for obj in queryset.order_by().iterator(chunk_size=batch_size):
+                batch.append([_rowid(kind, obj.pk), *_document(kind, obj)])
+                if len(batch) >= batch_size:
+                    total += _insert_batch(cursor, batch)
+                    batch = []
+            total += _insert_batch(cursor, batch)
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+    return total
+
+
+def _insert_batch(cursor, rows):
+    if rows:
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (rowid, name, city, area, category, description) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+    return len(rows)
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 query: every word must match, the last one
+    as a prefix so results show up while the user is still typing.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' AND '.join(terms)
+
+
+def search(query, kind=None, limit=20):
+    """
+    Ranked ``(kind, object_id, score)`` tuples for ``query``, best first.
+
+    ``kind`` restricts results to 'hotel' or 'restaurant'. Lower scores are
+    better matches (bm25 convention); the fallback path reports 0.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    if not is_supported():
+        return _fallback_search(query, kind, limit)
+
+    sql = f"SELECT rowid, bm25({TABLE}, {', '.join(map(str, WEIGHTS))}) AS score FROM {TABLE} WHERE {TABLE} MATCH %s"
+    params = [expression]
+    if kind:
+        sql += " AND rowid %% 2 = %s"
+        params.append(KINDS[kind])
+    sql += " ORDER BY score LIMIT %s"
+    params.append(limit)
+
+    kinds_by_bit = {bit: name for name, bit in KINDS.items()}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(kinds_by_bit[rowid % 2], rowid // 2, score) for rowid, score in cursor.fetchall()]
+
+
+def _fallback_search(query, kind, limit):
+    results = []
+    tokens = _TOKEN_RE.findall(query)
+    for name, model in (('hotel', HotelDataModel), ('restaurant', RestaurantDataModel)):
+        if kind and kind != name:
+            continue
+        condition = Q()
+        for token in tokens:
+            condition &= (
+                Q(name__icontains=token) | Q(city__icontains=token)
+                | Q(area__icontains=token) | Q(description__icontains=token)
+            )
+        ids = model.objects.filter(condition).values_list('id', flat=True)[:limit]
+        results.extend((name, object_id, 0.0) for object_id in ids)
+    return results[:limit]
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from hotels.models import Amenity, HotelDataModel
+from restaurants.models import RestaurantDataModel
+
+from . import cache, images, jobs, search
+from .middleware import install_query_timer
+
+User = get_user_model()
+
+SEARCHABLE = {HotelDataModel: 'hotel', RestaurantDataModel: 'restaurant'}
+
+
+@receiver(connection_created)
+def time_request_queries(sender, connection, **kwargs):
+    install_query_timer(connection)
+
+
+@receiver(post_save, sender=HotelDataModel)
+@receiver(post_save, sender=RestaurantDataModel)
+def index_listing(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index(SEARCHABLE[sender], instance)
+
+
+@receiver(post_delete, sender=HotelDataModel)
+@receiver(post_delete, sender=RestaurantDataModel)
+def unindex_listing(sender, instance, **kwargs):
+    search.unindex(SEARCHABLE[sender], instance.pk)
+
+
+@receiver(post_save, sender=HotelDataModel)
+@receiver(post_save, sender=RestaurantDataModel)
+def build_image_derivatives(sender, instance, raw=False, **kwargs):
+    # Encoding AVIF/WebP takes seconds, so a run_jobs worker does it after the request
+    if not raw and images.is_stale(instance, sender.IMAGE_FIELDS):
+        jobs.enqueue('core.tasks.refresh_image_derivatives', model=sender._meta.label_lower, pk=instance.pk)
+
+
+@receiver(post_save, sender=HotelDataModel)
+@receiver(post_delete, sender=HotelDataModel)
+@receiver(post_save, sender=RestaurantDataModel)
+@receiver(post_delete, sender=RestaurantDataModel)
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def invalidate_catalogue_cache(sender, **kwargs):
+    cache.bump_version(sender)
+
+
+# Listings embed their owner's name, so renaming a user invalidates both catalogues
+OWNER_NAME_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=User)
+def invalidate_catalogue_owner_names(sender, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not OWNER_NAME_FIELDS & set(update_fields)):
+        return
+    for model in SEARCHABLE:
+        cache.bump_version(model)
@@ -0,0 +1,16 @@
+from django.apps import apps
+
+from . import cache, images
+
+# Background jobs for the core app; queued with core.jobs.enqueue
+
+
+def refresh_image_derivatives(model, pk):
+    """Build the image variants of one listing (queued by core.signals on save)."""
+    model_class = apps.get_model(model)
+    instance = model_class.objects.only('id', 'image_derivatives', *model_class.IMAGE_FIELDS).filter(pk=pk).first()
+    if instance is None:
+        return
+    if images.refresh(instance, model_class.IMAGE_FIELDS):
+        # The manifest is saved with a queryset update, which bypasses the cache signals
+        cache.bump_version(model_class)
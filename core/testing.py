@@ -0,0 +1,59 @@
+"""
+Test helpers shared by the app test suites.
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+
+class QuietLogsTestRunner(DiscoverRunner):
+    """
+    The default runner, minus the JSON event lines on stderr.
+
+    Every logger configured in settings.LOGGING writes to a NullHandler for
+    the duration of the run. Tests that check events capture them with
+    ``assertLogs``, which still sees every record.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._log_handlers = {}
+        for name in settings.LOGGING.get('loggers', {}):
+            logger = logging.getLogger(name)
+            self._log_handlers[name] = logger.handlers
+            logger.handlers = [logging.NullHandler()]
+
+    def teardown_test_environment(self, **kwargs):
+        for name, handlers in self._log_handlers.items():
+            logging.getLogger(name).handlers = handlers
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryCountGuardMixin:
+    """
+    Fail a list endpoint whose query count grows with the number of rows.
+
+    ``add_rows(n)`` must create ``n`` more rows that show up in the response.
+    The endpoint is fetched once with a few rows and again after adding more;
+    an N+1 shows up as a different query count.
+    """
+
+    def assertListQueriesConstant(self, client, url, add_rows, small=2, large=10):
+        add_rows(small)
+        with CaptureQueriesContext(connection) as baseline:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        add_rows(large - small)
+        with CaptureQueriesContext(connection) as grown:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        self.assertEqual(
+            len(grown), len(baseline),
+            f"{url} ran {len(baseline)} queries for {small} rows but {len(grown)} for {large}:\n"
+            + "\n".join(query['sql'] for query in grown.captured_queries),
+        )
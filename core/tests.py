@@ -0,0 +1,190 @@
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import benchmark, metrics, search
+from core.management.commands.benchmark import BENCHMARK_DIR
+from hotels.models import HotelDataModel
+from restaurants.models import RestaurantDataModel
+from users.models import User
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.taj = HotelDataModel.objects.create(
+            name='Taj Malabar', city='Kochi', area='Willingdon Island', description='Harbour views')
+        self.harbour = HotelDataModel.objects.create(
+            name='Harbour House', city='Kochi', area='Fort', description='Near the Taj ferry jetty')
+        self.cafe = RestaurantDataModel.objects.create(
+            name='Kashi Art Cafe', city='Kochi', area='Fort', badge='Cafe', cuisine_type='Continental',
+            average_cost_for_two=800, description='-', image='restaurants/r.jpg',
+        )
+
+    def _ids(self, query, **params):
+        response = self.client.get('/api/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(result['type'], result['id']) for result in response.json()['results']]
+
+    def test_saves_and_deletes_keep_the_index_in_step(self):
+        self.assertEqual(self._ids('kashi'), [('restaurant', self.cafe.id)])
+        self.cafe.name = 'Loafers Corner'
+        self.cafe.save()
+        self.assertEqual(self._ids('kashi'), [])
+        self.assertEqual(self._ids('loafers'), [('restaurant', self.cafe.id)])
+
+        self.cafe.delete()
+        self.assertEqual(self._ids('loafers'), [])
+        # A rebuild from the tables gives the same index
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self._ids('malabar'), [('hotel', self.taj.id)])
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(self._ids('taj'), [('hotel', self.taj.id), ('hotel', self.harbour.id)])
+        self.assertEqual(self._ids('harbour'), [('hotel', self.harbour.id), ('hotel', self.taj.id)])
+        # The last word matches as a prefix; every word must match
+        self.assertEqual(self._ids('kochi fo', type='hotel'), [('hotel', self.harbour.id)])
+        self.assertEqual(self._ids('kochi', type='restaurant'), [('restaurant', self.cafe.id)])
+
+    def test_queries_are_reduced_to_quoted_words(self):
+        self.assertEqual(search.match_expression('taj" OR name:* NEAR(-kochi'),
+                         '"taj" AND "OR" AND "name" AND "NEAR" AND "kochi"*')
+        self.assertIsNone(search.match_expression('"*:^()'))
+        # FTS5 syntax in the query is searched for, never interpreted (or a syntax error)
+        for query in ['"', 'taj OR', 'name:taj', '*', 'NEAR(taj kochi)', '-taj']:
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get('/api/search/', {'q': query}).status_code, 200)
+        self.assertEqual(self._ids('name:taj'), [])
+        self.assertEqual(self.client.get('/api/search/', {'q': ' '}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'taj', 'type': 'spa'}).status_code, 400)
+
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings = override_settings(METRICS_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        metrics.clear()
+        self.client = APIClient()
+        HotelDataModel.objects.create(name='Taj', city='Kochi', area='Fort', description='-')
+
+    def test_requests_are_recorded_per_endpoint(self):
+        render = JSONRenderer.render
+
+        def slow_render(renderer, *args, **kwargs):
+            time.sleep(0.05)
+            return render(renderer, *args, **kwargs)
+
+        with mock.patch.object(JSONRenderer, 'render', slow_render):
+            # Rendered by the catalogue cache on a miss, then by the handler for an authenticated user
+            self.client.get('/api/hotels/')
+            self.client.force_authenticate(User.objects.create_user(email='guest@example.com'))
+            self.client.get('/api/hotels/')
+        # A cache hit renders nothing
+        self.client.force_authenticate(None)
+        self.client.get('/api/hotels/')
+
+        endpoint = next(name for name in metrics.report() if 'hotel' in name and 'list' in name)
+        numbers = metrics.report()[endpoint]
+        self.assertEqual(numbers['total_ms']['count'], 3)
+        # Only the render itself counts as render time, whichever path rendered
+        self.assertGreaterEqual(numbers['render_ms']['p50'], 45)
+        self.assertLess(numbers['render_ms']['p50'], numbers['total_ms']['p50'])
+        self.assertGreater(numbers['queries']['max'], 0)
+        self.assertGreater(numbers['response_bytes']['mean'], 0)
+
+    def test_queries_are_counted_under_asgi(self):
+        # The ORM runs in a sync thread there, not the event loop's thread the middleware runs in
+        for path in ('/api/hotels/', '/api/restaurants/'):
+            self.assertEqual(async_to_sync(AsyncClient().get)(path).status_code, 200)
+
+        report = metrics.report()
+        for kind in ('hotel', 'restaurant'):
+            numbers = next(data for name, data in report.items() if kind in name and 'list' in name)
+            self.assertGreater(numbers['queries']['max'], 0)
+            self.assertGreater(numbers['db_ms']['max'], 0)
+
+    def test_metrics_view_is_admin_only_and_resets(self):
+        self.client.get('/api/hotels/')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+        self.client.force_authenticate(User.objects.create_superuser(email='admin@example.com', password='x'))
+        self.assertTrue(any('hotel' in name for name in self.client.get('/api/metrics/').json()))
+
+        self.assertEqual(self.client.delete('/api/metrics/').status_code, 204)
+        metrics.registry.reset()
+        self.assertEqual(metrics.report(), {})
+
+    def test_snapshots_merge_across_workers_and_dead_workers_are_pruned(self):
+        self.client.get('/api/hotels/')
+        snapshot = metrics.registry.snapshot()
+        # A worker that is still running, and one that has exited
+        live = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        self.addCleanup(live.wait)
+        self.addCleanup(live.kill)
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+        for pid in (live.pid, dead.pid):
+            with open(os.path.join(self.directory, f'{pid}.json'), 'w') as handle:
+                json.dump(snapshot, handle)
+
+        report = metrics.report()
+        self.assertEqual(sorted(os.listdir(self.directory)), [f'{live.pid}.json'])
+        self.assertEqual({data['total_ms']['count'] for data in report.values()}, {2})
+
+
+class BenchmarkTests(TestCase):
+
+    def test_summary_counts_client_errors_and_measures_throughput(self):
+        timings = {
+            'list': [(10.0, 200), (30.0, 404), (20.0, 500), (40.0, 200)],
+            'create': [(5.0, 201)],
+            'unused': [],
+        }
+        results = benchmark.summarize(timings, elapsed=2.0)
+        self.assertEqual(results['list'], {
+            'requests': 4, 'errors': 2, 'rps': 2.0, 'p50': 20.0, 'p95': 40.0, 'p99': 40.0,
+        })
+        # Completed requests per second of the run, not 1 / mean latency
+        self.assertEqual(results['create']['rps'], 0.5)
+        self.assertEqual(results['__all__'], {'requests': 5, 'errors': 2, 'rps': 2.5})
+        self.assertNotIn('unused', results)
+
+    def test_compare_flags_slower_p95_and_lower_throughput(self):
+        baseline = {'list': {'p95': 10.0}, '__all__': {'rps': 100.0}}
+        self.assertEqual(benchmark.compare({'list': {'p95': 12.0}, '__all__': {'rps': 80.0}}, baseline, 0.25), [])
+        self.assertEqual(len(benchmark.compare({'list': {'p95': 13.0}, '__all__': {'rps': 70.0}}, baseline, 0.25)), 2)
+
+    def test_seeded_mix_replays_without_errors(self):
+        benchmark.seed({
+            'users': 10, 'hotels': 6, 'rooms_per_hotel': 2, 'bookings': 30, 'restaurants': 6, 'reservations': 30,
+        }, rng=random.Random(0))
+        self.assertEqual(HotelDataModel.objects.count(), 6)
+        
+        specs = benchmark.load_mix(BENCHMARK_DIR / 'request_mix.jsonl')
+        timings, elapsed = benchmark.replay(specs, 60, rng=random.Random(1), warmup=0)
+        self.assertEqual(sum(len(samples) for samples in timings.values()), 60)
+        self.assertGreater(elapsed, 0)
+        failures = {
+            name: code for name, samples in timings.items() for _, code in samples
+            if code >= 400 and not name.endswith('-create')
+        }
+        self.assertEqual(failures, {})
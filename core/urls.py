@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import MetricsView, SearchView
+
+urlpatterns = [
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('search/', SearchView.as_view(), name='search'),
+]
@@ -0,0 +1,72 @@
+from rest_framework.permissions import IsAdminUser, AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework import status
+
+from hotels.models import HotelDataModel
+from hotels.serializers import HotelListSerializer
+from restaurants.models import RestaurantDataModel
+from restaurants.serializers import RestaurantSerializer
+from users.authentication import StatelessJWTAuthentication
+
+from . import metrics, search
+
+
+class MetricsView(APIView):
+    """
+    GET: Per-endpoint request metrics (percentiles) merged across workers
+    DELETE: Reset the collected metrics
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics.report())
+
+    def delete(self, request):
+        metrics.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SearchView(APIView):
+    """
+    GET: Ranked full-text search over hotels and restaurants
+    ?q=taj kochi&type=hotel|restaurant&limit=20 (the last word matches as a prefix)
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [AllowAny]
+    sources = {
+        'hotel': (HotelDataModel, HotelListSerializer),
+        'restaurant': (RestaurantDataModel, RestaurantSerializer),
+    }
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        kind = request.query_params.get('type') or None
+        if not query:
+            return Response({"error": "Missing parameter q"}, status=status.HTTP_400_BAD_REQUEST)
+        if kind and kind not in self.sources:
+            return Response({"error": "type must be hotel or restaurant"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits = search.search(query, kind=kind, limit=limit)
+
+        # One query per listing type for the matched rows, then keep the ranked order
+        listings = {}
+        for name, (model, serializer_class) in self.sources.items():
+            ids = [object_id for hit_kind, object_id, _ in hits if hit_kind == name]
+            if not ids:
+                continue
+            objects = model.objects.select_related(*serializer_class.select_related_fields).in_bulk(ids)
+            serialized = serializer_class(list(objects.values()), many=True, context={'request': request}).data
+            listings.update({(name, item['id']): item for item in serialized})
+
+        results = [
+            {"type": hit_kind, "id": object_id, "score": round(score, 4), "listing": listings[(hit_kind, object_id)]}
+            for hit_kind, object_id, score in hits
+            if (hit_kind, object_id) in listings
+        ]
+        return Response({"query": query, "results": results})
@@ -1,7 +1,11 @@
-from django.contrib import admin
-from hotels.models import HotelDataModel, Booking # Import Booking
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+from hotels.models import Amenity, HotelDataModel, Booking, Room # Import Booking
 from django.utils.html import format_html
 
+from core import images
+from hotels import inventory
+
 # customize the admin display for HotelDataModel (optional but recommended)
 class HotelAdmin(admin.ModelAdmin):
     list_display = ('name', 'city', 'price', 'total_rooms', 'owner','image_preview','image_preview2','image_preview3','image_preview4')
@@ -11,7 +15,7 @@ class HotelAdmin(admin.ModelAdmin):
     def image_preview(self,obj):
         if obj.image:
             return format_html('<img src="{}" width="100" height="100" style="object-fit: cover;"/>',
-                               obj.image.url
+                               images.preview_url(obj, 'image')
                                )
         return " No image !!!"
     image_preview.short_description = 'image'
@@ -19,7 +23,7 @@ class HotelAdmin(admin.ModelAdmin):
     def image_preview2(self,obj):
         if obj.room_image1:
             return format_html('<img src="{}" width="100" height="100" style="object-fit: cover;"/>',
-                               obj.room_image1.url
+                               images.preview_url(obj, 'room_image1')
                                )
         return " No image !!!"
     image_preview2.short_description = 'image'
@@ -27,7 +31,7 @@ class HotelAdmin(admin.ModelAdmin):
     def image_preview3(self,obj):
         if obj.room_image2:
             return format_html('<img src="{}" width="100" height="100" style="object-fit: cover;"/>',
-                               obj.room_image2.url
+                               images.preview_url(obj, 'room_image2')
                                )
         return " No image !!!"
     image_preview3.short_description = 'image'
@@ -35,7 +39,7 @@ class HotelAdmin(admin.ModelAdmin):
     def image_preview4(self,obj):
         if obj.environment_image:
             return format_html('<img src="{}" width="100" height="100" style="object-fit: cover;"/>',
-                               obj.environment_image.url
+                               images.preview_url(obj, 'environment_image')
                                )
         return " No image !!!"
     image_preview4.short_description = 'image'
@@ -48,7 +52,7 @@ class BookingAdmin(admin.ModelAdmin):
     date_hierarchy = 'check_in'
 
 class BookingAdmin(admin.ModelAdmin):
-    list_display = ('user', 'hotel', 'check_in', 'check_out', 'status')
+    list_display = ('user', 'hotel', 'room', 'check_in', 'check_out', 'status')
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         
@@ -62,5 +66,30 @@ class BookingAdmin(admin.ModelAdmin):
         # Filter booking queryset
         return qs.filter(hotel__in=my_hotels)
 
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        # Booking.save() refuses nights past the hotel's (or room type's) capacity.
+        # The admin's transaction is rolled back whole; send the user back to the form.
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except inventory.RoomsUnavailable as exc:
+            self.message_user(request, str(exc), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+# Amenities are created from the listings' amenity strings; renaming one here
+# changes how it is shown in facets
+class AmenityAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name', 'slug')
+
+
+# Room types; total_rooms is the capacity bookings for the type are admitted against
+class RoomAdmin(admin.ModelAdmin):
+    list_display = ('room_type', 'hotel', 'price', 'adults', 'children', 'total_rooms')
+    search_fields = ('room_type', 'hotel__name')
+    list_select_related = ('hotel',)
+
+
 admin.site.register(HotelDataModel, HotelAdmin)
-admin.site.register(Booking, BookingAdmin)
\ No newline at end of file
+admin.site.register(Booking, BookingAdmin)
+admin.site.register(Amenity, AmenityAdmin)
+admin.site.register(Room, RoomAdmin)
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Normalized amenities for hotels and rooms.
+
+Listings keep taking amenities as a comma-separated string, and the API
+still returns that string's items in their original order. On save, the
+string is also normalized into Amenity rows plus HotelAmenity/RoomAmenity
+links. The link tables are indexed both ways, so the hotel list can filter
+by amenity (``?amenity=wifi&amenity=pool`` means both) and count amenities
+across the filtered hotels in one grouped query (``?facets=amenities``).
+Two spellings with the same slug ("Wi-Fi", "wi fi") are the same amenity;
+the first name seen is kept.
+
+The links are derived data, like the night inventory. ``rebuild()`` (or
+``manage.py rebuild_amenities``) recomputes them from the strings.
+"""
+from django.db.models import Count, F
+from django.utils.text import slugify
+
+from .models import Amenity, HotelAmenity, HotelDataModel, Room, RoomAmenity
+
+
+def parse(text):
+    """``{slug: name}`` for the items of a comma-separated string, in order."""
+    items = {}
+    for name in (text or '').split(','):
+        name = name.strip()
+        # Capped like the name, so filters (which parse the same way) still match
+        slug = slugify(name)[:100].rstrip('-')
+        if slug and slug not in items:
+            items[slug] = name[:100]
+    return items
+
+
+def amenity_ids(items):
+    """Ids for ``{slug: name}``, creating the amenities that don't exist yet."""
+    if not items:
+        return {}
+    Amenity.objects.bulk_create(
+        [Amenity(slug=slug, name=name) for slug, name in items.items()], ignore_conflicts=True,
+    )
+    return dict(Amenity.objects.filter(slug__in=items).values_list('slug', 'id'))
+
+
+def _sync(link_model, owner_field, owner_id, text):
+    wanted = set(amenity_ids(parse(text)).values())
+    links = link_model.objects.filter(**{owner_field: owner_id})
+    current = set(links.values_list('amenity_id', flat=True))
+    if current - wanted:
+        links.filter(amenity_id__in=current - wanted).delete()
+    link_model.objects.bulk_create(
+        [link_model(**{owner_field: owner_id, 'amenity_id': amenity_id}) for amenity_id in wanted - current],
+        ignore_conflicts=True,
+    )
+
+
+def sync_hotel(hotel):
+    _sync(HotelAmenity, 'hotel_id', hotel.pk, hotel.amenities)
+
+
+def sync_room(room):
+    _sync(RoomAmenity, 'room_id', room.pk, room.amenities)
+
+
+def rebuild(batch_size=2000):
+    """Recompute every amenity link from the strings. Returns the number of links written."""
+    written = 0
+    for model, link_model, owner_field in (
+        (HotelDataModel, HotelAmenity, 'hotel_id'),
+        (Room, RoomAmenity, 'room_id'),
+    ):
+        rows = list(model.objects.exclude(amenities__isnull=True).values_list('id', 'amenities'))
+        parsed = [(owner_id, parse(text)) for owner_id, text in rows]
+        names = {}
+        for _, items in parsed:
+            for slug, name in items.items():
+                names.setdefault(slug, name)
+        ids = amenity_ids(names)
+        link_model.objects.all().delete()
+        links = [
+            link_model(**{owner_field: owner_id, 'amenity_id': ids[slug]})
+            for owner_id, items in parsed for slug in items
+        ]
+        link_model.objects.bulk_create(links, batch_size=batch_size)
+        written += len(links)
+    return written
+
+
+def filter_hotels(queryset, slugs):
+    """Hotels having every amenity in ``slugs``."""
+    slugs = set(slugs)
+    matching = (
+        HotelAmenity.objects.filter(amenity__slug__in=slugs)
+        .values('hotel_id')
+        .annotate(matched=Count('amenity_id'))
+        .filter(matched=len(slugs))
+        .values('hotel_id')
+    )
+    return queryset.filter(id__in=matching)
+
+
+def facet_counts(hotels):
+    """``[{'slug', 'name', 'count'}]`` over ``hotels``, most common first, in one query."""
+    return list(
+        HotelAmenity.objects.filter(hotel_id__in=hotels.values('id'))
+        .values(slug=F('amenity__slug'), name=F('amenity__name'))
+        .annotate(count=Count('id'))
+        .order_by('-count', 'name')
+    )
+
+
+def requested_facets(params, hotels):
+    """The ``facets`` block for a hotel list response, or None if not asked for."""
+    if 'amenities' not in ','.join(params.getlist('facets')).split(','):
+        return None
+    return {'amenities': facet_counts(hotels)}
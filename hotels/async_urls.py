@@ -0,0 +1,18 @@
+from django.urls import path
+
+from .async_views import AsyncHotelAvailabilityView, AsyncHotelDetailView, AsyncHotelListView
+from .views import HotelViewSet
+
+# Mounted ahead of hotels.urls by auth/urls_async.py; names match the router's
+urlpatterns = [
+    path('hotels/', AsyncHotelListView.as_view(
+        fallback=HotelViewSet.as_view({'get': 'list', 'post': 'create'}),
+    ), name='hotels-list'),
+    path('hotels/<int:pk>/', AsyncHotelDetailView.as_view(
+        fallback=HotelViewSet.as_view({
+            'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+        }),
+    ), name='hotels-detail'),
+    path('bookings/check_availability/', AsyncHotelAvailabilityView.as_view(),
+         name='bookings-check-availability'),
+]
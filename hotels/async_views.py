@@ -0,0 +1,84 @@
+"""
+Async-native hotel reads for ASGI deployments (see core.async_views).
+
+Each view returns the same payload as the sync endpoint on its path.
+"""
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
+from django.utils.dateparse import parse_date
+
+from core.async_views import AsyncAPIView
+from core.filters import int_param
+from core.mixins import eager_load
+from core.routers import replica_reads
+from . import amenities, inventory
+from .models import HotelDataModel
+from .serializers import HotelListRowSerializer, HotelListSerializer
+from .views import HotelViewSet
+
+
+class AsyncHotelListView(AsyncAPIView):
+    """GET /api/hotels/: HotelViewSet.list"""
+    cache_models = HotelViewSet.cache_models
+    filter_backends = HotelViewSet.filter_backends
+    ordering_fields = HotelViewSet.ordering_fields
+
+    async def get(self, request):
+        row_serializer = HotelListRowSerializer(context={'request': request})
+        queryset = self.filter_queryset(request, HotelViewSet.queryset.all())
+        with replica_reads():
+            page, paginator = await self.paginate(request, queryset.values(*row_serializer.columns))
+            facets = await sync_to_async(amenities.requested_facets)(request.GET, queryset)
+        data = paginator.get_paginated_response(row_serializer.serialize(page)).data
+        if facets is not None:
+            data['facets'] = facets
+        return self.render(data)
+
+
+class AsyncHotelDetailView(AsyncAPIView):
+    """GET /api/hotels/<pk>/: HotelViewSet.retrieve"""
+    cache_models = HotelViewSet.cache_models
+
+    async def get(self, request, pk):
+        hotel = await aget_object_or_404(eager_load(HotelDataModel.objects.all(), HotelListSerializer), pk=pk)
+        return self.render(HotelListSerializer(hotel, context={'request': request}).data)
+
+
+class AsyncHotelAvailabilityView(AsyncAPIView):
+    """GET /api/bookings/check_availability/: BookingViewSet.check_availability"""
+
+    async def get(self, request):
+        hotel_id = request.GET.get('hotel_id')
+        check_in = request.GET.get('check_in')
+        check_out = request.GET.get('check_out')
+
+        if not all([hotel_id, check_in, check_out]):
+            return self.render({"error": "Missing parameters"}, status=400)
+
+        try:
+            check_in = parse_date(check_in)
+            check_out = parse_date(check_out)
+        except ValueError:
+            check_in = check_out = None
+        if not check_in or not check_out or check_in >= check_out:
+            return self.render({"error": "Invalid dates"}, status=400)
+
+        # The hotel row and its night ledger don't depend on each other: look both up at once
+        try:
+            hotel, booked_rooms = await asyncio.gather(
+                HotelDataModel.objects.only('total_rooms').aget(id=hotel_id),
+                inventory.apeak_rooms_booked(hotel_id, check_in, check_out),
+            )
+        except HotelDataModel.DoesNotExist:
+            return self.render({"error": "Hotel not found"}, status=404)
+
+        if hotel.total_rooms <= 0:
+            return self.render({"available": False, "message": "Room is full"})
+
+        rooms_needed = math.ceil(int_param(request.GET, 'number_of_guests', default=2, minimum=1) / 2)
+        if booked_rooms + rooms_needed > hotel.total_rooms:
+            return self.render({"available": False, "message": "Room is full"})
+        return self.render({"available": True, "message": "Room available"})
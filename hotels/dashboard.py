@@ -0,0 +1,74 @@
+"""
+Owner dashboard aggregates for hotels (see core.dashboard).
+
+Days are stay days. A booking that is not cancelled counts once in
+``bookings`` on its check-in day. Each of its nights counts its rooms in
+``room_nights`` and its guests in ``guests``. A cancelled booking only
+counts in ``cancellations`` on its check-in day. Completed stays keep
+their counts, so past days stay filled in. Occupancy is room_nights over
+the hotel's total_rooms, computed when read.
+"""
+from django.db.models import F
+
+from core import dashboard
+from .inventory import stay_nights
+from .models import Booking, HotelDailyStats
+
+COUNTERS = ('bookings', 'cancellations', 'room_nights', 'guests')
+
+
+def booking_footprint(hotel_id, check_in, check_out, status, rooms_booked, number_of_guests):
+    if check_in >= check_out:
+        return None
+    if status == 'cancelled':
+        return {(hotel_id, check_in): {'cancellations': 1}}
+    footprint = {
+        (hotel_id, night): {'room_nights': rooms_booked, 'guests': number_of_guests}
+        for night in stay_nights(check_in, check_out)
+    }
+    footprint[(hotel_id, check_in)]['bookings'] = 1
+    return footprint
+
+
+def apply_change(previous, current):
+    dashboard.apply_change(HotelDailyStats, 'hotel_id', previous, current)
+
+
+def rebuild(hotels=None):
+    """Recompute the daily stats from Booking rows; returns the number of rows written."""
+    stale = HotelDailyStats.objects.all()
+    bookings = Booking.objects.filter(check_in__lt=F('check_out'))
+    if hotels is not None:
+        stale = stale.filter(hotel__in=hotels)
+        bookings = bookings.filter(hotel__in=hotels)
+    rows = bookings.values_list('hotel_id', 'check_in', 'check_out', 'status', 'rooms_booked', 'number_of_guests')
+    footprints = (booking_footprint(*row) for row in rows.iterator(chunk_size=2000))
+    return dashboard.rebuild(HotelDailyStats, 'hotel_id', footprints, stale)
+
+
+def _with_occupancy(counts, room_capacity, days=1):
+    return {**counts, 'occupancy': dashboard.percent(counts['room_nights'], room_capacity * days)}
+
+
+def summary(hotels, start, end):
+    """Totals, per-hotel and per-day figures for ``hotels`` between ``start`` and ``end`` (inclusive)."""
+    hotels = list(hotels.values('id', 'name', 'total_rooms').order_by('id'))
+    stats = HotelDailyStats.objects.filter(
+        hotel_id__in=[hotel['id'] for hotel in hotels], date__gte=start, date__lte=end,
+    )
+    by_hotel, by_day = dashboard.sums(stats, 'hotel_id', COUNTERS)
+    empty = dict.fromkeys(COUNTERS, 0)
+    days = dashboard.window_days(start, end)
+    total_rooms = sum(hotel['total_rooms'] for hotel in hotels)
+    totals = {counter: sum(row[counter] for row in by_hotel.values()) for counter in COUNTERS}
+    return {
+        'start': start,
+        'end': end,
+        'totals': _with_occupancy(totals, total_rooms, len(days)),
+        'hotels': [
+            {'hotel': hotel['id'], 'name': hotel['name'], 'total_rooms': hotel['total_rooms'],
+             **_with_occupancy(by_hotel.get(hotel['id'], empty), hotel['total_rooms'], len(days))}
+            for hotel in hotels
+        ],
+        'days': [{'date': day, **_with_occupancy(by_day.get(day, empty), total_rooms)} for day in days],
+    }
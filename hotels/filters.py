@@ -0,0 +1,37 @@
+from rest_framework.filters import BaseFilterBackend
+
+from core.filters import decimal_param, int_param
+from . import amenities
+
+
+class HotelFilterBackend(BaseFilterBackend):
+    """
+    Query-parameter filters for the hotel catalogue:
+    ?city=&area=&badge=&min_price=&max_price=&min_rooms=&amenity=
+
+    Equality filters are exact so (city, badge, price) can be served from
+    the composite index on HotelDataModel.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        for field in ('city', 'area', 'badge'):
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+
+        min_price = decimal_param(params, 'min_price')
+        max_price = decimal_param(params, 'max_price')
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+
+        min_rooms = int_param(params, 'min_rooms')
+        if min_rooms is not None:
+            queryset = queryset.filter(total_rooms__gte=min_rooms)
+
+        # ?amenity=wifi&amenity=pool (or ?amenity=WiFi,Pool): hotels having all of them, matched by slug
+        slugs = {slug for value in params.getlist('amenity') for slug in amenities.parse(value)}
+        if slugs:
+            queryset = amenities.filter_hotels(queryset, slugs)
+        return queryset
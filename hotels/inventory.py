@@ -0,0 +1,201 @@
+"""
+Per-night room inventory for hotels.
+
+Every confirmed Booking adds its ``rooms_booked`` to one RoomNightInventory
+row per night of the stay (check-in night included, check-out night not).
+The rooms taken for a stay is then the busiest night in that range, which is
+at most one indexed row per night no matter how many bookings the hotel has.
+
+Claims are admitted with a guarded UPDATE (only nights that still have room
+are incremented) while the hotel row is locked, so two bookings racing for
+the last rooms cannot both succeed.
+
+Bookings that name a room type are also recorded per night in
+RoomTypeNightInventory. They are admitted only if both that room type's
+``total_rooms`` and the hotel's still have room (under locks on the hotel
+and Room rows), so the hotel ledger counts every booked room and the hotel
+is never oversold, whichever way its rooms were booked.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Max, Q
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Booking, HotelDataModel, Room, RoomNightInventory, RoomTypeNightInventory
+
+
+class RoomsUnavailable(Exception):
+    """Raised when a claim would take a night past the hotel's total_rooms."""
+
+    def __init__(self, available, requested):
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Only {available} rooms are available for these dates. You requested {requested}."
+        )
+
+
+def stay_nights(check_in, check_out):
+    """Return the nights covered by a stay, check-out day excluded."""
+    return [check_in + timedelta(days=offset) for offset in range((check_out - check_in).days)]
+
+
+def booking_footprint(hotel_id, check_in, check_out, status, rooms_booked, room_id=None):
+    """What a booking occupies in the ledgers, or None if it holds no rooms."""
+    if status != 'confirmed' or not rooms_booked or check_in >= check_out:
+        return None
+    return (hotel_id, check_in, check_out, rooms_booked, room_id)
+
+
+def adjust(hotel_id, check_in, check_out, delta, capacity=None):
+    """
+    Add ``delta`` rooms (negative to release) to every night of the stay.
+
+    With ``capacity`` set, a claim only goes through if every night stays at
+    or below it; otherwise RoomsUnavailable is raised and the caller's
+    transaction should be rolled back.
+    """
+    _adjust(RoomNightInventory, 'hotel_id', hotel_id, check_in, check_out, delta, capacity)
+
+
+def adjust_room(room_id, check_in, check_out, delta, capacity=None):
+    """adjust() for one room type's ledger."""
+    _adjust(RoomTypeNightInventory, 'room_id', room_id, check_in, check_out, delta, capacity)
+
+
+def _adjust(ledger_model, owner_field, owner_id, check_in, check_out, delta, capacity):
+    nights = stay_nights(check_in, check_out)
+    if not nights or not delta:
+        return
+    ledger = ledger_model.objects.filter(
+        **{owner_field: owner_id}, night__gte=check_in, night__lt=check_out
+    )
+    if delta > 0:
+        if capacity is not None:
+            peak = ledger.aggregate(peak=Max('rooms_booked'))['peak'] or 0
+            if peak + delta > capacity:
+                raise RoomsUnavailable(max(capacity - peak, 0), delta)
+            # Guard the write as well, for backends where the hotel row lock is a no-op
+            ledger = ledger.filter(rooms_booked__lte=capacity - delta)
+        ledger_model.objects.bulk_create(
+            [ledger_model(**{owner_field: owner_id}, night=night) for night in nights],
+            ignore_conflicts=True,
+        )
+    updated = ledger.update(rooms_booked=F('rooms_booked') + delta)
+    if delta > 0 and capacity is not None and updated != len(nights):
+        # Lost a race after the check; the caller's rollback undoes partial increments
+        raise RoomsUnavailable(max(capacity - peak, 0), delta)
+
+
+def apply_change(previous, current):
+    """
+    Move a booking's footprint from ``previous`` to ``current``.
+
+    Both arguments are tuples from booking_footprint() (or None for "holds
+    nothing"), so creation, cancellation and date/room changes all go through
+    the same release-then-claim step. Must run inside a transaction: the
+    claim locks the hotel (and room type) row and may raise RoomsUnavailable.
+    """
+    if previous == current:
+        return
+    if previous:
+        hotel_id, check_in, check_out, rooms, room_id = previous
+        adjust(hotel_id, check_in, check_out, -rooms)
+        if room_id:
+            adjust_room(room_id, check_in, check_out, -rooms)
+    if current:
+        hotel_id, check_in, check_out, rooms, room_id = current
+        # Always hotel first, then room type, so concurrent claims lock in the same order
+        hotel = HotelDataModel.objects.select_for_update().only('total_rooms').get(pk=hotel_id)
+        if room_id:
+            room = Room.objects.select_for_update().only('total_rooms').get(pk=room_id)
+            adjust_room(room_id, check_in, check_out, rooms, capacity=room.total_rooms)
+        adjust(hotel_id, check_in, check_out, rooms, capacity=hotel.total_rooms)
+
+
+def _stay_ledger(hotel, check_in, check_out):
+    return RoomNightInventory.objects.filter(hotel=hotel, night__gte=check_in, night__lt=check_out)
+
+
+def peak_rooms_booked(hotel, check_in, check_out):
+    """Rooms already taken on the busiest night between check-in and check-out."""
+    return _stay_ledger(hotel, check_in, check_out).aggregate(peak=Max('rooms_booked'))['peak'] or 0
+
+
+async def apeak_rooms_booked(hotel, check_in, check_out):
+    """Async peak_rooms_booked(); ``hotel`` may be a hotel or its id."""
+    result = await _stay_ledger(hotel, check_in, check_out).aaggregate(peak=Max('rooms_booked'))
+    return result['peak'] or 0
+
+
+def rooms_available(hotel, check_in, check_out):
+    return max(hotel.total_rooms - peak_rooms_booked(hotel, check_in, check_out), 0)
+
+
+def hotel_availability(hotels, check_in, check_out):
+    """
+    ``id``, ``name``, ``total_rooms`` and ``rooms_left`` for every hotel in
+    ``hotels``, in one grouped query. The join only reaches the stay's
+    nights, through the (hotel, night) index.
+    """
+    return (
+        hotels.alias(stay=FilteredRelation('night_inventory', condition=Q(
+            night_inventory__night__gte=check_in, night_inventory__night__lt=check_out,
+        )))
+        .values('id', 'name', 'total_rooms')
+        .annotate(rooms_left=Greatest(F('total_rooms') - Coalesce(Max('stay__rooms_booked'), 0), 0))
+        .order_by('id')
+    )
+
+
+def peak_room_type_booked(room, check_in, check_out):
+    """peak_rooms_booked() for one room type."""
+    ledger = RoomTypeNightInventory.objects.filter(room=room, night__gte=check_in, night__lt=check_out)
+    return ledger.aggregate(peak=Max('rooms_booked'))['peak'] or 0
+
+
+def rebuild(hotels=None):
+    """
+    Recompute the hotel and room type ledgers from confirmed Booking rows.
+
+    ``hotels`` limits the rebuild to a queryset/list of hotels; by default the
+    whole ledger is rebuilt. Returns the number of inventory rows written.
+    """
+    ledger = RoomNightInventory.objects.all()
+    room_ledger = RoomTypeNightInventory.objects.all()
+    bookings = Booking.objects.filter(status='confirmed', check_in__lt=F('check_out'))
+    if hotels is not None:
+        ledger = ledger.filter(hotel__in=hotels)
+        room_ledger = room_ledger.filter(room__hotel__in=hotels)
+        bookings = bookings.filter(hotel__in=hotels)
+
+    totals = {}
+    room_totals = {}
+    rows = bookings.values_list('hotel_id', 'room_id', 'check_in', 'check_out', 'rooms_booked')
+    for hotel_id, room_id, check_in, check_out, rooms in rows.iterator(chunk_size=2000):
+        for night in stay_nights(check_in, check_out):
+            key = (hotel_id, night)
+            totals[key] = totals.get(key, 0) + rooms
+            if room_id:
+                key = (room_id, night)
+                room_totals[key] = room_totals.get(key, 0) + rooms
+
+    with transaction.atomic():
+        ledger.delete()
+        room_ledger.delete()
+        RoomNightInventory.objects.bulk_create(
+            [
+                RoomNightInventory(hotel_id=hotel_id, night=night, rooms_booked=rooms)
+                for (hotel_id, night), rooms in totals.items()
+            ],
+            batch_size=1000,
+        )
+        RoomTypeNightInventory.objects.bulk_create(
+            [
+                RoomTypeNightInventory(room_id=room_id, night=night, rooms_booked=rooms)
+                for (room_id, night), rooms in room_totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals) + len(room_totals)
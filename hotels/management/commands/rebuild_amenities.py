@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from hotels import amenities
+
+
+class Command(BaseCommand):
+    help = "Rebuild the hotel and room amenity links from their comma-separated amenity strings."
+
+    def handle(self, *args, **options):
+        links = amenities.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {links} amenity links."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from hotels import inventory
+from hotels.models import HotelDataModel
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-night room inventory ledger from confirmed bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hotel', type=int, action='append', dest='hotel_ids',
+            help="Only rebuild the ledger for this hotel id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        hotels = None
+        if options['hotel_ids']:
+            hotels = HotelDataModel.objects.filter(id__in=options['hotel_ids'])
+
+        rows = inventory.rebuild(hotels)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} night inventory rows."))
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:18
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_night_inventory(apps, schema_editor):
+    Booking = apps.get_model('hotels', 'Booking')
+    RoomNightInventory = apps.get_model('hotels', 'RoomNightInventory')
+
+    totals = {}
+    bookings = Booking.objects.filter(status='confirmed').values_list(
+        'hotel_id', 'check_in', 'check_out', 'rooms_booked'
+    )
+    for hotel_id, check_in, check_out, rooms in bookings.iterator():
+        for offset in range((check_out - check_in).days):
+            key = (hotel_id, check_in + datetime.timedelta(days=offset))
+            totals[key] = totals.get(key, 0) + rooms
+
+    RoomNightInventory.objects.bulk_create(
+        [
+            RoomNightInventory(hotel_id=hotel_id, night=night, rooms_booked=rooms)
+            for (hotel_id, night), rooms in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0011_hoteldatamodel_amenities'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hoteldatamodel',
+            name='badge',
+            field=models.CharField(blank=True, choices=[('Luxury Stays', 'Luxury Stays'), ('Cheap & Best', 'Cheap & Best'), ('Dormitory', 'Dormitory')], max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='hoteldatamodel',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='hotels/'),
+        ),
+        migrations.AlterField(
+            model_name='hoteldatamodel',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(max_length=100)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('adults', models.PositiveIntegerField(default=1)),
+                ('children', models.PositiveIntegerField(default=0)),
+                ('total_rooms', models.PositiveIntegerField(default=1)),
+                ('bed_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('room_size', models.CharField(blank=True, max_length=50, null=True)),
+                ('amenities', models.TextField(blank=True, help_text='Comma separated list of amenities', null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='hotels/rooms/')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rooms', to='hotels.hoteldatamodel')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RoomNightInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('rooms_booked', models.PositiveIntegerField(default=0)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='night_inventory', to='hotels.hoteldatamodel')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('hotel', 'night'), name='unique_hotel_night_inventory')],
+            },
+        ),
+        migrations.RunPython(build_night_inventory, migrations.RunPython.noop),
+    ]
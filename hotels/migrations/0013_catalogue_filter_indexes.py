@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0012_room_night_inventory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hoteldatamodel',
+            index=models.Index(fields=['city', 'badge', 'price'], name='hotel_city_badge_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hoteldatamodel',
+            index=models.Index(fields=['city', 'area'], name='hotel_city_area_idx'),
+        ),
+    ]
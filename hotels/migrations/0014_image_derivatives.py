@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0013_catalogue_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hoteldatamodel',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def backfill_amenities(apps, schema_editor):
+    # Same normalization as hotels.amenities.parse(), frozen here
+    Amenity = apps.get_model('hotels', 'Amenity')
+    sources = [
+        (apps.get_model('hotels', 'HotelDataModel'), apps.get_model('hotels', 'HotelAmenity'), 'hotel_id'),
+        (apps.get_model('hotels', 'Room'), apps.get_model('hotels', 'RoomAmenity'), 'room_id'),
+    ]
+    names = {}
+    parsed = {}
+    for model, link_model, owner_field in sources:
+        parsed[link_model] = []
+        rows = model.objects.exclude(amenities__isnull=True).values_list('id', 'amenities')
+        for owner_id, text in rows.iterator():
+            slugs = []
+            for name in text.split(','):
+                name = name.strip()
+                slug = slugify(name)
+                if slug and slug not in slugs:
+                    slugs.append(slug)
+                    names.setdefault(slug, name[:100])
+            parsed[link_model].append((owner_id, slugs))
+
+    Amenity.objects.bulk_create([Amenity(slug=slug, name=name) for slug, name in names.items()], batch_size=1000)
+    ids = dict(Amenity.objects.values_list('slug', 'id'))
+    for _, link_model, owner_field in sources:
+        link_model.objects.bulk_create(
+            [
+                link_model(**{owner_field: owner_id, 'amenity_id': ids[slug]})
+                for owner_id, slugs in parsed[link_model] for slug in slugs
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0014_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Amenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'amenities',
+            },
+        ),
+        migrations.CreateModel(
+            name='HotelAmenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amenity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hotel_links', to='hotels.amenity')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='amenity_links', to='hotels.hoteldatamodel')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='hoteldatamodel',
+            name='amenity_tags',
+            field=models.ManyToManyField(blank=True, related_name='hotels', through='hotels.HotelAmenity', to='hotels.amenity'),
+        ),
+        migrations.CreateModel(
+            name='RoomAmenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amenity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_links', to='hotels.amenity')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='amenity_links', to='hotels.room')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='amenity_tags',
+            field=models.ManyToManyField(blank=True, related_name='rooms', through='hotels.RoomAmenity', to='hotels.amenity'),
+        ),
+        migrations.AddIndex(
+            model_name='hotelamenity',
+            index=models.Index(fields=['amenity', 'hotel'], name='hotel_amenity_lookup_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hotelamenity',
+            constraint=models.UniqueConstraint(fields=('hotel', 'amenity'), name='unique_hotel_amenity'),
+        ),
+        migrations.AddIndex(
+            model_name='roomamenity',
+            index=models.Index(fields=['amenity', 'room'], name='room_amenity_lookup_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='roomamenity',
+            constraint=models.UniqueConstraint(fields=('room', 'amenity'), name='unique_room_amenity'),
+        ),
+        migrations.RunPython(backfill_amenities, migrations.RunPython.noop),
+    ]
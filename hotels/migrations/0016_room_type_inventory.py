@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-18 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0015_amenities'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='hotels.room'),
+        ),
+        migrations.CreateModel(
+            name='RoomTypeNightInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('rooms_booked', models.PositiveIntegerField(default=0)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='night_inventory', to='hotels.room')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('room', 'night'), name='unique_room_night_inventory')],
+            },
+        ),
+    ]
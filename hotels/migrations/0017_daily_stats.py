@@ -0,0 +1,60 @@
+# Generated by Django 5.2.11 on 2026-10-18 11:04
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_daily_stats(apps, schema_editor):
+    Booking = apps.get_model('hotels', 'Booking')
+    HotelDailyStats = apps.get_model('hotels', 'HotelDailyStats')
+
+    totals = {}
+    bookings = Booking.objects.values_list(
+        'hotel_id', 'check_in', 'check_out', 'status', 'rooms_booked', 'number_of_guests'
+    )
+    for hotel_id, check_in, check_out, status, rooms, guests in bookings.iterator():
+        if check_in >= check_out:
+            continue
+        first = totals.setdefault((hotel_id, check_in), {})
+        if status == 'cancelled':
+            first['cancellations'] = first.get('cancellations', 0) + 1
+            continue
+        first['bookings'] = first.get('bookings', 0) + 1
+        for offset in range((check_out - check_in).days):
+            day = totals.setdefault((hotel_id, check_in + datetime.timedelta(days=offset)), {})
+            day['room_nights'] = day.get('room_nights', 0) + rooms
+            day['guests'] = day.get('guests', 0) + guests
+
+    HotelDailyStats.objects.bulk_create(
+        [HotelDailyStats(hotel_id=hotel_id, date=day, **counts) for (hotel_id, day), counts in totals.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0016_room_type_inventory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotelDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings', models.PositiveIntegerField(default=0, help_text='Stays (not cancelled) checking in this day')),
+                ('cancellations', models.PositiveIntegerField(default=0, help_text='Cancelled stays that would have checked in this day')),
+                ('room_nights', models.PositiveIntegerField(default=0, help_text='Rooms occupied this night')),
+                ('guests', models.PositiveIntegerField(default=0, help_text='Guests staying this night')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='hotels.hoteldatamodel')),
+            ],
+            options={
+                'verbose_name_plural': 'hotel daily stats',
+                'constraints': [models.UniqueConstraint(fields=('hotel', 'date'), name='unique_hotel_daily_stats')],
+            },
+        ),
+        migrations.RunPython(build_daily_stats, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
 # Get the user model (works with custom User models too)
@@ -34,14 +34,55 @@ class HotelDataModel(models.Model):
 
     description = models.TextField()
     amenities = models.TextField(null=True, blank=True)
+    # Normalized from ``amenities`` on save, for filtering and facets (see hotels.amenities)
+    amenity_tags = models.ManyToManyField(
+        'Amenity', through='HotelAmenity', related_name='hotels', blank=True
+    )
     image = models.ImageField(upload_to='hotels/', blank=True, null=True)
     room_image1 = models.ImageField(upload_to='hotels/rooms/', blank=True, null=True)
     room_image2 = models.ImageField(upload_to='hotels/rooms/', blank=True, null=True)
     environment_image = models.ImageField(upload_to='hotels/environment/', blank=True, null=True)
+    # Resized/recompressed variants of the images above, maintained by core.images
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
+
+    IMAGE_FIELDS = ('image', 'room_image1', 'room_image2', 'environment_image')
 
     def __str__(self):
         return self.name
+
+    class Meta:
+        # Serve the catalogue filters in hotels.filters from an index
+        indexes = [
+            models.Index(fields=['city', 'badge', 'price'], name='hotel_city_badge_price_idx'),
+            models.Index(fields=['city', 'area'], name='hotel_city_area_idx'),
+        ]
     
+class Amenity(models.Model):
+    """One distinct amenity; ``slug`` is the filter value (?amenity=room-service)."""
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+
+    class Meta:
+        verbose_name_plural = 'amenities'
+
+    def __str__(self):
+        return self.name
+
+
+class HotelAmenity(models.Model):
+    hotel = models.ForeignKey(HotelDataModel, on_delete=models.CASCADE, related_name='amenity_links')
+    amenity = models.ForeignKey(Amenity, on_delete=models.CASCADE, related_name='hotel_links')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'amenity'], name='unique_hotel_amenity'),
+        ]
+        # amenity -> hotels, for filters; the unique constraint covers hotel -> amenities
+        indexes = [
+            models.Index(fields=['amenity', 'hotel'], name='hotel_amenity_lookup_idx'),
+        ]
+
+
 class Room(models.Model):
     hotel = models.ForeignKey(HotelDataModel, on_delete=models.CASCADE, related_name='rooms')
     room_type = models.CharField(max_length=100)
@@ -52,11 +93,27 @@ class Room(models.Model):
     bed_type = models.CharField(max_length=50, null=True, blank=True)
     room_size = models.CharField(max_length=50, null=True, blank=True)
     amenities = models.TextField(null=True, blank=True, help_text="Comma separated list of amenities")
+    amenity_tags = models.ManyToManyField(
+        'Amenity', through='RoomAmenity', related_name='rooms', blank=True
+    )
     description = models.TextField(null=True, blank=True)
     image = models.ImageField(upload_to='hotels/rooms/', null=True, blank=True)
     
     def __str__(self):
         return f"{self.room_type} - {self.hotel.name}"
+
+
+class RoomAmenity(models.Model):
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='amenity_links')
+    amenity = models.ForeignKey(Amenity, on_delete=models.CASCADE, related_name='room_links')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'amenity'], name='unique_room_amenity'),
+        ]
+        indexes = [
+            models.Index(fields=['amenity', 'room'], name='room_amenity_lookup_idx'),
+        ]
     
 
 # [NEW] Booking Model for handling reservations
@@ -77,6 +134,14 @@ class Booking(models.Model):
         on_delete=models.CASCADE, 
         related_name='bookings'
     )
+    # Optional room type; without one the booking draws on the hotel's total_rooms
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.CASCADE,
+        related_name='bookings',
+        null=True,
+        blank=True
+    )
     
     check_in = models.DateField()
     check_out = models.DateField()
@@ -86,12 +151,81 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def save(self, *args, **kwargs):
-        # Auto-calculate rooms needed if not provided or too low (2 guests per room)
+        # Auto-calculate rooms needed if not provided or too low
+        # (the room type's occupancy, or 2 guests per room)
         import math
-        min_rooms = math.ceil(self.number_of_guests / 2)
+        min_rooms = math.ceil(self.number_of_guests / self.guests_per_room())
         if not self.rooms_booked or self.rooms_booked < min_rooms:
             self.rooms_booked = min_rooms
-        super().save(*args, **kwargs)
+        # Keep the booking row and its night inventory in step (see hotels.signals)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def guests_per_room(self):
+        if self.room_id:
+            return max(self.room.adults + self.room.children, 1)
+        return 2
+
+    def __str__(self):
+        return f"{self.user} - {self.hotel.name} ({self.rooms_booked} rooms, {self.number_of_guests} guests)"
+
+
+# [NEW] Per-night inventory ledger, maintained from Booking writes (see hotels.inventory)
+class RoomNightInventory(models.Model):
+    hotel = models.ForeignKey(
+        HotelDataModel,
+        on_delete=models.CASCADE,
+        related_name='night_inventory'
+    )
+    night = models.DateField()
+    rooms_booked = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'night'], name='unique_hotel_night_inventory'),
+        ]
+
+    def __str__(self):
+        return f"{self.hotel_id} @ {self.night}: {self.rooms_booked} booked"
+
+
+# Per-night ledger for one room type, maintained from Booking writes that name a room (see hotels.inventory)
+class RoomTypeNightInventory(models.Model):
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.CASCADE,
+        related_name='night_inventory'
+    )
+    night = models.DateField()
+    rooms_booked = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'night'], name='unique_room_night_inventory'),
+        ]
+
+    def __str__(self):
+        return f"room {self.room_id} @ {self.night}: {self.rooms_booked} booked"
+
+
+# Per-hotel daily totals for the owner dashboard, maintained from Booking writes (see hotels.dashboard)
+class HotelDailyStats(models.Model):
+    hotel = models.ForeignKey(
+        HotelDataModel,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+    bookings = models.PositiveIntegerField(default=0, help_text="Stays (not cancelled) checking in this day")
+    cancellations = models.PositiveIntegerField(default=0, help_text="Cancelled stays that would have checked in this day")
+    room_nights = models.PositiveIntegerField(default=0, help_text="Rooms occupied this night")
+    guests = models.PositiveIntegerField(default=0, help_text="Guests staying this night")
+
+    class Meta:
+        verbose_name_plural = 'hotel daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'date'], name='unique_hotel_daily_stats'),
+        ]
 
     def __str__(self):
-        return f"{self.user} - {self.hotel.name} ({self.rooms_booked} rooms, {self.number_of_guests} guests)"
\ No newline at end of file
+        return f"{self.hotel_id} @ {self.date}"
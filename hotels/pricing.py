@@ -0,0 +1,139 @@
+"""
+Room-type search and pricing.
+
+A search ("2 adults, 1 child, these dates") is answered in two steps:
+
+1. One grouped query over the candidate Room rows. For each room type it
+   joins that type's night ledger and the hotel's night ledger
+   (hotels.inventory) for the stay. It returns the rooms of the type still
+   free on every night, the rooms the hotel as a whole still has free
+   (bookings may also be made hotel-wide), and the price of the whole stay.
+2. For each hotel, a small bounded knapsack over those offers picks the
+   cheapest set of rooms that sleeps the party, taking no more rooms than
+   the hotel has free. Children may use adult places, but adults may not
+   use child places.
+
+Nothing is queried per room or per hotel, however many match.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, FilteredRelation, Max, Q, Value
+from django.db.models.functions import Coalesce
+
+from .models import Room
+
+# Keeps the knapsack small; larger groups book in several searches
+MAX_GUESTS = 12
+
+
+def room_offers(rooms, check_in, check_out):
+    """
+    ``rooms`` annotated with ``available``, ``hotel_available`` and
+    ``stay_price``, as dicts.
+
+    Room types with no room free on some night of the stay, or in hotels
+    with no room free, are left out.
+    """
+    nights = (check_out - check_in).days
+    # Both ledgers are joined on the stay's nights; the cross product only repeats values, which Max ignores
+    return list(
+        rooms.alias(
+            stay=FilteredRelation('night_inventory', condition=Q(
+                night_inventory__night__gte=check_in, night_inventory__night__lt=check_out,
+            )),
+            hotel_stay=FilteredRelation('hotel__night_inventory', condition=Q(
+                hotel__night_inventory__night__gte=check_in, hotel__night_inventory__night__lt=check_out,
+            )),
+        )
+        .values('id', 'hotel_id', 'hotel__name', 'room_type', 'price', 'adults', 'children', 'total_rooms')
+        .annotate(
+            available=F('total_rooms') - Coalesce(Max('stay__rooms_booked'), 0),
+            hotel_available=F('hotel__total_rooms') - Coalesce(Max('hotel_stay__rooms_booked'), 0),
+            stay_price=ExpressionWrapper(
+                F('price') * Value(nights), output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+        .filter(available__gt=0, hotel_available__gt=0)
+        .order_by('hotel_id', 'price', 'id')
+    )
+
+
+def cheapest_combination(offers, adults, children, max_rooms=None):
+    """
+    The cheapest ``[(offer, count)]`` of at most ``max_rooms`` rooms that
+    sleeps ``adults`` and ``children``, or None if the offers can't.
+    Ties go to fewer rooms.
+    """
+    guests = adults + children
+    max_rooms = guests if max_rooms is None else min(max_rooms, guests)
+    # (adult places, all places, rooms), places capped at what the party needs -> (price, offers taken)
+    best = {(0, 0, 0): (Decimal(0), ())}
+    for offer in offers:
+        sleeps = offer['adults'] + offer['children']
+        if not sleeps:
+            continue
+        # Each copy is one more room of this type on top of any combination found so far
+        for _ in range(min(offer['available'], max_rooms)):
+            for (adult_places, places, count), (price, taken) in list(best.items()):
+                if count == max_rooms:
+                    continue
+                key = (min(adult_places + offer['adults'], adults), min(places + sleeps, guests), count + 1)
+                candidate = (price + offer['stay_price'], taken + (offer,))
+                if key not in best or candidate[0] < best[key][0]:
+                    best[key] = candidate
+    found = min(
+        ((price, count, taken) for (adult_places, places, count), (price, taken) in best.items()
+         if (adult_places, places) == (adults, guests)),
+        key=lambda option: option[:2], default=None,
+    )
+    if found is None:
+        return None
+    counts = {}
+    for offer in found[2]:
+        counts[offer['id']] = counts.get(offer['id'], 0) + 1
+    return [(offer, counts.pop(offer['id'])) for offer in found[2] if offer['id'] in counts]
+
+
+def search(rooms, check_in, check_out, adults, children=0, limit=20):
+    """
+    The cheapest way to sleep the party at each hotel in ``rooms``,
+    cheapest hotel first, at most ``limit`` hotels.
+    """
+    by_hotel = {}
+    for offer in room_offers(rooms, check_in, check_out):
+        by_hotel.setdefault(offer['hotel_id'], []).append(offer)
+
+    results = []
+    for hotel_id, offers in by_hotel.items():
+        combination = cheapest_combination(offers, adults, children, max_rooms=offers[0]['hotel_available'])
+        if combination is None:
+            continue
+        results.append({
+            'hotel': hotel_id,
+            'hotel_name': offers[0]['hotel__name'],
+            'total_price': sum(offer['stay_price'] * count for offer, count in combination),
+            'rooms': [
+                {
+                    'room': offer['id'],
+                    'room_type': offer['room_type'],
+                    'count': count,
+                    'adults': offer['adults'],
+                    'children': offer['children'],
+                    'price_per_night': offer['price'],
+                    'stay_price': offer['stay_price'] * count,
+                }
+                for offer, count in combination
+            ],
+        })
+    results.sort(key=lambda result: (result['total_price'], result['hotel']))
+    return results[:limit]
+
+
+def candidate_rooms(hotel_ids=None, city=None):
+    # Exact city match, served by the hotel catalogue index
+    rooms = Room.objects.all()
+    if hotel_ids:
+        rooms = rooms.filter(hotel_id__in=hotel_ids)
+    if city:
+        rooms = rooms.filter(hotel__city=city)
+    return rooms
@@ -1,7 +1,12 @@
+from functools import lru_cache
+
 from rest_framework import serializers
 from .models import HotelDataModel, Booking, Room  # Import Booking
+from . import inventory, pricing
+from core import images
+from core.rows import SKIP, RowSerializer, media_url
+from users.authentication import full_user
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 
 User = get_user_model()
 
@@ -16,9 +21,15 @@ class HotelCreateSerializer(serializers.ModelSerializer):
         ]
 
     def create(self, validated_data):
-        user = self.context['request'].user
+        user = full_user(self.context['request'].user)
         return HotelDataModel.objects.create(owner=user, **validated_data)
 
+@lru_cache(maxsize=1024)
+def split_amenities(amenities):
+    # Comma separated, whitespace stripped; listings share a handful of distinct strings
+    return tuple(a.strip() for a in amenities.split(',') if a.strip())
+
+
 class HotelListSerializer(serializers.ModelSerializer):
     owner = serializers.CharField(source="owner.username", read_only=True)
     amenities = serializers.SerializerMethodField()
@@ -26,6 +37,10 @@ class HotelListSerializer(serializers.ModelSerializer):
     room_image1 = serializers.SerializerMethodField()
     room_image2 = serializers.SerializerMethodField()
     environment_image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
+
+    # Relations read per row; applied by core.mixins.EagerLoadingMixin
+    select_related_fields = ('owner',)
 
     class Meta:
         model = HotelDataModel
@@ -45,12 +60,12 @@ class HotelListSerializer(serializers.ModelSerializer):
             'room_image1',
             'room_image2',
             'environment_image',
+            'image_variants',
         ]
     
     def get_amenities(self, obj):
         if obj.amenities:
-            # Split by comma and strip whitespace
-            return [a.strip() for a in obj.amenities.split(',') if a.strip()]
+            return list(split_amenities(obj.amenities))
         return []
 
     def get_image(self, obj):
@@ -77,15 +92,77 @@ class HotelListSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.environment_image.url)
         return None
 
+    def get_image_variants(self, obj):
+        # {field: {'thumb'|'card'|'full': {'jpeg'|'webp'|'avif': url}}}
+        request = self.context.get("request")
+        if not request:
+            return {}
+        return images.variant_urls(obj, HotelDataModel.IMAGE_FIELDS, request.build_absolute_uri)
+
+
+class HotelListRowSerializer(RowSerializer):
+    """HotelListSerializer's output from ``.values()`` rows, for list responses (core.rows)."""
+    serializer_class = HotelListSerializer
+    columns = (
+        'id', 'owner', 'owner__username', 'name', 'city', 'area', 'badge', 'price', 'old_price',
+        'total_rooms', 'description', 'amenities', *HotelDataModel.IMAGE_FIELDS, 'image_derivatives',
+    )
+
+    def converters(self):
+        request = self.context.get("request")
+        urls = {
+            field_name: media_url(request, HotelDataModel._meta.get_field(field_name).storage)
+            for field_name in HotelDataModel.IMAGE_FIELDS
+        } if request else {}
+
+        def image(field_name):
+            url = urls.get(field_name)
+            if url is None:
+                return lambda row: None
+            return lambda row: url(row[field_name]) if row[field_name] else None
+
+        def amenities(row):
+            return list(split_amenities(row['amenities'])) if row['amenities'] else []
+
+        def image_variants(row):
+            if not urls:
+                return {}
+            return images.manifest_urls(
+                row['image_derivatives'],
+                {field_name: row[field_name] for field_name in HotelDataModel.IMAGE_FIELDS},
+                lambda field_name, name: urls[field_name](name),
+            )
+
+        return {
+            'id': self.column('id'),
+            'owner': lambda row: SKIP if row['owner'] is None else row['owner__username'],
+            'name': self.column('name'),
+            'city': self.column('city'),
+            'area': self.column('area'),
+            'badge': self.column('badge'),
+            'price': self.field('price'),
+            'old_price': self.field('old_price'),
+            'total_rooms': self.column('total_rooms'),
+            'description': self.column('description'),
+            'amenities': amenities,
+            'image': image('image'),
+            'room_image1': image('room_image1'),
+            'room_image2': image('room_image2'),
+            'environment_image': image('environment_image'),
+            'image_variants': image_variants,
+        }
+
 
 # [NEW] Serializer for Booking
 class BookingSerializer(serializers.ModelSerializer):
     # Nested serializer to get full hotel details (Read Only)
     hotel_details = HotelListSerializer(source='hotel', read_only=True)
 
+    select_related_fields = ('hotel__owner',)
+
     class Meta:
         model = Booking
-        fields = ['id', 'hotel', 'hotel_details', 'check_in', 'check_out', 'status', 'number_of_guests', 'rooms_booked']
+        fields = ['id', 'hotel', 'room', 'hotel_details', 'check_in', 'check_out', 'status', 'number_of_guests', 'rooms_booked']
         read_only_fields = ['user', 'status', 'rooms_booked']
 
     def validate(self, data):
@@ -93,18 +170,22 @@ class BookingSerializer(serializers.ModelSerializer):
         Check if room is available for the given dates.
         """
         hotel = data['hotel']
+        room = data.get('room')
         check_in = data['check_in']
         check_out = data['check_out']
         number_of_guests = data.get('number_of_guests', 2)
 
         if check_in >= check_out:
             raise serializers.ValidationError("Check-out date must be after check-in.")
+        if room is not None and room.hotel_id != hotel.id:
+            raise serializers.ValidationError({"room": "This room type belongs to another hotel."})
 
-        # 1. Calculate rooms needed for THIS booking (1 room per 2 guests)
-        # Use provided 'rooms_booked' or calculate minimum from guests (1 room per 2 guests)
+        # 1. Calculate rooms needed for THIS booking (1 room per 2 guests, or the room type's occupancy)
+        # Use provided 'rooms_booked' or calculate minimum from guests
         requested_rooms = data.get('rooms_booked')
         import math
-        min_rooms = math.ceil(number_of_guests / 2)
+        guests_per_room = max(room.adults + room.children, 1) if room else 2
+        min_rooms = math.ceil(number_of_guests / guests_per_room)
 
         if not requested_rooms or requested_rooms < min_rooms:
             requested_rooms = min_rooms
@@ -114,18 +195,16 @@ class BookingSerializer(serializers.ModelSerializer):
         total_rooms = hotel.total_rooms
 
         if total_rooms > 0:
-            # 3. Sum rooms already booked for overlapping dates
-            from django.db.models import Sum
-            overlapping_rooms = Booking.objects.filter(
-                hotel=hotel,
-                status='confirmed'
-            ).filter(
-                # Logic: (StartA < EndB) and (EndA > StartB)
-                Q(check_in__lt=check_out) & Q(check_out__gt=check_in)
-            ).aggregate(total=Sum('rooms_booked'))['total'] or 0
-
-            # 4. Check if enough rooms are left
-            available_now = total_rooms - overlapping_rooms
+            # 3. Rooms already taken on the busiest night of the stay (night inventory ledger)
+            booked_rooms = inventory.peak_rooms_booked(hotel, check_in, check_out)
+
+            # 4. Check if enough rooms are left, in the hotel and in the room type
+            available_now = total_rooms - booked_rooms
+            if room:
+                available_now = min(
+                    available_now, room.total_rooms - inventory.peak_room_type_booked(room, check_in, check_out)
+                )
+            available_now = max(available_now, 0)
             if requested_rooms > available_now:
                 raise serializers.ValidationError(
                     f"Only {available_now} rooms are available for these dates. You requested {requested_rooms}."
@@ -133,6 +212,63 @@ class BookingSerializer(serializers.ModelSerializer):
 
         return data
     
+class StaySearchSerializer(serializers.Serializer):
+    """Dates and hotels shared by the multi-hotel searches; build with ``from_query()``."""
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    hotel = serializers.ListField(child=serializers.IntegerField(), required=False)
+    city = serializers.CharField(required=False)
+
+    @classmethod
+    def from_query(cls, query_params):
+        # ?hotel= repeats; every other parameter is single-valued
+        return cls(data={**query_params.dict(), 'hotel': query_params.getlist('hotel')})
+
+    def validate(self, data):
+        if data['check_in'] >= data['check_out']:
+            raise serializers.ValidationError("Check-out date must be after check-in.")
+        if not data.get('hotel') and not data.get('city'):
+            raise serializers.ValidationError("Give a city or at least one hotel.")
+        return data
+
+
+class RoomSearchSerializer(StaySearchSerializer):
+    """Query parameters of GET /api/rooms/search/ (hotels.pricing)."""
+    adults = serializers.IntegerField(min_value=1, default=2)
+    children = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, data):
+        data = super().validate(data)
+        if data['adults'] + data['children'] > pricing.MAX_GUESTS:
+            raise serializers.ValidationError(f"Search for at most {pricing.MAX_GUESTS} guests at a time.")
+        return data
+
+
+class BulkAvailabilitySerializer(StaySearchSerializer):
+    """Query parameters of GET /api/bookings/availability/."""
+    area = serializers.CharField(required=False)
+    number_of_guests = serializers.IntegerField(min_value=1, default=2)
+
+
+class RoomOfferSerializer(serializers.Serializer):
+    room = serializers.IntegerField()
+    room_type = serializers.CharField()
+    count = serializers.IntegerField()
+    adults = serializers.IntegerField()
+    children = serializers.IntegerField()
+    price_per_night = serializers.DecimalField(max_digits=10, decimal_places=2)
+    stay_price = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class HotelOfferSerializer(serializers.Serializer):
+    """One hotel's cheapest room combination from hotels.pricing.search()."""
+    hotel = serializers.IntegerField()
+    hotel_name = serializers.CharField()
+    total_price = serializers.DecimalField(max_digits=14, decimal_places=2)
+    rooms = RoomOfferSerializer(many=True)
+
+
 class RoomSerializer(serializers.ModelSerializer):
     class Meta:
         model = Room
@@ -0,0 +1,60 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from . import amenities, dashboard, inventory
+from .models import Booking, HotelDataModel, Room
+
+# What a booking's ledger and dashboard footprints are computed from
+FOOTPRINT_FIELDS = ('hotel_id', 'check_in', 'check_out', 'status', 'rooms_booked', 'room_id', 'number_of_guests')
+
+
+def _footprints(hotel_id, check_in, check_out, status, rooms_booked, room_id, number_of_guests):
+    return (
+        inventory.booking_footprint(hotel_id, check_in, check_out, status, rooms_booked, room_id),
+        dashboard.booking_footprint(hotel_id, check_in, check_out, status, rooms_booked, number_of_guests),
+    )
+
+
+def _booking_footprints(booking):
+    return _footprints(*(getattr(booking, field) for field in FOOTPRINT_FIELDS))
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_footprint(sender, instance, **kwargs):
+    # Read what the stored row holds right now, so edits release the old nights
+    previous = (None, None)
+    if instance.pk:
+        stored = Booking.objects.filter(pk=instance.pk).values_list(*FOOTPRINT_FIELDS).first()
+        if stored:
+            previous = _footprints(*stored)
+    instance._previous_footprints = previous
+
+
+@receiver(post_save, sender=Booking)
+def update_night_inventory(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_footprints', (None, None))
+    current = _booking_footprints(instance)
+    inventory.apply_change(previous[0], current[0])
+    dashboard.apply_change(previous[1], current[1])
+    instance._previous_footprints = current
+
+
+@receiver(post_delete, sender=Booking)
+def release_night_inventory(sender, instance, **kwargs):
+    inventory_footprint, dashboard_footprint = _booking_footprints(instance)
+    inventory.apply_change(inventory_footprint, None)
+    dashboard.apply_change(dashboard_footprint, None)
+
+
+@receiver(post_save, sender=HotelDataModel)
+def sync_hotel_amenities(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'amenities' in update_fields):
+        amenities.sync_hotel(instance)
+
+
+@receiver(post_save, sender=Room)
+def sync_room_amenities(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'amenities' in update_fields):
+        amenities.sync_room(instance)
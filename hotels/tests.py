@@ -1,3 +1,791 @@
-from django.test import TestCase
+import csv
+import hashlib
+import json
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Sum
+from django.test import AsyncClient, Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from core import images, jobs
+from core.models import IdempotencyKey, Job
+from core.routers import ReplicaRouter, replica_reads
+from core.testing import QueryCountGuardMixin
+from hotels import inventory
+from hotels.models import Amenity, HotelAmenity, HotelDailyStats, HotelDataModel, Booking, Room
+from hotels.serializers import HotelListSerializer
+from users.models import User
+from users.tokens import ClaimsRefreshToken
+
+
+class ListQueryCountTests(QueryCountGuardMixin, TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='owner@example.com')
+        self.created = 0
+
+    def _add_hotels(self, count):
+        for _ in range(count):
+            self.created += 1
+            owner = User.objects.create_user(email=f'o{self.created}@example.com')
+            HotelDataModel.objects.create(
+                owner=owner, name=f'Hotel {self.created}', city='Kochi', area='Fort', description='-'
+            )
+
+    def _add_bookings(self, count):
+        for _ in range(count):
+            self._add_hotels(1)
+            hotel = HotelDataModel.objects.latest('id')
+            Booking.objects.create(
+                user=self.user, hotel=hotel, check_in=date(2030, 1, 1), check_out=date(2030, 1, 2)
+            )
+
+    def test_hotel_list(self):
+        self.assertListQueriesConstant(self.client, '/api/hotels/', self._add_hotels)
+
+    def test_booking_list(self):
+        self.client.force_authenticate(self.user)
+        self.assertListQueriesConstant(self.client, '/api/bookings/', self._add_bookings)
+
+
+class TemporaryMediaMixin:
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _upload(self, name, size=(2400, 1600)):
+        buffer = BytesIO()
+        Image.new('RGB', size, (200, 120, 40)).save(buffer, 'JPEG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageDerivativeTests(TemporaryMediaMixin, TestCase):
+
+    def test_variants_are_built_on_upload_and_served_in_list(self):
+        hotel = HotelDataModel.objects.create(
+            name='Taj', city='Kochi', area='Fort', description='-', image=self._upload('taj.jpg'),
+        )
+        # Encoding is left to a job worker; until it runs the list just has no variants
+        self.assertEqual(Job.objects.get().task, 'core.tasks.refresh_image_derivatives')
+        self.assertEqual(APIClient().get('/api/hotels/').json()['results'][0]['image_variants'], {})
+        self.assertEqual(jobs.run_pending(), 1)
+        hotel.refresh_from_db()
+        entry = hotel.image_derivatives['image']
+        self.assertEqual(entry['source'], hotel.image.name)
+        self.assertEqual(entry['formats'], images.available_formats())
+
+        storage = hotel.image.storage
+        for variant, (width, height) in images.VARIANT_SIZES.items():
+            with storage.open(images.derivative_name(hotel.image.name, variant, 'jpeg')) as handle:
+                rendered = Image.open(handle)
+                self.assertLessEqual(rendered.width, width)
+                self.assertLessEqual(rendered.height, height)
+
+        response = APIClient().get('/api/hotels/')
+        variants = response.json()['results'][0]['image_variants']
+        self.assertEqual(set(variants), {'image'})
+        self.assertEqual(set(variants['image']), set(images.VARIANT_SIZES))
+        self.assertTrue(variants['image']['thumb']['jpeg'].startswith('http://testserver/media/hotels/taj'))
+
+    def test_replacing_an_image_drops_old_variants(self):
+        hotel = HotelDataModel.objects.create(
+            name='Taj', city='Kochi', area='Fort', description='-', image=self._upload('old.jpg'),
+        )
+        jobs.run_pending()
+        hotel.refresh_from_db()
+        old_thumb = images.derivative_name(hotel.image.name, 'thumb', 'jpeg')
+        hotel.image = self._upload('new.jpg')
+        hotel.save()
+        # The old variants no longer match the image, so they aren't served in the meantime
+        self.assertEqual(images.variant_urls(hotel, HotelDataModel.IMAGE_FIELDS, str), {})
+        self.assertEqual(APIClient().get('/api/hotels/').json()['results'][0]['image_variants'], {})
+        jobs.run_pending()
+
+        storage = hotel.image.storage
+        self.assertFalse(storage.exists(old_thumb))
+        self.assertTrue(storage.exists(images.derivative_name(hotel.image.name, 'thumb', 'jpeg')))
+        hotel.refresh_from_db()
+        self.assertEqual(hotel.image_derivatives['image']['source'], hotel.image.name)
+
+    def test_unreadable_images_are_not_queued_again(self):
+        hotel = HotelDataModel.objects.create(
+            name='Taj', city='Kochi', area='Fort', description='-',
+            image=SimpleUploadedFile('broken.jpg', b'not an image', content_type='image/jpeg'),
+        )
+        jobs.run_pending()
+        hotel.refresh_from_db()
+        self.assertEqual(hotel.image_derivatives['image'], {'source': hotel.image.name, 'formats': []})
+        self.assertFalse(images.is_stale(hotel, HotelDataModel.IMAGE_FIELDS))
+        self.assertEqual(APIClient().get('/api/hotels/').json()['results'][0]['image_variants'], {})
+
+        hotel.name = 'Taj Malabar'
+        hotel.save()
+        self.assertFalse(Job.objects.filter(status='queued').exists())
+
+
+class HotelListRowSerializerTests(TemporaryMediaMixin, TestCase):
+
+    def test_list_rows_match_the_model_serializer(self):
+        owner = User.objects.create_user(email='owner@example.com', username='Owner')
+        HotelDataModel.objects.create(
+            owner=owner, name='Taj', city='Kochi', area='Fort', description='-', price=Decimal('1234.5'),
+            old_price=Decimal('1500'), amenities=' WiFi, Pool ,,', image=self._upload('taj.jpg'),
+        )
+        HotelDataModel.objects.create(
+            name='Café', city='Kochi', area='Fort', description='-', room_image1='hotels/rooms/café room.jpg',
+        )
+        HotelDataModel.objects.create(owner=owner, name='Plain', city='Kochi', area='Fort', description='-')
+        jobs.run_pending()
+
+        response = APIClient().get('/api/hotels/')
+        expected = HotelListSerializer(
+            HotelDataModel.objects.select_related('owner').order_by('-id'), many=True,
+            context={'request': response.wsgi_request},
+        ).data
+        self.assertEqual(response.json()['results'], json.loads(json.dumps(expected)))
+
+        # Keyset cursors are taken from the last row of a page
+        response = APIClient().get('/api/hotels/?page_size=2')
+        next_page = APIClient().get(response.json()['next']).json()
+        self.assertEqual([hotel['name'] for hotel in next_page['results']], ['Taj'])
+
+
+class CatalogueCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.hotel = HotelDataModel.objects.create(name='Taj', city='Kochi', area='Fort', description='-')
+
+    def test_miss_then_hit_without_queries(self):
+        for path in ['/api/hotels/', f'/api/hotels/{self.hotel.id}/']:
+            with self.subTest(path=path):
+                first = self.client.get(path)
+                self.assertEqual(first['X-Cache'], 'MISS')
+                self.assertIn('Accept', first['Vary'])
+                with self.assertNumQueries(0):
+                    second = self.client.get(path)
+                self.assertEqual(second['X-Cache'], 'HIT')
+                self.assertEqual(second.content, first.content)
+                self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etags_get_304(self):
+        etag = self.client.get('/api/hotels/')['ETag']
+        response = self.client.get('/api/hotels/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.content, response['ETag']), (304, b'', etag))
+        # Also when the entry is rebuilt, as long as the content is the same
+        cache.clear()
+        self.assertEqual(self.client.get('/api/hotels/', HTTP_IF_NONE_MATCH=f'"stale", {etag}').status_code, 304)
+        self.assertEqual(self.client.get('/api/hotels/', HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.force_authenticate(User.objects.create_user(email='guest@example.com'))
+        response = self.client.get('/api/hotels/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Cache'))
+        self.client.force_authenticate(None)
+        # Nothing was stored for anonymous requests either
+        self.assertEqual(self.client.get('/api/hotels/')['X-Cache'], 'MISS')
+
+    def test_writes_bump_the_version(self):
+        path = f'/api/hotels/{self.hotel.id}/'
+        self.client.get('/api/hotels/')
+        self.client.get(path)
+
+        self.hotel.name = 'Taj Malabar'
+        self.hotel.save()
+        for url in ['/api/hotels/', path]:
+            response = self.client.get(url)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertIn('Taj Malabar', response.content.decode())
+
+        self.hotel.delete()
+        self.assertEqual(self.client.get('/api/hotels/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(path).status_code, 404)
+
+
+class CatalogueFilterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for name, city, price, rooms in [
+            ('Taj', 'Kochi', '9000', 40), ('Oberoi', 'Kochi', None, 25), ('Leela', 'Kochi', '7000', 60),
+            ('Ramada', 'Kochi', '4000', 25), ('Zuri', 'Kumarakom', '5000', 10),
+        ]:
+            HotelDataModel.objects.create(name=name, city=city, area='-', description='-',
+                                          price=price and Decimal(price), total_rooms=rooms)
+
+    def _pages(self, **params):
+        """Every page of /api/hotels/ for ``params``, following the next links."""
+        response = self.client.get('/api/hotels/', {'page_size': 2, **params})
+        pages = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            # Keyset and offset pages have the same shape
+            self.assertEqual(list(data), ['next', 'previous', 'results'])
+            pages.append([hotel['name'] for hotel in data['results']])
+            if not data['next']:
+                return pages
+            response = self.client.get(data['next'])
+
+    def test_filters(self):
+        self.assertEqual(sum(self._pages(city='Kochi', min_price='5000', max_price='8000'), []), ['Leela'])
+        self.assertEqual(sorted(sum(self._pages(min_rooms='40'), [])), ['Leela', 'Taj'])
+        for params in [{'min_rooms': '2.5'}, {'min_rooms': 'many'}, {'min_price': 'abc'}]:
+            with self.subTest(**params):
+                self.assertEqual(self.client.get('/api/hotels/', params).status_code, 400)
+
+    def test_keyset_ordering(self):
+        self.assertEqual(self._pages(ordering='name'), [['Leela', 'Oberoi'], ['Ramada', 'Taj'], ['Zuri']])
+        self.assertEqual(self._pages(ordering='-total_rooms,-id')[0], ['Leela', 'Taj'])
+        # Unknown orderings are ignored, leaving the default newest-first keyset
+        self.assertEqual(self._pages(ordering='password')[0], ['Zuri', 'Ramada'])
+
+    def test_nullable_orderings_fall_back_to_offset_pages(self):
+        with self.assertNumQueries(1):
+            first = self.client.get('/api/hotels/', {'ordering': 'price', 'page_size': 2}).json()
+        self.assertIn('offset=2', first['next'])
+        # SQLite sorts NULL first
+        self.assertEqual(self._pages(ordering='price'), [['Oberoi', 'Ramada'], ['Zuri', 'Leela'], ['Taj']])
+        self.assertEqual(self._pages(ordering='-price', city='Kochi'), [['Taj', 'Leela'], ['Ramada', 'Oberoi']])
+
+
+class AmenityTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for name, city, amenities in [
+            ('Taj', 'Kochi', 'WiFi, Pool, Spa'),
+            ('Oberoi', 'Kochi', 'wifi,Pool'),
+            ('Leela', 'Kochi', 'WiFi'),
+            ('Hyatt', 'Mumbai', 'Pool, Spa'),
+        ]:
+            HotelDataModel.objects.create(name=name, city=city, area='Fort', description='-', amenities=amenities)
+
+    def _names(self, response):
+        return sorted(hotel['name'] for hotel in response.json()['results'])
+
+    def test_filter_by_every_requested_amenity(self):
+        self.assertEqual(self._names(self.client.get('/api/hotels/?amenity=wifi&amenity=pool')), ['Oberoi', 'Taj'])
+        self.assertEqual(self._names(self.client.get('/api/hotels/?amenity=pool,spa&city=Kochi')), ['Taj'])
+        # Names are matched the way they were stored, by slug
+        self.assertEqual(self._names(self.client.get('/api/hotels/?amenity=WiFi,%20POOL')), ['Oberoi', 'Taj'])
+        # Strings are still served as written
+        hotel = self.client.get('/api/hotels/?amenity=spa&city=Kochi').json()['results'][0]
+        self.assertEqual(hotel['amenities'], ['WiFi', 'Pool', 'Spa'])
+
+    def test_overlong_amenities_fit_the_slug_column(self):
+        long_name = 'Private infinity pool ' * 8
+        HotelDataModel.objects.create(name='Leela Palace', city='Kochi', area='Fort', description='-',
+                                      amenities=long_name)
+        slug = Amenity.objects.get(name=long_name.strip()[:100]).slug
+        self.assertLessEqual(len(slug), 100)
+        self.assertFalse(slug.endswith('-'))
+        response = self.client.get('/api/hotels/', {'amenity': long_name})
+        self.assertEqual(self._names(response), ['Leela Palace'])
+
+    def test_facets_count_the_filtered_hotels_in_one_query(self):
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get('/api/hotels/?city=Kochi')
+        cache.clear()
+        with CaptureQueriesContext(connection) as faceted:
+            response = self.client.get('/api/hotels/?city=Kochi&facets=amenities')
+        self.assertEqual(len(faceted) - len(plain), 1)
+        self.assertEqual(response.json()['facets']['amenities'], [
+            {'slug': 'wifi', 'name': 'WiFi', 'count': 3},
+            {'slug': 'pool', 'name': 'Pool', 'count': 2},
+            {'slug': 'spa', 'name': 'Spa', 'count': 1},
+        ])
+
+    def test_links_follow_edits_and_amenity_renames_invalidate_the_cache(self):
+        hotel = HotelDataModel.objects.get(name='Leela')
+        hotel.amenities = 'Pool'
+        hotel.save()
+        self.assertEqual(list(hotel.amenity_tags.values_list('slug', flat=True)), ['pool'])
+
+        path = '/api/hotels/?facets=amenities'
+        self.assertEqual(self.client.get(path)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(path)['X-Cache'], 'HIT')
+        Amenity.objects.filter(slug='pool').update(name='Swimming pool')
+        Amenity.objects.get(slug='pool').save()
+        response = self.client.get(path)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Swimming pool', [facet['name'] for facet in response.json()['facets']['amenities']])
+
+        HotelAmenity.objects.all().delete()
+        call_command('rebuild_amenities', stdout=StringIO())
+        self.assertEqual(HotelAmenity.objects.count(), 8)
+
+
+class RoomTypeBookingTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='guest@example.com')
+        self.client.force_authenticate(self.user)
+        self.hotel = HotelDataModel.objects.create(name='Taj', city='Kochi', area='Fort', description='-', total_rooms=6)
+        self.double = Room.objects.create(hotel=self.hotel, room_type='Double', price='3000.00', adults=2, total_rooms=2)
+        self.family = Room.objects.create(
+            hotel=self.hotel, room_type='Family', price='5000.00', adults=2, children=2, total_rooms=1)
+        self.single = Room.objects.create(hotel=self.hotel, room_type='Single', price='1800.00', adults=1, total_rooms=3)
+
+    def _search(self):
+        return self.client.get('/api/rooms/search/', {
+            'city': 'Kochi', 'check_in': '2030-05-01', 'check_out': '2030-05-03', 'adults': 2, 'children': 1,
+        })
+
+    def _book(self, room, guests=2):
+        return self.client.post('/api/bookings/', {
+            'hotel': self.hotel.id, 'room': room.id, 'check_in': '2030-05-01', 'check_out': '2030-05-03',
+            'number_of_guests': guests,
+        }, format='json')
+
+    def test_search_prices_the_cheapest_combination_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self._search()
+        self.assertEqual(response.status_code, 200)
+        offer = response.json()['results'][0]
+        self.assertEqual(offer['total_price'], '9600.00')
+        self.assertEqual(
+            [(room['room_type'], room['count'], room['stay_price']) for room in offer['rooms']],
+            [('Single', 1, '3600.00'), ('Double', 1, '6000.00')],
+        )
+
+        # Once the doubles are gone, the family room is the cheapest fit
+        self.assertEqual(self._book(self.double).status_code, 201)
+        self.assertEqual(self._book(self.double).status_code, 201)
+        offer = self._search().json()['results'][0]
+        self.assertEqual(offer['total_price'], '10000.00')
+        self.assertEqual([room['room_type'] for room in offer['rooms']], ['Family'])
+
+    def test_room_bookings_are_admitted_per_room_type(self):
+        self.assertEqual(self._book(self.family, guests=4).status_code, 201)
+        self.assertEqual(self._book(self.family).status_code, 400)
+        # Other room types and the hotel-wide ledger are counted separately
+        self.assertEqual(self._book(self.single, guests=1).status_code, 201)
+        self.assertEqual(inventory.peak_room_type_booked(self.family, date(2030, 5, 1), date(2030, 5, 3)), 1)
+        self.assertEqual(inventory.peak_rooms_booked(self.hotel, date(2030, 5, 1), date(2030, 5, 3)), 2)
+
+        Booking.objects.filter(room=self.family).update(status='cancelled')
+        inventory.rebuild()
+        self.assertEqual(inventory.peak_room_type_booked(self.family, date(2030, 5, 1), date(2030, 5, 3)), 0)
+        self.assertEqual(self._book(self.family, guests=4).status_code, 201)
+
+    def test_hotel_wide_and_room_type_bookings_share_the_hotel_capacity(self):
+        self.hotel.total_rooms = 1
+        self.hotel.save()
+        hotel_wide = self.client.post('/api/bookings/', {
+            'hotel': self.hotel.id, 'check_in': '2030-05-01', 'check_out': '2030-05-03',
+        }, format='json')
+        self.assertEqual(hotel_wide.status_code, 201)
+        self.assertEqual(self._book(self.single, guests=1).status_code, 400)
+        # The search doesn't offer rooms the hotel no longer has
+        self.assertEqual(self._search().json()['results'], [])
+
+        # The admission lock rejects it too, even past the serializer's early check
+        with self.assertRaises(inventory.RoomsUnavailable):
+            Booking.objects.create(user=self.user, hotel=self.hotel, room=self.single,
+                                   check_in=date(2030, 5, 2), check_out=date(2030, 5, 3), number_of_guests=1)
+        self.assertEqual(inventory.peak_rooms_booked(self.hotel, date(2030, 5, 1), date(2030, 5, 3)), 1)
+
+    def test_admin_edits_past_capacity_are_refused_with_a_message(self):
+        self.assertEqual(self._book(self.family, guests=4).status_code, 201)
+        client = Client()
+        client.force_login(User.objects.create_superuser(email='admin@example.com', password='x'))
+        response = client.post('/admin/hotels/booking/add/', {
+            'user': self.user.id, 'hotel': self.hotel.id, 'room': self.family.id,
+            'check_in': '2030-05-02', 'check_out': '2030-05-04', 'status': 'confirmed',
+            'number_of_guests': 4, 'rooms_booked': 1,
+        }, follow=True)
+        self.assertEqual(response.redirect_chain, [('/admin/hotels/booking/add/', 302)])
+        self.assertEqual([str(message) for message in response.context['messages']],
+                         ['Only 0 rooms are available for these dates. You requested 1.'])
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(inventory.peak_room_type_booked(self.family, date(2030, 5, 3), date(2030, 5, 4)), 0)
+
+    def test_search_takes_no_more_rooms_than_the_hotel_has_free(self):
+        self.hotel.total_rooms = 1
+        self.hotel.save()
+        # Double + Single would be cheaper, but only one room is left: the family room
+        offer = self._search().json()['results'][0]
+        self.assertEqual([(room['room_type'], room['count']) for room in offer['rooms']], [('Family', 1)])
+
+    def test_room_must_belong_to_the_hotel(self):
+        other = HotelDataModel.objects.create(name='Oberoi', city='Kochi', area='Fort', description='-')
+        room = Room.objects.create(hotel=other, room_type='Double', price='2000.00', adults=2)
+        response = self._book(room)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('room', response.json())
+
+
+class BulkAvailabilityTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(email='guest@example.com')
+        self.hotels = [
+            HotelDataModel.objects.create(name=f'Hotel {i}', city='Kochi', area='Fort', description='-', total_rooms=2)
+            for i in range(3)
+        ]
+        HotelDataModel.objects.create(name='Elsewhere', city='Mumbai', area='Fort', description='-')
+        # Hotel 0 is full on the second night only; hotel 1 has one room left
+        Booking.objects.create(user=user, hotel=self.hotels[0], check_in=date(2030, 5, 2), check_out=date(2030, 5, 3),
+                               number_of_guests=4)
+        Booking.objects.create(user=user, hotel=self.hotels[1], check_in=date(2030, 5, 1), check_out=date(2030, 5, 3))
+
+    def _availability(self, **params):
+        return self.client.get('/api/bookings/availability/', {
+            'check_in': '2030-05-01', 'check_out': '2030-05-03', **params,
+        })
+
+    def test_every_hotel_in_one_query(self):
+        self._availability(city='Kochi')
+        for _ in range(20):
+            HotelDataModel.objects.create(name='More', city='Kochi', area='Fort', description='-')
+        with self.assertNumQueries(1):
+            response = self._availability(city='Kochi', number_of_guests=2)
+        results = {row['hotel']: row for row in response.json()['results']}
+        self.assertEqual(len(results), 23)
+        self.assertEqual([(results[hotel.id]['rooms_left'], results[hotel.id]['available']) for hotel in self.hotels],
+                         [(0, False), (1, True), (2, True)])
+
+    def test_hotel_ids_and_validation(self):
+        response = self._availability(hotel=[self.hotels[1].id, self.hotels[2].id], number_of_guests=3)
+        self.assertEqual(response.json()['rooms_needed'], 2)
+        self.assertEqual([row['available'] for row in response.json()['results']], [False, True])
+        self.assertEqual(self._availability().status_code, 400)
+        self.assertEqual(self._availability(city='Kochi', check_out='2030-05-01').status_code, 400)
+
+
+class OwnerDashboardTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(email='owner@example.com')
+        guest = User.objects.create_user(email='guest@example.com')
+        self.client.force_authenticate(self.owner)
+        self.taj = HotelDataModel.objects.create(
+            owner=self.owner, name='Taj', city='Kochi', area='Fort', description='-', total_rooms=4)
+        self.oberoi = HotelDataModel.objects.create(
+            owner=self.owner, name='Oberoi', city='Kochi', area='Fort', description='-', total_rooms=4)
+        other = HotelDataModel.objects.create(name='Elsewhere', city='Kochi', area='Fort', description='-')
+        self.stay = Booking.objects.create(user=guest, hotel=self.taj, check_in=date(2030, 5, 1),
+                                           check_out=date(2030, 5, 3), number_of_guests=3)
+        Booking.objects.create(user=guest, hotel=self.oberoi, check_in=date(2030, 5, 2),
+                               check_out=date(2030, 5, 3), number_of_guests=2)
+        Booking.objects.create(user=guest, hotel=other, check_in=date(2030, 5, 1), check_out=date(2030, 5, 2))
+
+    def _summary(self, **params):
+        return self.client.get('/api/hotel-dashboard/summary/', {'start': '2030-05-01', 'end': '2030-05-02', **params})
+
+    def test_summary_reads_the_daily_stats(self):
+        with self.assertNumQueries(3):
+            data = self._summary().json()
+        self.assertEqual(data['totals'], {
+            'bookings': 2, 'cancellations': 0, 'room_nights': 5, 'guests': 8, 'occupancy': 31.2,
+        })
+        self.assertEqual([(hotel['name'], hotel['room_nights'], hotel['occupancy']) for hotel in data['hotels']],
+                         [('Taj', 4, 50.0), ('Oberoi', 1, 12.5)])
+        self.assertEqual([(day['date'], day['guests'], day['occupancy']) for day in data['days']],
+                         [('2030-05-01', 3, 25.0), ('2030-05-02', 5, 37.5)])
+
+    def test_dashboard_is_mounted_under_a_single_api_prefix(self):
+        self.assertEqual(reverse('hotel-dashboard-summary'), '/api/hotel-dashboard/summary/')
+        self.assertEqual(reverse('hotel-dashboard-bookings'), '/api/hotel-dashboard/bookings/')
+        self.assertEqual(reverse('hotel-dashboard-bookings-export'), '/api/hotel-dashboard/bookings/export/')
+        self.assertEqual(self.client.get('/api/api/hotel-dashboard/summary/').status_code, 404)
+        # The bookings list also answers at its old double-prefixed path
+        self.assertEqual(self.client.get('/api/api/hotel-dashboard/bookings/').status_code, 200)
+
+    def test_writes_keep_the_stats_in_step(self):
+        self.stay.status = 'cancelled'
+        self.stay.save()
+        totals = self._summary(hotel=self.taj.id).json()['totals']
+        self.assertEqual((totals['bookings'], totals['cancellations'], totals['room_nights']), (0, 1, 0))
+
+        self.stay.status = 'confirmed'
+        self.stay.check_out = date(2030, 5, 2)
+        self.stay.save()
+        self.oberoi.bookings.all().delete()
+        stats = sorted(HotelDailyStats.objects.filter(hotel__owner=self.owner).values_list(
+            'hotel__name', 'date', 'bookings', 'cancellations', 'room_nights', 'guests'))
+        self.assertEqual(stats, [
+            ('Oberoi', date(2030, 5, 2), 0, 0, 0, 0),
+            ('Taj', date(2030, 5, 1), 1, 0, 2, 3),
+            ('Taj', date(2030, 5, 2), 0, 0, 0, 0),
+        ])
+        call_command('rebuild_dashboard_stats', stdout=StringIO())
+        self.assertEqual(list(HotelDailyStats.objects.filter(hotel__owner=self.owner).values_list(
+            'hotel__name', 'date', 'bookings', 'cancellations', 'room_nights', 'guests')),
+            [('Taj', date(2030, 5, 1), 1, 0, 2, 3)])
+
+    def test_windows_and_raw_bookings(self):
+        self.assertEqual(self._summary(start='2030-05-03').status_code, 400)
+        self.assertEqual(self._summary(start='2029-01-01').status_code, 400)
+        response = self.client.get('/api/hotel-dashboard/bookings/', {'start': '2030-05-02', 'end': '2030-05-02'})
+        self.assertEqual([row['hotel_name'] for row in response.json()['results']], ['Oberoi'])
+
+    def test_streaming_export(self):
+        path = '/api/hotel-dashboard/bookings/export/'
+        with self.assertLogs('hotels.views', 'INFO') as captured:
+            response = self.client.get(path, {'start': '2030-05-01'})
+        self.assertEqual((captured.records[0].msg, captured.records[0].data['output']), ('bookings.exported', 'csv'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['booking_id', 'hotel_id', 'hotel_name'])
+        self.assertEqual([line.split(',')[2] for line in lines[1:]], ['Taj', 'Oberoi'])
+
+        response = self.client.get(path, {'output': 'ndjson', 'end': '2030-05-01'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([(row['hotel_name'], row['check_in'], row['number_of_guests']) for row in rows],
+                         [('Taj', '2030-05-01', 3)])
+
+        # Admins export every hotel's bookings
+        self.client.force_authenticate(User.objects.create_superuser(email='admin@example.com', password='x'))
+        response = self.client.get(path, {'output': 'ndjson'})
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
+        self.assertEqual(self.client.get(path, {'output': 'xml'}).status_code, 400)
+
+    def test_csv_cells_are_never_formulas(self):
+        User.objects.filter(email='guest@example.com').update(username='@SUM(1+1)')
+        response = self.client.get('/api/hotel-dashboard/bookings/export/')
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual({row['customer_name'] for row in rows}, {"'@SUM(1+1)"})
+
+    def test_export_streams_asynchronously_under_asgi(self):
+        token = ClaimsRefreshToken.for_user(self.owner).access_token
+        response = async_to_sync(AsyncClient().get)(
+            '/api/hotel-dashboard/bookings/export/', {'output': 'ndjson'},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        # An async iterator, so Django doesn't collect the whole body into a list first
+        self.assertTrue(response.is_async)
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in async_to_sync(read)().splitlines()]
+        self.assertEqual([row['hotel_name'] for row in rows], ['Taj', 'Oberoi'])
+
+
+class IdempotentBookingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='guest@example.com')
+        self.client.force_authenticate(self.user)
+        self.hotel = HotelDataModel.objects.create(name='Taj', city='Kochi', area='Fort', description='-', total_rooms=5)
+        self.booking = {'hotel': self.hotel.id, 'check_in': '2030-05-01', 'check_out': '2030-05-03'}
+
+    def _post(self, key, **changes):
+        return self.client.post('/api/bookings/', {**self.booking, **changes}, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retries_replay_the_first_response_without_running_the_create(self):
+        first = self._post('attempt-1')
+        self.assertEqual(first.status_code, 201)
+        # Just the stored response
+        with self.assertNumQueries(1):
+            retry = self._post('attempt-1')
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(inventory.peak_rooms_booked(self.hotel, date(2030, 5, 1), date(2030, 5, 3)), 1)
+
+        # A new key, or another user with the same key, books again
+        self.assertEqual(self._post('attempt-2').status_code, 201)
+        self.client.force_authenticate(User.objects.create_user(email='other@example.com'))
+        self.assertEqual(self._post('attempt-1').status_code, 201)
+        self.assertEqual(Booking.objects.count(), 3)
+
+    def test_conflicting_reuse_and_failures(self):
+        self.assertEqual(self._post('attempt-1').status_code, 201)
+        self.assertEqual(self._post('attempt-1', check_out='2030-05-04').status_code, 422)
+
+        # Failed attempts roll their key back, so the corrected request goes through under the same key
+        self.assertEqual(self._post('attempt-3', check_out='2030-04-01').status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.filter(key=hashlib.sha256(b'attempt-3').hexdigest()).exists())
+        self.assertEqual(self._post('attempt-3').status_code, 201)
+        self.assertEqual(self._post('x' * 256).status_code, 400)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_expired_keys_run_again_and_are_purged(self):
+        self.assertEqual(self._post('attempt-1').status_code, 201)
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        retry = self._post('attempt-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', retry)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class ReplicaRoutingTests(TestCase):
+
+    @override_settings(DATABASE_REPLICA_ALIASES=['replica_1', 'replica_2'])
+    def test_reads_use_replicas_only_when_asked(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(HotelDataModel))
+        with replica_reads():
+            self.assertIn(router.db_for_read(HotelDataModel), ['replica_1', 'replica_2'])
+            self.assertEqual(router.db_for_write(Booking), 'default')
+        self.assertIsNone(router.db_for_read(HotelDataModel))
+        self.assertFalse(router.allow_migrate('replica_1', 'hotels'))
+
+    # The primary stands in for the replica so the queries still run
+    @override_settings(DATABASE_REPLICA_ALIASES=['default'])
+    def test_catalogue_lists_read_from_replicas_and_bookings_do_not(self):
+        cache.clear()
+        user = User.objects.create_user(email='guest@example.com')
+        client = APIClient()
+        with mock.patch('core.routers.random.choice', return_value='default') as choose:
+            client.get('/api/hotels/')
+            catalogue_reads = choose.call_count
+            self.assertGreater(catalogue_reads, 0)
+            client.get('/api/restaurants/')
+            self.assertGreater(choose.call_count, catalogue_reads)
+            catalogue_reads = choose.call_count
+            client.force_authenticate(user)
+            client.get('/api/bookings/')
+            self.assertEqual(choose.call_count, catalogue_reads)
+
+
+class AsyncCatalogueViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(email='owner@example.com')
+        self.hotel = HotelDataModel.objects.create(
+            owner=owner, name='Taj', city='Kochi', area='Fort', description='-', total_rooms=2,
+        )
+        Booking.objects.create(
+            user=owner, hotel=self.hotel, check_in=date(2030, 1, 1), check_out=date(2030, 1, 3), rooms_booked=1,
+        )
+
+    def _get_async(self, path):
+        with override_settings(ROOT_URLCONF='auth.urls_async'):
+            response = async_to_sync(AsyncClient().get)(path)
+            self.assertTrue(response.resolver_match.func.view_class.__name__.startswith('Async'))
+        return response
+
+    def test_async_views_return_the_sync_payload(self):
+        availability = '/api/bookings/check_availability/?hotel_id={}&check_in=2030-01-02&check_out=2030-01-04'
+        for path in [
+            '/api/hotels/', '/api/hotels/?city=Kochi&ordering=price', '/api/hotels/?min_price=abc',
+            f'/api/hotels/{self.hotel.id}/', '/api/hotels/999/',
+            availability.format(self.hotel.id) + '&number_of_guests=2',
+            availability.format(self.hotel.id) + '&number_of_guests=3',
+            availability.format(self.hotel.id) + '&number_of_guests=abc',
+            availability.format(999),
+        ]:
+            with self.subTest(path=path):
+                cache.clear()
+                expected = APIClient().get(path)
+                cache.clear()
+                response = self._get_async(path)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.json(), expected.json())
+
+    def test_bad_credentials_are_rejected_as_under_wsgi(self):
+        headers = {'Authorization': 'Bearer not-a-token'}
+        for path in ('/api/hotels/', f'/api/hotels/{self.hotel.id}/'):
+            with self.subTest(path=path):
+                expected = APIClient().get(path, headers=headers)
+                with override_settings(ROOT_URLCONF='auth.urls_async'):
+                    response = async_to_sync(AsyncClient().get)(path, headers=headers)
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response.json(), expected.json())
+                self.assertEqual(response['WWW-Authenticate'], expected['WWW-Authenticate'])
+
+        # A valid token is still served
+        token = ClaimsRefreshToken.for_user(self.hotel.owner).access_token
+        with override_settings(ROOT_URLCONF='auth.urls_async'):
+            response = async_to_sync(AsyncClient().get)('/api/hotels/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_reads_are_cached_and_writes_fall_back_to_drf(self):
+        miss = self._get_async('/api/hotels/')
+        hit = self._get_async('/api/hotels/')
+        self.assertEqual((miss['X-Cache'], hit['X-Cache']), ('MISS', 'HIT'))
+        # Served without DRF, so the cache itself has to say the body depends on Accept
+        self.assertEqual(hit['Vary'], miss['Vary'])
+        self.assertIn('Accept', hit['Vary'])
+
+        with override_settings(ROOT_URLCONF='auth.urls_async'):
+            response = async_to_sync(AsyncClient().post)('/api/hotels/', {})
+        self.assertEqual(response.status_code, 401)
+
+
+class ConcurrentBookingAdmissionTests(TransactionTestCase):
+    """Hammer one hotel with parallel POSTs to /api/bookings/ and check nothing is oversold."""
+
+    total_rooms = 20
+    attempts = 200
+    workers = 16
+
+    def setUp(self):
+        self.hotel = HotelDataModel.objects.create(
+            name='Stress Inn', city='Kochi', area='Fort', description='-', total_rooms=self.total_rooms
+        )
+        self.users = [
+            User.objects.create_user(email=f'guest{i}@example.com')
+            for i in range(self.workers)
+        ]
+
+    def _book(self, attempt):
+        client = APIClient()
+        client.force_authenticate(self.users[attempt % self.workers])
+        try:
+            # Alternate between two overlapping stays so the ledger rows contend
+            check_in = date(2030, 5, 1) if attempt % 2 else date(2030, 5, 2)
+            response = client.post('/api/bookings/', {
+                'hotel': self.hotel.id,
+                'check_in': check_in.isoformat(),
+                'check_out': '2030-05-04',
+                'number_of_guests': 2,
+            }, format='json')
+            return response.status_code
+        finally:
+            connection.close()
+
+    def test_parallel_bookings_never_oversell(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            codes = list(pool.map(self._book, range(self.attempts)))
+
+        self.assertEqual(codes.count(201), self.total_rooms)
+        self.assertEqual(codes.count(400), self.attempts - self.total_rooms)
+
+        # Every night of the stay is full, and the ledger agrees with the bookings
+        self.assertEqual(
+            inventory.peak_rooms_booked(self.hotel, date(2030, 5, 2), date(2030, 5, 4)),
+            self.total_rooms,
+        )
+        booked = Booking.objects.filter(hotel=self.hotel, status='confirmed').aggregate(
+            total=Sum('rooms_booked'))['total']
+        self.assertEqual(booked, self.total_rooms)
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import HotelViewSet, BookingViewSet
-from .views import HotelDashboardView
+from .views import HotelBookingExportView, HotelDashboardSummaryView, HotelDashboardView, RoomSearchView
 
 router = DefaultRouter()
 router.register(r'hotels', HotelViewSet, basename='hotels')
@@ -13,6 +13,12 @@ router.register(r'hotels', HotelViewSet, basename='hotels')
 router.register(r'bookings', BookingViewSet, basename='bookings')
 
 urlpatterns = [
+    path('rooms/search/', RoomSearchView.as_view(), name='room-search'),
     path('', include(router.urls)),
-    path('api/hotel-dashboard/bookings/', HotelDashboardView.as_view(), name='hotel-dashboard-bookings'),
-]
\ No newline at end of file
+    path('hotel-dashboard/bookings/', HotelDashboardView.as_view(), name='hotel-dashboard-bookings'),
+    path('hotel-dashboard/bookings/export/', HotelBookingExportView.as_view(),
+         name='hotel-dashboard-bookings-export'),
+    path('hotel-dashboard/summary/', HotelDashboardSummaryView.as_view(), name='hotel-dashboard-summary'),
+    # Legacy double-prefixed path (/api/api/...), kept for existing clients
+    path('api/hotel-dashboard/bookings/', HotelDashboardView.as_view()),
+]
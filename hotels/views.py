@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny
@@ -5,30 +7,64 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.generics import ListAPIView
 from rest_framework.decorators import action
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 
-from .models import HotelDataModel, Booking, Room # Import Booking
-from django.db.models import Q # Import Q
+from core import dashboard, exports, logs
+from core.cache import CatalogueCacheMixin
+from core.filters import int_param
+from core.idempotency import IdempotentCreateMixin
+from core.mixins import EagerLoadingMixin
+from core.pagination import KeysetPagination
+from core.routers import ReplicaReadsMixin, replica_reads
+from core.rows import RowListMixin
+from users.authentication import StatelessJWTAuthentication, full_user
+from .models import Amenity, HotelDataModel, Booking, Room # Import Booking
+from . import amenities, inventory, pricing
+from . import dashboard as hotel_dashboard
+from .filters import HotelFilterBackend
+from django.utils.dateparse import parse_date
 from .serializers import (
     HotelCreateSerializer, 
     HotelListSerializer, 
+    HotelListRowSerializer,
     BookingSerializer, # Import BookingSerializer
+    BulkAvailabilitySerializer,
+    HotelOfferSerializer,
+    RoomSearchSerializer,
     RoomSerializer
 
 )
 
-class HotelListAPIView(ListAPIView):
+logger = logging.getLogger(__name__)
+
+
+class HotelListAPIView(EagerLoadingMixin, ListAPIView):
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticatedOrReadOnly]
     queryset = HotelDataModel.objects.all()
     serializer_class = HotelListSerializer # Use ListSerializer for GET requests usually
 
     def get(self, request):
-        hotels = HotelDataModel.objects.all()
-        serializer = HotelListSerializer(hotels, many=True, context={'request': request})
-        return Response(serializer.data)
+        with replica_reads():
+            hotels = self.paginate_queryset(self.get_queryset())
+            serializer = HotelListSerializer(hotels, many=True, context={'request': request})
+            return self.get_paginated_response(serializer.data)
 
-class HotelViewSet(ModelViewSet):
+class HotelViewSet(CatalogueCacheMixin, ReplicaReadsMixin, RowListMixin, EagerLoadingMixin, ModelViewSet):
     queryset = HotelDataModel.objects.all().order_by('-id')
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cache_models = (HotelDataModel, Amenity)
+    # Lists skip the ModelSerializer machinery; detail and writes still use it
+    row_serializer_class = HotelListRowSerializer
+    # ?city=&area=&badge=&min_price=&max_price=&min_rooms=&amenity= and ?ordering=price,-id
+    filter_backends = [HotelFilterBackend, OrderingFilter]
+    ordering_fields = ['id', 'price', 'total_rooms', 'name']
+
+    def get_facets(self, queryset):
+        # ?facets=amenities: amenity counts across every hotel matching the filters
+        return amenities.requested_facets(self.request.query_params, queryset)
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -40,21 +76,53 @@ class HotelViewSet(ModelViewSet):
 
 
 # [NEW] ViewSet for Bookings
-class BookingViewSet(ModelViewSet):
+# POSTs may carry an Idempotency-Key so client retries can't double-book (core.idempotency)
+class BookingViewSet(IdempotentCreateMixin, EagerLoadingMixin, ModelViewSet):
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticated] # Only logged in users can book
+    queryset = Booking.objects.all()
     serializer_class = BookingSerializer
 
     def get_queryset(self):
         # Users see only their own bookings
         # Admins (superusers) can see all
         user = self.request.user
+        queryset = super().get_queryset()
         if user.is_superuser:
-            return Booking.objects.all()
-        return Booking.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user_id=user.id)
 
     def perform_create(self, serializer):
-        # The serializer.validate() we wrote earlier handles the availability check!
-        serializer.save(user=self.request.user)
+        # serializer.validate() gives the early answer; the ledger claim inside
+        # Booking.save() is the authoritative, locked admission check
+        try:
+            booking = serializer.save(user=full_user(self.request.user))
+        except inventory.RoomsUnavailable as exc:
+            logs.event(
+                logger, 'booking.rejected', user_id=self.request.user.id,
+                hotel_id=serializer.validated_data['hotel'].id, available=exc.available, requested=exc.requested,
+            )
+            raise ValidationError(str(exc))
+        logs.event(
+            logger, 'booking.created', booking_id=booking.id, user_id=booking.user_id, hotel_id=booking.hotel_id,
+            check_in=booking.check_in, check_out=booking.check_out, rooms=booking.rooms_booked,
+        )
+
+    def perform_update(self, serializer):
+        try:
+            booking = serializer.save()
+        except inventory.RoomsUnavailable as exc:
+            logs.event(
+                logger, 'booking.rejected', booking_id=serializer.instance.id,
+                available=exc.available, requested=exc.requested,
+            )
+            raise ValidationError(str(exc))
+        logs.event(logger, 'booking.updated', booking_id=booking.id, status=booking.status)
+
+    def perform_destroy(self, instance):
+        booking_id = instance.id
+        instance.delete()
+        logs.event(logger, 'booking.deleted', booking_id=booking_id, user_id=self.request.user.id)
 
     # Optional: Custom action to check availability without booking
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
@@ -66,6 +134,14 @@ class BookingViewSet(ModelViewSet):
         if not all([hotel_id, check_in, check_out]):
             return Response({"error": "Missing parameters"}, status=status.HTTP_400_BAD_REQUEST)
             
+        try:
+            check_in = parse_date(check_in)
+            check_out = parse_date(check_out)
+        except ValueError:
+            check_in = check_out = None
+        if not check_in or not check_out or check_in >= check_out:
+            return Response({"error": "Invalid dates"}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             hotel = HotelDataModel.objects.get(id=hotel_id)
         except HotelDataModel.DoesNotExist:
@@ -76,37 +152,141 @@ class BookingViewSet(ModelViewSet):
             return Response({"available": False, "message": "Room is full"})
 
         # Calculate rooms needed for this booking (2 per room)
-        number_of_guests = int(request.query_params.get('number_of_guests', 2))
+        number_of_guests = int_param(request.query_params, 'number_of_guests', default=2, minimum=1)
         import math
         rooms_needed = math.ceil(number_of_guests / 2)
 
-        # Sum total rooms already booked for overlapping dates
-        from django.db.models import Sum
-        overlapping_rooms = Booking.objects.filter(
-            hotel=hotel,
-            status='confirmed'
-        ).filter(
-            Q(check_in__lt=check_out) & Q(check_out__gt=check_in)
-        ).aggregate(total=Sum('rooms_booked'))['total'] or 0
+        # Rooms already taken on the busiest night of the stay
+        booked_rooms = inventory.peak_rooms_booked(hotel, check_in, check_out)
         
-        if overlapping_rooms + rooms_needed > hotel.total_rooms:
+        if booked_rooms + rooms_needed > hotel.total_rooms:
              return Response({"available": False, "message": "Room is full"})
         
         return Response({"available": True, "message": "Room available"})
-    
+
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def availability(self, request):
+        """
+        check_availability for many hotels at once:
+        ?check_in=&check_out=&number_of_guests=2&city=&area= (or &hotel=<id>, repeatable)
+
+        Every hotel's busiest night comes from one grouped query over the
+        night inventory, however many hotels match.
+        """
+        params = BulkAvailabilitySerializer.from_query(request.query_params)
+        params.is_valid(raise_exception=True)
+        search = params.validated_data
+
+        hotels = HotelDataModel.objects.all()
+        if search.get('hotel'):
+            hotels = hotels.filter(id__in=search['hotel'])
+        for field in ('city', 'area'):
+            if search.get(field):
+                hotels = hotels.filter(**{field: search[field]})
+
+        import math
+        rooms_needed = math.ceil(search['number_of_guests'] / 2)
+        results = [
+            {
+                "hotel": hotel['id'],
+                "name": hotel['name'],
+                "total_rooms": hotel['total_rooms'],
+                "rooms_left": hotel['rooms_left'],
+                "available": hotel['rooms_left'] >= rooms_needed,
+            }
+            for hotel in inventory.hotel_availability(hotels, search['check_in'], search['check_out'])
+        ]
+        return Response({
+            "check_in": search['check_in'],
+            "check_out": search['check_out'],
+            "rooms_needed": rooms_needed,
+            "results": results,
+        })
+
+
+class RoomSearchView(APIView):
+    """
+    GET /api/rooms/search/?check_in=&check_out=&adults=2&children=1&city= (or &hotel=<id>, repeatable)
+
+    The cheapest room-type combination that sleeps the party at each
+    matching hotel, cheapest hotel first. Book it with one POST to
+    /api/bookings/ per room type, passing ``room``.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        params = RoomSearchSerializer.from_query(request.query_params)
+        params.is_valid(raise_exception=True)
+        search = params.validated_data
+        rooms = pricing.candidate_rooms(search.get('hotel'), search.get('city'))
+        results = pricing.search(
+            rooms, search['check_in'], search['check_out'], search['adults'], search['children'],
+            limit=search['limit'],
+        )
+        return Response({
+            "check_in": search['check_in'],
+            "check_out": search['check_out'],
+            "nights": (search['check_out'] - search['check_in']).days,
+            "adults": search['adults'],
+            "children": search['children'],
+            "results": HotelOfferSerializer(results, many=True).data,
+        })
+
+
+def owned_hotels(request, all_for_admins=False):
+    """The requesting owner's hotels (or every hotel, for admins if asked), narrowed by ?hotel=<id> (repeatable)."""
+    hotels = HotelDataModel.objects.all()
+    if not (all_for_admins and request.user.is_superuser):
+        hotels = hotels.filter(owner_id=request.user.id)
+    hotel_ids = request.query_params.getlist('hotel')
+    if hotel_ids:
+        try:
+            hotels = hotels.filter(id__in=[int(hotel_id) for hotel_id in hotel_ids])
+        except ValueError:
+            raise ValidationError({"hotel": "Hotel ids must be integers."})
+    return hotels
+
+
+class HotelDashboardSummaryView(APIView):
+    """
+    GET /api/hotel-dashboard/summary/?start=&end=&hotel=
+
+    Bookings, cancellations, room-nights, guests and occupancy % for the
+    owner's hotels, per hotel and per day, read from the daily stats table
+    (hotels.dashboard). Defaults to the last 30 days.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        start, end = dashboard.date_window(request.query_params)
+        return Response(hotel_dashboard.summary(owned_hotels(request), start, end))
+
 
 class HotelDashboardView(APIView):
+    """
+    GET /api/hotel-dashboard/bookings/: the raw bookings behind the summary,
+    newest first, one keyset page at a time. ?start=&end= limit them to
+    check-ins in that window; ?hotel= to some hotels.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
+
     def get(self, request):
-        user = request.user
-        
         # 1. Find all hotels owned by this user (e.g. "Taj Hotel" owned by User X)
-        my_hotels = HotelDataModel.objects.filter(owner=user)
+        my_hotels = owned_hotels(request)
         
         # 2. Find all bookings for THESE hotels
         # e.g. User Y booked "Taj Hotel" -> Show this
         # e.g. User Z booked "Oberoi" (User A owner) -> Hide this
         my_bookings = Booking.objects.filter(hotel__in=my_hotels).select_related('user', 'hotel')
+        if request.query_params.get('start') or request.query_params.get('end'):
+            start, end = dashboard.date_window(request.query_params)
+            my_bookings = my_bookings.filter(check_in__gte=start, check_in__lte=end)
+        paginator = KeysetPagination()
+        my_bookings = paginator.paginate_queryset(my_bookings, request, view=self)
         
         data = []
         for booking in my_bookings:
@@ -121,4 +301,36 @@ class HotelDashboardView(APIView):
                 "booked_at": booking.created_at
             })
             
-        return Response(data)
\ No newline at end of file
+        return paginator.get_paginated_response(data)
+
+
+class HotelBookingExportView(APIView):
+    """
+    GET /api/hotel-dashboard/bookings/export/?output=csv|ndjson&start=&end=&hotel=
+
+    Streams every booking for the owner's hotels (all hotels for admins),
+    oldest first. ?start=&end= filter on check-in.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    columns = {
+        'booking_id': 'id',
+        'hotel_id': 'hotel_id',
+        'hotel_name': 'hotel__name',
+        'room_type': 'room__room_type',
+        'customer_name': 'user__username',
+        'customer_email': 'user__email',
+        'check_in': 'check_in',
+        'check_out': 'check_out',
+        'status': 'status',
+        'number_of_guests': 'number_of_guests',
+        'rooms_booked': 'rooms_booked',
+        'booked_at': 'created_at',
+    }
+
+    def get(self, request):
+        output = exports.output_format(request.query_params)
+        bookings = Booking.objects.filter(hotel__in=owned_hotels(request, all_for_admins=True))
+        bookings = exports.filter_dates(bookings, 'check_in', request.query_params).order_by('id')
+        logs.event(logger, 'bookings.exported', user_id=request.user.id, output=output)
+        return exports.stream(request, bookings, self.columns, output, 'bookings')
@@ -14,7 +14,7 @@ class RestaurantAdmin(admin.ModelAdmin):
             'fields': ('owner', 'name', 'city', 'area', 'badge', 'cuisine_type', 'price_range')
         }),
         ('Pricing & Capacity', {
-            'fields': ('average_cost_for_two', 'total_tables')
+            'fields': ('average_cost_for_two', 'total_tables', 'seating_duration', 'slot_minutes')
         }),
         ('Details', {
             'fields': ('description', 'rating')
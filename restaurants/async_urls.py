@@ -0,0 +1,16 @@
+from django.urls import path
+
+from .async_views import AsyncRestaurantDetailView, AsyncRestaurantListView, AsyncTableAvailabilityView
+from .views import RestaurantDetailView, RestaurantListCreateView
+
+# Mounted ahead of restaurants.urls by auth/urls_async.py; names match theirs
+urlpatterns = [
+    path('restaurants/', AsyncRestaurantListView.as_view(
+        fallback=RestaurantListCreateView.as_view(),
+    ), name='restaurant-list-create'),
+    path('restaurants/<int:pk>/', AsyncRestaurantDetailView.as_view(
+        fallback=RestaurantDetailView.as_view(),
+    ), name='restaurant-detail'),
+    path('reservations/check_availability/', AsyncTableAvailabilityView.as_view(),
+         name='reservation-check-availability'),
+]
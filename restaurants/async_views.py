@@ -0,0 +1,78 @@
+"""
+Async-native restaurant reads for ASGI deployments (see core.async_views).
+
+Each view returns the same payload as the sync endpoint on its path.
+"""
+import math
+
+from django.shortcuts import aget_object_or_404
+from django.utils.dateparse import parse_date, parse_time
+
+from core.async_views import AsyncAPIView
+from core.filters import int_param
+from core.mixins import eager_load
+from core.routers import replica_reads
+from . import capacity
+from .models import RestaurantDataModel
+from .serializers import RestaurantSerializer
+from .views import RestaurantListCreateView
+
+
+class AsyncRestaurantListView(AsyncAPIView):
+    """GET /api/restaurants/: RestaurantListCreateView"""
+    cache_models = RestaurantListCreateView.cache_models
+    filter_backends = RestaurantListCreateView.filter_backends
+    ordering_fields = RestaurantListCreateView.ordering_fields
+    keyset_ordering = RestaurantListCreateView.keyset_ordering
+
+    async def get(self, request):
+        queryset = eager_load(RestaurantDataModel.objects.all(), RestaurantSerializer)
+        with replica_reads():
+            page, paginator = await self.paginate(request, self.filter_queryset(request, queryset))
+        data = RestaurantSerializer(page, many=True, context={'request': request}).data
+        return self.render(paginator.get_paginated_response(data).data)
+
+
+class AsyncRestaurantDetailView(AsyncAPIView):
+    """GET /api/restaurants/<pk>/: RestaurantDetailView"""
+    cache_models = RestaurantListCreateView.cache_models
+
+    async def get(self, request, pk):
+        queryset = eager_load(RestaurantDataModel.objects.all(), RestaurantSerializer)
+        restaurant = await aget_object_or_404(queryset, pk=pk)
+        return self.render(RestaurantSerializer(restaurant, context={'request': request}).data)
+
+
+class AsyncTableAvailabilityView(AsyncAPIView):
+    """GET /api/reservations/check_availability/: TableAvailabilityView"""
+
+    async def get(self, request):
+        restaurant_id = request.GET.get('restaurant_id')
+        reservation_date = request.GET.get('date')
+        reservation_time = request.GET.get('time')
+
+        if not all([restaurant_id, reservation_date, reservation_time]):
+            return self.render({"error": "Missing parameters"}, status=400)
+
+        try:
+            reservation_date = parse_date(reservation_date)
+            reservation_time = parse_time(reservation_time)
+        except ValueError:
+            reservation_date = reservation_time = None
+        if not reservation_date or not reservation_time:
+            return self.render({"error": "Invalid date or time"}, status=400)
+
+        # The slots to check depend on the restaurant's seating settings, so this lookup comes first
+        try:
+            restaurant = await RestaurantDataModel.objects.only(
+                'total_tables', 'slot_minutes', 'seating_duration'
+            ).aget(id=restaurant_id)
+        except RestaurantDataModel.DoesNotExist:
+            return self.render({"error": "Restaurant not found"}, status=404)
+
+        # Same rule as TableReservation.save(): 4 guests per table
+        tables_needed = math.ceil(int_param(request.GET, 'number_of_guests', default=2, minimum=1) / 4)
+        tables_left = await capacity.atables_available(restaurant, reservation_date, reservation_time)
+        if tables_needed > tables_left:
+            return self.render({"available": False, "tables_left": tables_left, "message": "No tables available"})
+        return self.render({"available": True, "tables_left": tables_left, "message": "Tables available"})
@@ -0,0 +1,175 @@
+"""
+Slot-based table capacity for restaurants.
+
+Each restaurant's day is cut into ``slot_minutes`` buckets. A confirmed
+TableReservation holds its ``tables_reserved`` in every slot between the
+reservation time and ``seating_duration`` minutes later, recorded in one
+TableSlotOccupancy row per slot. Checking a request is then a lookup on the
+few slots it covers, never a scan of the restaurant's reservations.
+
+Claims re-check the busiest slot while the restaurant row is locked and use
+a guarded UPDATE, the same admission scheme as hotels.inventory.
+"""
+from datetime import time
+
+from django.db import transaction
+from django.db.models import F, Max
+
+from .models import RestaurantDataModel, TableReservation, TableSlotOccupancy
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class TablesUnavailable(Exception):
+    """Raised when a claim would take a slot past the restaurant's total_tables."""
+
+    def __init__(self, available, requested):
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Only {available} tables are available at this time. You need {requested}."
+        )
+
+
+def reservation_slots(slot_minutes, seating_duration, reservation_time):
+    """Start times of the slots a seating starting at ``reservation_time`` occupies."""
+    step = slot_minutes or 30
+    start = reservation_time.hour * 60 + reservation_time.minute
+    first = start // step * step
+    end = min(start + seating_duration, MINUTES_PER_DAY)
+    return tuple(time(minute // 60, minute % 60) for minute in range(first, max(end, first + 1), step))
+
+
+def reservation_footprint(restaurant_id, slot_minutes, seating_duration,
+                          reservation_date, reservation_time, status, tables_reserved):
+    """What a reservation occupies in the slot table, or None if it holds no tables."""
+    if status != 'confirmed' or not tables_reserved:
+        return None
+    slots = reservation_slots(slot_minutes, seating_duration, reservation_time)
+    return (restaurant_id, reservation_date, slots, tables_reserved)
+
+
+def adjust(restaurant_id, reservation_date, slots, delta, capacity=None):
+    """
+    Add ``delta`` tables (negative to release) to each of ``slots``.
+
+    With ``capacity`` set, the claim only goes through if every slot stays at
+    or below it; otherwise TablesUnavailable is raised and the caller's
+    transaction should be rolled back.
+    """
+    if not slots or not delta:
+        return
+    occupancy = TableSlotOccupancy.objects.filter(
+        restaurant_id=restaurant_id, date=reservation_date, slot_start__in=slots
+    )
+    if delta > 0:
+        if capacity is not None:
+            peak = occupancy.aggregate(peak=Max('tables_reserved'))['peak'] or 0
+            if peak + delta > capacity:
+                raise TablesUnavailable(max(capacity - peak, 0), delta)
+            # Guard the write as well, for backends where the restaurant row lock is a no-op
+            occupancy = occupancy.filter(tables_reserved__lte=capacity - delta)
+        TableSlotOccupancy.objects.bulk_create(
+            [
+                TableSlotOccupancy(restaurant_id=restaurant_id, date=reservation_date, slot_start=slot)
+                for slot in slots
+            ],
+            ignore_conflicts=True,
+        )
+    updated = occupancy.update(tables_reserved=F('tables_reserved') + delta)
+    if delta > 0 and capacity is not None and updated != len(slots):
+        # Lost a race after the check; the caller's rollback undoes partial increments
+        raise TablesUnavailable(max(capacity - peak, 0), delta)
+
+
+def apply_change(previous, current):
+    """
+    Move a reservation's footprint from ``previous`` to ``current``.
+
+    Must run inside a transaction: the claim locks the restaurant row and may
+    raise TablesUnavailable.
+    """
+    if previous == current:
+        return
+    if previous:
+        adjust(*previous[:3], -previous[3])
+    if current:
+        restaurant = RestaurantDataModel.objects.select_for_update().only('total_tables').get(pk=current[0])
+        adjust(*current[:3], current[3], capacity=restaurant.total_tables)
+
+
+def _seating_occupancy(restaurant, reservation_date, reservation_time):
+    slots = reservation_slots(restaurant.slot_minutes, restaurant.seating_duration, reservation_time)
+    return TableSlotOccupancy.objects.filter(restaurant=restaurant, date=reservation_date, slot_start__in=slots)
+
+
+def tables_available(restaurant, reservation_date, reservation_time):
+    """Tables still free for a seating starting at ``reservation_time``."""
+    peak = _seating_occupancy(restaurant, reservation_date, reservation_time).aggregate(
+        peak=Max('tables_reserved')
+    )['peak'] or 0
+    return max(restaurant.total_tables - peak, 0)
+
+
+async def atables_available(restaurant, reservation_date, reservation_time):
+    """Async tables_available()."""
+    result = await _seating_occupancy(restaurant, reservation_date, reservation_time).aaggregate(
+        peak=Max('tables_reserved')
+    )
+    return max(restaurant.total_tables - (result['peak'] or 0), 0)
+
+
+def promote_waitlist(restaurant_id, reservation_date):
+    """
+    Confirm waitlisted reservations for the day, oldest first, while tables allow.
+
+    Returns the number of reservations promoted.
+    """
+    promoted = 0
+    waiting = TableReservation.objects.filter(
+        restaurant_id=restaurant_id, reservation_date=reservation_date, status='waitlisted'
+    ).order_by('created_at')
+    for reservation in waiting:
+        reservation.status = 'confirmed'
+        try:
+            with transaction.atomic():
+                reservation.save(update_fields=['status'])
+        except TablesUnavailable:
+            continue
+        promoted += 1
+    return promoted
+
+
+def rebuild(restaurants=None):
+    """
+    Recompute slot occupancy from confirmed reservations.
+
+    ``restaurants`` limits the rebuild to a queryset/list of restaurants; by
+    default every restaurant is rebuilt. Returns the number of rows written.
+    """
+    occupancy = TableSlotOccupancy.objects.all()
+    reservations = TableReservation.objects.filter(status='confirmed')
+    if restaurants is not None:
+        occupancy = occupancy.filter(restaurant__in=restaurants)
+        reservations = reservations.filter(restaurant__in=restaurants)
+
+    totals = {}
+    rows = reservations.values_list(
+        'restaurant_id', 'restaurant__slot_minutes', 'restaurant__seating_duration',
+        'reservation_date', 'reservation_time', 'tables_reserved',
+    )
+    for restaurant_id, slot_minutes, duration, day, at, tables in rows.iterator(chunk_size=2000):
+        for slot in reservation_slots(slot_minutes, duration, at):
+            key = (restaurant_id, day, slot)
+            totals[key] = totals.get(key, 0) + tables
+
+    with transaction.atomic():
+        occupancy.delete()
+        TableSlotOccupancy.objects.bulk_create(
+            [
+                TableSlotOccupancy(restaurant_id=restaurant_id, date=day, slot_start=slot, tables_reserved=tables)
+                for (restaurant_id, day, slot), tables in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
@@ -0,0 +1,82 @@
+"""
+Owner dashboard aggregates for restaurants (see core.dashboard).
+
+Each reservation counts on its reservation date. It counts in
+``reservations``, ``guests`` and ``tables`` while confirmed or completed,
+and in ``cancellations`` or ``waitlisted`` otherwise. Occupancy is the
+busiest slot's share of total_tables. It is read from the slot occupancy
+table (restaurants.capacity), which holds confirmed reservations only.
+"""
+from django.db.models import Max
+
+from core import dashboard
+from .models import RestaurantDailyStats, TableReservation, TableSlotOccupancy
+
+COUNTERS = ('reservations', 'cancellations', 'waitlisted', 'guests', 'tables')
+
+
+def reservation_footprint(restaurant_id, reservation_date, status, number_of_guests, tables_reserved):
+    key = (restaurant_id, reservation_date)
+    if status == 'cancelled':
+        return {key: {'cancellations': 1}}
+    if status == 'waitlisted':
+        return {key: {'waitlisted': 1}}
+    return {key: {'reservations': 1, 'guests': number_of_guests, 'tables': tables_reserved}}
+
+
+def apply_change(previous, current):
+    dashboard.apply_change(RestaurantDailyStats, 'restaurant_id', previous, current)
+
+
+def rebuild(restaurants=None):
+    """Recompute the daily stats from TableReservation rows; returns the number of rows written."""
+    stale = RestaurantDailyStats.objects.all()
+    reservations = TableReservation.objects.all()
+    if restaurants is not None:
+        stale = stale.filter(restaurant__in=restaurants)
+        reservations = reservations.filter(restaurant__in=restaurants)
+    rows = reservations.values_list(
+        'restaurant_id', 'reservation_date', 'status', 'number_of_guests', 'tables_reserved',
+    ).order_by()
+    footprints = (reservation_footprint(*row) for row in rows.iterator(chunk_size=2000))
+    return dashboard.rebuild(RestaurantDailyStats, 'restaurant_id', footprints, stale)
+
+
+def summary(restaurants, start, end):
+    """Totals, per-restaurant and per-day figures for ``restaurants`` between ``start`` and ``end`` (inclusive)."""
+    restaurants = list(restaurants.values('id', 'name', 'total_tables').order_by('id'))
+    ids = [restaurant['id'] for restaurant in restaurants]
+    stats = RestaurantDailyStats.objects.filter(restaurant_id__in=ids, date__gte=start, date__lte=end)
+    by_restaurant, by_day = dashboard.sums(stats, 'restaurant_id', COUNTERS)
+
+    # Busiest slot per restaurant and day, summed both ways
+    peaks = (
+        TableSlotOccupancy.objects.filter(restaurant_id__in=ids, date__gte=start, date__lte=end)
+        .values('restaurant_id', 'date').annotate(peak=Max('tables_reserved')).order_by()
+    )
+    peak_by_restaurant, peak_by_day = {}, {}
+    for row in peaks:
+        peak_by_restaurant[row['restaurant_id']] = peak_by_restaurant.get(row['restaurant_id'], 0) + row['peak']
+        peak_by_day[row['date']] = peak_by_day.get(row['date'], 0) + row['peak']
+
+    empty = dict.fromkeys(COUNTERS, 0)
+    days = dashboard.window_days(start, end)
+    total_tables = sum(restaurant['total_tables'] for restaurant in restaurants)
+    totals = {counter: sum(row[counter] for row in by_restaurant.values()) for counter in COUNTERS}
+    return {
+        'start': start,
+        'end': end,
+        'totals': {**totals, 'occupancy': dashboard.percent(sum(peak_by_day.values()), total_tables * len(days))},
+        'restaurants': [
+            {'restaurant': restaurant['id'], 'name': restaurant['name'], 'total_tables': restaurant['total_tables'],
+             **by_restaurant.get(restaurant['id'], empty),
+             'occupancy': dashboard.percent(
+                 peak_by_restaurant.get(restaurant['id'], 0), restaurant['total_tables'] * len(days))}
+            for restaurant in restaurants
+        ],
+        'days': [
+            {'date': day, **by_day.get(day, empty),
+             'occupancy': dashboard.percent(peak_by_day.get(day, 0), total_tables)}
+            for day in days
+        ],
+    }
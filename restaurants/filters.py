@@ -0,0 +1,28 @@
+from rest_framework.filters import BaseFilterBackend
+
+from core.filters import decimal_param
+
+
+class RestaurantFilterBackend(BaseFilterBackend):
+    """
+    Query-parameter filters for the restaurant catalogue:
+    ?city=&area=&badge=&cuisine_type=&price_range=&min_rating=&max_cost_for_two=
+
+    Equality filters are exact so (city, cuisine_type, price_range, rating)
+    can be served from the composite index on RestaurantDataModel.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        for field in ('city', 'area', 'badge', 'cuisine_type', 'price_range'):
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+
+        min_rating = decimal_param(params, 'min_rating')
+        if min_rating is not None:
+            queryset = queryset.filter(rating__gte=min_rating)
+
+        max_cost = decimal_param(params, 'max_cost_for_two')
+        if max_cost is not None:
+            queryset = queryset.filter(average_cost_for_two__lte=max_cost)
+        return queryset
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from restaurants import capacity
+from restaurants.models import RestaurantDataModel
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-slot table occupancy from confirmed reservations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--restaurant', type=int, action='append', dest='restaurant_ids',
+            help="Only rebuild occupancy for this restaurant id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        restaurants = None
+        if options['restaurant_ids']:
+            restaurants = RestaurantDataModel.objects.filter(id__in=options['restaurant_ids'])
+
+        rows = capacity.rebuild(restaurants)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} table slot rows."))
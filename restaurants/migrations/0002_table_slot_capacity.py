@@ -0,0 +1,68 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_slot_occupancy(apps, schema_editor):
+    from restaurants.capacity import reservation_slots
+
+    TableReservation = apps.get_model('restaurants', 'TableReservation')
+    TableSlotOccupancy = apps.get_model('restaurants', 'TableSlotOccupancy')
+
+    totals = {}
+    reservations = TableReservation.objects.filter(status='confirmed').values_list(
+        'restaurant_id', 'restaurant__slot_minutes', 'restaurant__seating_duration',
+        'reservation_date', 'reservation_time', 'tables_reserved',
+    )
+    for restaurant_id, slot_minutes, duration, day, at, tables in reservations.iterator():
+        for slot in reservation_slots(slot_minutes, duration, at):
+            key = (restaurant_id, day, slot)
+            totals[key] = totals.get(key, 0) + tables
+
+    TableSlotOccupancy.objects.bulk_create(
+        [
+            TableSlotOccupancy(restaurant_id=restaurant_id, date=day, slot_start=slot, tables_reserved=tables)
+            for (restaurant_id, day, slot), tables in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurantdatamodel',
+            name='seating_duration',
+            field=models.PositiveIntegerField(default=90, help_text='Minutes a table stays occupied by one reservation'),
+        ),
+        migrations.AddField(
+            model_name='restaurantdatamodel',
+            name='slot_minutes',
+            field=models.PositiveIntegerField(default=30, help_text='Length of one reservation time slot in minutes'),
+        ),
+        migrations.AlterField(
+            model_name='tablereservation',
+            name='status',
+            field=models.CharField(choices=[('confirmed', 'Confirmed'), ('waitlisted', 'Waitlisted'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], default='confirmed', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='TableSlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot_start', models.TimeField()),
+                ('tables_reserved', models.PositiveIntegerField(default=0)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_occupancy', to='restaurants.restaurantdatamodel')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('restaurant', 'date', 'slot_start'), name='unique_restaurant_slot_occupancy')],
+            },
+        ),
+        migrations.RunPython(build_slot_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0002_table_slot_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurantdatamodel',
+            index=models.Index(fields=['city', 'cuisine_type', 'price_range', 'rating'], name='rest_city_cuisine_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurantdatamodel',
+            index=models.Index(fields=['city', 'area'], name='rest_city_area_idx'),
+        ),
+    ]
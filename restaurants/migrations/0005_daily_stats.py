@@ -0,0 +1,59 @@
+# Generated by Django 5.2.11 on 2026-10-18 11:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_daily_stats(apps, schema_editor):
+    TableReservation = apps.get_model('restaurants', 'TableReservation')
+    RestaurantDailyStats = apps.get_model('restaurants', 'RestaurantDailyStats')
+
+    totals = {}
+    reservations = TableReservation.objects.values_list(
+        'restaurant_id', 'reservation_date', 'status', 'number_of_guests', 'tables_reserved'
+    ).order_by()
+    for restaurant_id, day, status, guests, tables in reservations.iterator():
+        counts = totals.setdefault((restaurant_id, day), {})
+        if status in ('cancelled', 'waitlisted'):
+            counter = 'cancellations' if status == 'cancelled' else 'waitlisted'
+            counts[counter] = counts.get(counter, 0) + 1
+            continue
+        counts['reservations'] = counts.get('reservations', 0) + 1
+        counts['guests'] = counts.get('guests', 0) + guests
+        counts['tables'] = counts.get('tables', 0) + tables
+
+    RestaurantDailyStats.objects.bulk_create(
+        [
+            RestaurantDailyStats(restaurant_id=restaurant_id, date=day, **counts)
+            for (restaurant_id, day), counts in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0004_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestaurantDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('reservations', models.PositiveIntegerField(default=0, help_text='Confirmed or completed reservations')),
+                ('cancellations', models.PositiveIntegerField(default=0)),
+                ('waitlisted', models.PositiveIntegerField(default=0)),
+                ('guests', models.PositiveIntegerField(default=0, help_text='Guests in confirmed or completed reservations')),
+                ('tables', models.PositiveIntegerField(default=0, help_text="Tables reserved across the day's seatings")),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='restaurants.restaurantdatamodel')),
+            ],
+            options={
+                'verbose_name_plural': 'restaurant daily stats',
+                'constraints': [models.UniqueConstraint(fields=('restaurant', 'date'), name='unique_restaurant_daily_stats')],
+            },
+        ),
+        migrations.RunPython(build_daily_stats, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
 # Get the user model (works with custom User models too)
@@ -41,6 +41,16 @@ class RestaurantDataModel(models.Model):
         help_text="Total number of tables available in the restaurant"
     )
 
+    # Slot-based capacity (see restaurants.capacity)
+    seating_duration = models.PositiveIntegerField(
+        default=90,
+        help_text="Minutes a table stays occupied by one reservation"
+    )
+    slot_minutes = models.PositiveIntegerField(
+        default=30,
+        help_text="Length of one reservation time slot in minutes"
+    )
+
     description = models.TextField()
     rating = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
     
@@ -48,6 +58,10 @@ class RestaurantDataModel(models.Model):
     image = models.ImageField(upload_to='restaurants/')
     menu_image = models.ImageField(upload_to='restaurants/menus/', blank=True, null=True)
     interior_image = models.ImageField(upload_to='restaurants/interiors/', blank=True, null=True)
+    # Resized/recompressed variants of the images above, maintained by core.images
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
+
+    IMAGE_FIELDS = ('image', 'menu_image', 'interior_image')
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -57,11 +71,20 @@ class RestaurantDataModel(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Serve the catalogue filters in restaurants.filters from an index
+        indexes = [
+            models.Index(
+                fields=['city', 'cuisine_type', 'price_range', 'rating'],
+                name='rest_city_cuisine_price_idx',
+            ),
+            models.Index(fields=['city', 'area'], name='rest_city_area_idx'),
+        ]
 
 
 class TableReservation(models.Model):
     STATUS_CHOICES = [
         ('confirmed', 'Confirmed'),
+        ('waitlisted', 'Waitlisted'),
         ('cancelled', 'Cancelled'),
         ('completed', 'Completed'),
     ]
@@ -89,10 +112,59 @@ class TableReservation(models.Model):
         # Auto-calculate tables needed (4 guests per table, round up)
         import math
         self.tables_reserved = math.ceil(self.number_of_guests / 4)
-        super().save(*args, **kwargs)
+        # Keep the reservation row and its slot occupancy in step (see restaurants.signals)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user} - {self.restaurant.name} on {self.reservation_date} at {self.reservation_time}"
 
     class Meta:
         ordering = ['-created_at']
+
+
+# Tables taken per restaurant, day and time slot, maintained from TableReservation writes
+class TableSlotOccupancy(models.Model):
+    restaurant = models.ForeignKey(
+        RestaurantDataModel,
+        on_delete=models.CASCADE,
+        related_name='slot_occupancy'
+    )
+    date = models.DateField()
+    slot_start = models.TimeField()
+    tables_reserved = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.restaurant_id} @ {self.date} {self.slot_start}: {self.tables_reserved} tables"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['restaurant', 'date', 'slot_start'], name='unique_restaurant_slot_occupancy'
+            ),
+        ]
+
+
+# Per-restaurant daily totals for the owner dashboard, maintained from TableReservation writes
+# (see restaurants.dashboard)
+class RestaurantDailyStats(models.Model):
+    restaurant = models.ForeignKey(
+        RestaurantDataModel,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+    reservations = models.PositiveIntegerField(default=0, help_text="Confirmed or completed reservations")
+    cancellations = models.PositiveIntegerField(default=0)
+    waitlisted = models.PositiveIntegerField(default=0)
+    guests = models.PositiveIntegerField(default=0, help_text="Guests in confirmed or completed reservations")
+    tables = models.PositiveIntegerField(default=0, help_text="Tables reserved across the day's seatings")
+
+    def __str__(self):
+        return f"{self.restaurant_id} @ {self.date}"
+
+    class Meta:
+        verbose_name_plural = 'restaurant daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'date'], name='unique_restaurant_daily_stats'),
+        ]
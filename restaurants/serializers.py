@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import RestaurantDataModel, TableReservation
+from core import images
 
 
 class RestaurantSerializer(serializers.ModelSerializer):
@@ -7,6 +8,10 @@ class RestaurantSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(required=False)
     menu_image = serializers.ImageField(required=False)
     interior_image = serializers.ImageField(required=False)
+    image_variants = serializers.SerializerMethodField()
+
+    # Relations read per row; applied by core.mixins.EagerLoadingMixin
+    select_related_fields = ('owner',)
 
     class Meta:
         model = RestaurantDataModel
@@ -14,15 +19,26 @@ class RestaurantSerializer(serializers.ModelSerializer):
             'id', 'owner', 'owner_name', 'name', 'city', 'area', 'badge',
             'cuisine_type', 'price_range', 'average_cost_for_two', 'total_tables',
             'description', 'rating', 'image', 'menu_image', 'interior_image',
-            'created_at', 'updated_at'
+            'image_variants', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'owner', 'owner_name']
 
+    def get_image_variants(self, obj):
+        # {field: {'thumb'|'card'|'full': {'jpeg'|'webp'|'avif': url}}}
+        request = self.context.get('request')
+        if not request:
+            return {}
+        return images.variant_urls(obj, RestaurantDataModel.IMAGE_FIELDS, request.build_absolute_uri)
+
 
 class TableReservationSerializer(serializers.ModelSerializer):
     restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     restaurant_image = serializers.ImageField(source='restaurant.image', read_only=True)
+    # Put the request on the waitlist instead of rejecting it when the slot is full
+    join_waitlist = serializers.BooleanField(required=False, default=False, write_only=True)
+
+    select_related_fields = ('restaurant', 'user')
 
     class Meta:
         model = TableReservation
@@ -30,7 +46,7 @@ class TableReservationSerializer(serializers.ModelSerializer):
             'id', 'user', 'user_name', 'restaurant', 'restaurant_name', 
             'restaurant_image', 'reservation_date', 'reservation_time',
             'number_of_guests', 'tables_reserved', 'status', 'special_requests',
-            'created_at'
+            'created_at', 'join_waitlist'
         ]
         read_only_fields = ['id', 'created_at', 'user', 'user_name', 'restaurant_name', 
                            'restaurant_image', 'tables_reserved']
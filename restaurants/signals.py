@@ -0,0 +1,80 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from . import capacity, dashboard
+from .models import RestaurantDataModel, TableReservation
+
+
+def _footprints(restaurant_id, slot_minutes, seating_duration, reservation_date, reservation_time,
+                status, tables_reserved, number_of_guests):
+    return (
+        capacity.reservation_footprint(
+            restaurant_id, slot_minutes, seating_duration,
+            reservation_date, reservation_time, status, tables_reserved,
+        ),
+        dashboard.reservation_footprint(restaurant_id, reservation_date, status, number_of_guests, tables_reserved),
+    )
+
+
+def _reservation_footprints(reservation):
+    restaurant = reservation.restaurant
+    return _footprints(
+        restaurant.id, restaurant.slot_minutes, restaurant.seating_duration,
+        reservation.reservation_date, reservation.reservation_time,
+        reservation.status, reservation.tables_reserved, reservation.number_of_guests,
+    )
+
+
+@receiver(pre_save, sender=TableReservation)
+def remember_reservation_footprint(sender, instance, **kwargs):
+    # Read what the stored row holds right now, so edits release the old slots
+    previous = (None, None)
+    if instance.pk:
+        stored = TableReservation.objects.filter(pk=instance.pk).values_list(
+            'restaurant_id', 'restaurant__slot_minutes', 'restaurant__seating_duration',
+            'reservation_date', 'reservation_time', 'status', 'tables_reserved', 'number_of_guests',
+        ).first()
+        if stored:
+            previous = _footprints(*stored)
+    instance._previous_footprints = previous
+
+
+@receiver(post_save, sender=TableReservation)
+def update_slot_occupancy(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_footprints', (None, None))
+    current = _reservation_footprints(instance)
+    capacity.apply_change(previous[0], current[0])
+    dashboard.apply_change(previous[1], current[1])
+    instance._previous_footprints = current
+    if previous[0] and previous[0] != current[0]:
+        capacity.promote_waitlist(previous[0][0], previous[0][1])
+
+
+@receiver(post_delete, sender=TableReservation)
+def release_slot_occupancy(sender, instance, **kwargs):
+    footprint, dashboard_footprint = _reservation_footprints(instance)
+    capacity.apply_change(footprint, None)
+    dashboard.apply_change(dashboard_footprint, None)
+    if footprint:
+        capacity.promote_waitlist(footprint[0], footprint[1])
+
+
+@receiver(pre_save, sender=RestaurantDataModel)
+def remember_slot_config(sender, instance, **kwargs):
+    instance._previous_slot_config = None
+    if instance.pk:
+        instance._previous_slot_config = RestaurantDataModel.objects.filter(pk=instance.pk).values_list(
+            'slot_minutes', 'seating_duration'
+        ).first()
+
+
+@receiver(post_save, sender=RestaurantDataModel)
+def rebucket_slot_occupancy(sender, instance, created, raw=False, **kwargs):
+    # Existing occupancy rows are keyed by the old slot grid; recompute them
+    previous = getattr(instance, '_previous_slot_config', None)
+    if created or raw or previous is None:
+        return
+    if previous != (instance.slot_minutes, instance.seating_duration):
+        capacity.rebuild([instance])
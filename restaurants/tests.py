@@ -1,3 +1,165 @@
+import json
+from datetime import date, time
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.testing import QueryCountGuardMixin
+from restaurants.models import RestaurantDataModel, TableReservation
+from users.models import User
+
+
+class ListQueryCountTests(QueryCountGuardMixin, TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='diner@example.com')
+        self.created = 0
+
+    def _add_restaurants(self, count):
+        for _ in range(count):
+            self.created += 1
+            owner = User.objects.create_user(email=f'o{self.created}@example.com')
+            RestaurantDataModel.objects.create(
+                owner=owner, name=f'Restaurant {self.created}', city='Kochi', area='Fort',
+                badge='Cafe', cuisine_type='Kerala', average_cost_for_two=800,
+                description='-', image='restaurants/r.jpg',
+            )
+
+    def _add_reservations(self, count):
+        for _ in range(count):
+            self._add_restaurants(1)
+            TableReservation.objects.create(
+                user=self.user, restaurant=RestaurantDataModel.objects.latest('id'),
+                reservation_date=date(2030, 1, 1), reservation_time=time(19, 0),
+            )
+
+    def test_restaurant_list(self):
+        self.assertListQueriesConstant(self.client, '/api/restaurants/', self._add_restaurants)
+
+    def test_user_reservation_list(self):
+        self.client.force_authenticate(self.user)
+        self.assertListQueriesConstant(self.client, '/api/my-reservations/', self._add_reservations)
+
+    def test_reservation_list(self):
+        self.client.force_authenticate(self.user)
+        self.assertListQueriesConstant(self.client, '/api/reservations/', self._add_reservations)
+
+
+class OwnerDashboardTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(email='owner@example.com')
+        self.client.force_authenticate(self.owner)
+        self.restaurant = RestaurantDataModel.objects.create(
+            owner=self.owner, name='Fort Cafe', city='Kochi', area='Fort', badge='Cafe', cuisine_type='Kerala',
+            average_cost_for_two=800, description='-', image='restaurants/r.jpg', total_tables=4,
+        )
+        diner = User.objects.create_user(email='diner@example.com')
+        for at, guests in ((time(19, 0), 6), (time(19, 30), 3), (time(13, 0), 2)):
+            TableReservation.objects.create(user=diner, restaurant=self.restaurant, reservation_date=date(2030, 5, 1),
+                                            reservation_time=at, number_of_guests=guests)
+        self.cancelled = TableReservation.objects.create(
+            user=diner, restaurant=self.restaurant, reservation_date=date(2030, 5, 2),
+            reservation_time=time(20, 0), number_of_guests=2)
+        self.cancelled.status = 'cancelled'
+        self.cancelled.save()
+
+    def test_summary_and_raw_reservations(self):
+        with self.assertNumQueries(4):
+            data = self.client.get('/api/restaurant-dashboard/summary/', {
+                'start': '2030-05-01', 'end': '2030-05-02',
+            }).json()
+        # 19:00 (2 tables) and 19:30 (1 table) overlap: 3 of 4 tables at the busiest slot
+        self.assertEqual(data['days'][0], {
+            'date': '2030-05-01', 'reservations': 3, 'cancellations': 0, 'waitlisted': 0,
+            'guests': 11, 'tables': 4, 'occupancy': 75.0,
+        })
+        self.assertEqual((data['days'][1]['cancellations'], data['days'][1]['occupancy']), (1, 0.0))
+        self.assertEqual(data['restaurants'][0]['occupancy'], 37.5)
+
+        response = self.client.get('/api/restaurant-dashboard/reservations/', {'page_size': 2})
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIsNotNone(response.json()['next'])
+        self.assertEqual(self.client.get('/api/restaurant-dashboard/summary/', {'start': 'soon'}).status_code, 400)
+
+    def test_streaming_export(self):
+        response = self.client.get('/api/restaurant-dashboard/reservations/export/', {
+            'output': 'ndjson', 'start': '2030-05-02', 'end': '2030-05-02',
+        })
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([(row['reservation_id'], row['status'], row['reservation_time']) for row in rows],
+                         [(self.cancelled.id, 'cancelled', '20:00:00')])
+
+
+class IdempotentReservationTests(TestCase):
+
+    def test_retried_reservation_is_replayed(self):
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email='diner@example.com'))
+        restaurant = RestaurantDataModel.objects.create(
+            name='Fort Cafe', city='Kochi', area='Fort', badge='Cafe', cuisine_type='Kerala',
+            average_cost_for_two=800, description='-', image='restaurants/r.jpg',
+        )
+        payload = {'restaurant': restaurant.id, 'reservation_date': '2030-05-01',
+                   'reservation_time': '19:00', 'number_of_guests': 2}
+        first = client.post('/api/reservations/', payload, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        retry = client.post('/api/reservations/', payload, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(retry.json()['id'], first.json()['id'])
+        self.assertEqual(TableReservation.objects.count(), 1)
+
+
+class TableCapacityTests(TestCase):
+
+    def setUp(self):
+        self.restaurant = RestaurantDataModel.objects.create(
+            name='Fort Cafe', city='Kochi', area='Fort', badge='Cafe', cuisine_type='Kerala',
+            average_cost_for_two=800, description='-', image='restaurants/r.jpg', total_tables=1,
+        )
+        self.first = APIClient()
+        self.first.force_authenticate(User.objects.create_user(email='first@example.com'))
+        self.second = APIClient()
+        self.second.force_authenticate(User.objects.create_user(email='second@example.com'))
+        self.reservation = {'restaurant': self.restaurant.id, 'reservation_date': '2030-05-01',
+                            'reservation_time': '19:00', 'number_of_guests': 4}
+
+    def _check(self, **params):
+        return APIClient().get('/api/reservations/check_availability/', {
+            'restaurant_id': self.restaurant.id, 'date': '2030-05-01', 'time': '19:00', **params,
+        })
+
+    def test_check_availability(self):
+        self.assertEqual(self._check().json(), {"available": True, "tables_left": 1, "message": "Tables available"})
+        self.assertEqual(self._check(number_of_guests=5).json()['available'], False)
+        for junk in ['abc', '0', '-2']:
+            with self.subTest(number_of_guests=junk):
+                self.assertEqual(self._check(number_of_guests=junk).status_code, 400)
+
+        self.first.post('/api/reservations/', self.reservation, format='json')
+        self.assertEqual(self._check().json()['tables_left'], 0)
+        # The seating still overlaps an hour later, but not once it has ended
+        self.assertEqual(self._check(time='20:00').json()['available'], False)
+        self.assertEqual(self._check(time='22:00').json()['available'], True)
+
+    def test_full_slots_reject_or_waitlist_and_cancellations_promote(self):
+        first = self.first.post('/api/reservations/', self.reservation, format='json').json()
+        self.assertEqual(first['status'], 'confirmed')
+
+        with self.assertLogs('restaurants.views', 'INFO') as captured:
+            self.assertEqual(self.second.post('/api/reservations/', self.reservation, format='json').status_code, 400)
+            waiting = self.second.post('/api/reservations/', {**self.reservation, 'join_waitlist': True},
+                                       format='json')
+        self.assertEqual((waiting.status_code, waiting.json()['status']), (201, 'waitlisted'))
+        self.assertEqual([record.msg for record in captured.records], ['reservation.rejected', 'reservation.waitlisted'])
+        self.assertEqual((captured.records[0].data['available'], captured.records[0].data['requested']), (0, 1))
 
-# Create your tests here.
+        # Cancelling the confirmed table hands it to the oldest waitlisted reservation
+        response = self.first.patch(f"/api/reservations/{first['id']}/", {'status': 'cancelled'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TableReservation.objects.get(id=waiting.json()['id']).status, 'confirmed')
+        self.assertEqual(self._check().json()['tables_left'], 0)
@@ -4,7 +4,11 @@ from .views import (
     RestaurantDetailView,
     TableReservationListCreateView,
     UserReservationsView,
-    RestaurantReservationDetailView
+    RestaurantReservationDetailView,
+    TableAvailabilityView,
+    RestaurantDashboardSummaryView,
+    RestaurantDashboardReservationsView,
+    RestaurantReservationExportView,
 )
 
 urlpatterns = [
@@ -14,6 +18,14 @@ urlpatterns = [
     
     # Reservation endpoints
     path('reservations/', TableReservationListCreateView.as_view(), name='reservation-list-create'),
+    path('reservations/check_availability/', TableAvailabilityView.as_view(), name='reservation-check-availability'),
     path('reservations/<int:pk>/', RestaurantReservationDetailView.as_view(), name='reservation-detail'),
     path('my-reservations/', UserReservationsView.as_view(), name='user-reservations'),
+
+    # Owner dashboard
+    path('restaurant-dashboard/summary/', RestaurantDashboardSummaryView.as_view(), name='restaurant-dashboard-summary'),
+    path('restaurant-dashboard/reservations/', RestaurantDashboardReservationsView.as_view(),
+         name='restaurant-dashboard-reservations'),
+    path('restaurant-dashboard/reservations/export/', RestaurantReservationExportView.as_view(),
+         name='restaurant-dashboard-reservations-export'),
 ]
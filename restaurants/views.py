@@ -1,25 +1,49 @@
+import logging
+
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.utils.dateparse import parse_date, parse_time
+from core import dashboard, exports, logs
+from core.cache import CatalogueCacheMixin
+from core.filters import int_param
+from core.idempotency import IdempotentCreateMixin
+from core.mixins import EagerLoadingMixin
+from core.pagination import KeysetPagination
+from core.routers import ReplicaReadsMixin
+from users.authentication import StatelessJWTAuthentication, full_user
+from . import capacity
+from . import dashboard as restaurant_dashboard
+from .filters import RestaurantFilterBackend
 from .models import RestaurantDataModel, TableReservation
 from .serializers import RestaurantSerializer, TableReservationSerializer
 
+logger = logging.getLogger(__name__)
+
 
-class RestaurantListCreateView(generics.ListCreateAPIView):
+class RestaurantListCreateView(CatalogueCacheMixin, ReplicaReadsMixin, EagerLoadingMixin, generics.ListCreateAPIView):
     """
     GET: List all restaurants
     POST: Create a new restaurant (business owners only)
     """
     queryset = RestaurantDataModel.objects.all()
     serializer_class = RestaurantSerializer
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]  # Authenticated users can create, anyone can view
+    keyset_ordering = ('-created_at', '-id')
+    cache_models = (RestaurantDataModel,)
+    # ?city=&area=&badge=&cuisine_type=&price_range=&min_rating=&max_cost_for_two= and ?ordering=-rating
+    filter_backends = [RestaurantFilterBackend, OrderingFilter]
+    ordering_fields = ['created_at', 'rating', 'average_cost_for_two', 'name']
 
     def perform_create(self, serializer):
         # Automatically set the owner to the logged-in user
-        serializer.save(owner=self.request.user)
+        serializer.save(owner=full_user(self.request.user))
 
 
-class RestaurantDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RestaurantDetailView(CatalogueCacheMixin, EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     GET: Retrieve a specific restaurant
     PUT/PATCH: Update restaurant details (owner only)
@@ -27,7 +51,9 @@ class RestaurantDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     queryset = RestaurantDataModel.objects.all()
     serializer_class = RestaurantSerializer
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [permissions.AllowAny]  # Anyone can view
+    cache_models = (RestaurantDataModel,)
 
     def get_permissions(self):
         # Only owner can update/delete
@@ -36,32 +62,56 @@ class RestaurantDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.AllowAny()]
 
 
-class TableReservationListCreateView(generics.ListCreateAPIView):
+class TableReservationListCreateView(IdempotentCreateMixin, EagerLoadingMixin, generics.ListCreateAPIView):
     """
     GET: List all reservations (admin only)
-    POST: Create a new reservation (authenticated users)
+    POST: Create a new reservation (authenticated users); retries sending the
+    same Idempotency-Key get the first response back (core.idempotency)
     """
     queryset = TableReservation.objects.all()
     serializer_class = TableReservationSerializer
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
 
     def perform_create(self, serializer):
         # Automatically set the user to the logged-in user
-        serializer.save(user=self.request.user)
+        join_waitlist = serializer.validated_data.pop('join_waitlist', False)
+        try:
+            reservation = serializer.save(user=full_user(self.request.user))
+        except capacity.TablesUnavailable as exc:
+            if not join_waitlist:
+                logs.event(
+                    logger, 'reservation.rejected', user_id=self.request.user.id,
+                    restaurant_id=serializer.validated_data['restaurant'].id,
+                    available=exc.available, requested=exc.requested,
+                )
+                raise ValidationError(str(exc))
+            # Waitlisted reservations hold no tables; they are confirmed when a slot frees up
+            reservation = serializer.save(user=full_user(self.request.user), status='waitlisted')
+        logs.event(
+            logger, f'reservation.{reservation.status}', reservation_id=reservation.id,
+            user_id=reservation.user_id, restaurant_id=reservation.restaurant_id,
+            date=reservation.reservation_date, time=reservation.reservation_time,
+            tables=reservation.tables_reserved,
+        )
 
 
-class UserReservationsView(generics.ListAPIView):
+class UserReservationsView(EagerLoadingMixin, generics.ListAPIView):
     """
     GET: List all reservations for the logged-in user
     """
+    queryset = TableReservation.objects.all()
     serializer_class = TableReservationSerializer
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
-        return TableReservation.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user_id=self.request.user.id)
 
 
-class RestaurantReservationDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RestaurantReservationDetailView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     GET: Retrieve a specific reservation
     PUT/PATCH: Update reservation (user who made it only)
@@ -69,8 +119,156 @@ class RestaurantReservationDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     queryset = TableReservation.objects.all()
     serializer_class = TableReservationSerializer
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         # Users can only access their own reservations
-        return TableReservation.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user_id=self.request.user.id)
+
+    def perform_update(self, serializer):
+        serializer.validated_data.pop('join_waitlist', None)
+        try:
+            reservation = serializer.save()
+        except capacity.TablesUnavailable as exc:
+            logs.event(
+                logger, 'reservation.rejected', reservation_id=serializer.instance.id,
+                available=exc.available, requested=exc.requested,
+            )
+            raise ValidationError(str(exc))
+        logs.event(logger, 'reservation.updated', reservation_id=reservation.id, status=reservation.status)
+
+
+class TableAvailabilityView(APIView):
+    """
+    GET: Check whether a restaurant has tables free for a date, time and party size
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        restaurant_id = request.query_params.get('restaurant_id')
+        reservation_date = request.query_params.get('date')
+        reservation_time = request.query_params.get('time')
+
+        if not all([restaurant_id, reservation_date, reservation_time]):
+            return Response({"error": "Missing parameters"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            reservation_date = parse_date(reservation_date)
+            reservation_time = parse_time(reservation_time)
+        except ValueError:
+            reservation_date = reservation_time = None
+        if not reservation_date or not reservation_time:
+            return Response({"error": "Invalid date or time"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            restaurant = RestaurantDataModel.objects.get(id=restaurant_id)
+        except RestaurantDataModel.DoesNotExist:
+            return Response({"error": "Restaurant not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        # Same rule as TableReservation.save(): 4 guests per table
+        number_of_guests = int_param(request.query_params, 'number_of_guests', default=2, minimum=1)
+        import math
+        tables_needed = math.ceil(number_of_guests / 4)
+
+        tables_left = capacity.tables_available(restaurant, reservation_date, reservation_time)
+        if tables_needed > tables_left:
+            return Response({"available": False, "tables_left": tables_left, "message": "No tables available"})
+
+        return Response({"available": True, "tables_left": tables_left, "message": "Tables available"})
+
+
+def owned_restaurants(request, all_for_admins=False):
+    """
+    The requesting owner's restaurants (or every restaurant, for admins if
+    asked), narrowed by ?restaurant=<id> (repeatable).
+    """
+    restaurants = RestaurantDataModel.objects.all()
+    if not (all_for_admins and request.user.is_superuser):
+        restaurants = restaurants.filter(owner_id=request.user.id)
+    restaurant_ids = request.query_params.getlist('restaurant')
+    if restaurant_ids:
+        try:
+            restaurants = restaurants.filter(id__in=[int(restaurant_id) for restaurant_id in restaurant_ids])
+        except ValueError:
+            raise ValidationError({"restaurant": "Restaurant ids must be integers."})
+    return restaurants
+
+
+class RestaurantDashboardSummaryView(APIView):
+    """
+    GET: Reservations, cancellations, waitlist, guests, tables and occupancy %
+    for the owner's restaurants, per restaurant and per day, from the daily
+    stats table (restaurants.dashboard). ?start=&end= default to the last 30 days.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        start, end = dashboard.date_window(request.query_params)
+        return Response(restaurant_dashboard.summary(owned_restaurants(request), start, end))
+
+
+class RestaurantDashboardReservationsView(APIView):
+    """
+    GET: The raw reservations behind the summary, newest first, one keyset
+    page at a time. ?start=&end= limit them to reservation dates in that window.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-created_at', '-id')
+
+    def get(self, request):
+        reservations = TableReservation.objects.filter(
+            restaurant__in=owned_restaurants(request)
+        ).select_related('user', 'restaurant')
+        if request.query_params.get('start') or request.query_params.get('end'):
+            start, end = dashboard.date_window(request.query_params)
+            reservations = reservations.filter(reservation_date__gte=start, reservation_date__lte=end)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(reservations, request, view=self)
+        return paginator.get_paginated_response([
+            {
+                "reservation_id": reservation.id,
+                "customer_name": reservation.user.username,
+                "customer_email": reservation.user.email,
+                "restaurant_name": reservation.restaurant.name,
+                "reservation_date": reservation.reservation_date,
+                "reservation_time": reservation.reservation_time,
+                "number_of_guests": reservation.number_of_guests,
+                "status": reservation.status,
+                "booked_at": reservation.created_at,
+            }
+            for reservation in page
+        ])
+
+
+class RestaurantReservationExportView(APIView):
+    """
+    GET: Stream every reservation for the owner's restaurants (all restaurants
+    for admins), oldest first, as ?output=csv|ndjson. ?start=&end= filter on
+    the reservation date.
+    """
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    columns = {
+        'reservation_id': 'id',
+        'restaurant_id': 'restaurant_id',
+        'restaurant_name': 'restaurant__name',
+        'customer_name': 'user__username',
+        'customer_email': 'user__email',
+        'reservation_date': 'reservation_date',
+        'reservation_time': 'reservation_time',
+        'status': 'status',
+        'number_of_guests': 'number_of_guests',
+        'tables_reserved': 'tables_reserved',
+        'booked_at': 'created_at',
+    }
+
+    def get(self, request):
+        output = exports.output_format(request.query_params)
+        reservations = TableReservation.objects.filter(restaurant__in=owned_restaurants(request, all_for_admins=True))
+        reservations = exports.filter_dates(reservations, 'reservation_date', request.query_params).order_by('id')
+        logs.event(logger, 'reservations.exported', user_id=request.user.id, output=output)
+        return exports.stream(request, reservations, self.columns, output, 'reservations')
@@ -1,4 +1,16 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
 from django.contrib.auth.backends import BaseBackend
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from core import logs
 from users.models import User
 import logging
 
@@ -6,39 +18,142 @@ logger = logging.getLogger(__name__)
 
 class EmailBackend(BaseBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
-        print(f"=== AUTHENTICATION ATTEMPT ===")
-        print(f"username parameter: {username}")
-        print(f"password parameter: {'[PROVIDED]' if password else '[MISSING]'}")
-        print(f"kwargs: {kwargs}")
-        
         email = kwargs.get('email') or username
-        print(f"Extracted email: {email}")
-        
+
         if not email or not password:
-            print("FAILED: Missing email or password")
+            logs.event(logger, 'auth.login.failed', logging.WARNING, reason='missing_credentials')
             return None
             
         try:
             user = User.objects.get(email=email)
-            print(f"User found: {user.email}, ID: {user.id}")
-            
-            password_valid = user.check_password(password)
-            print(f"Password check result: {password_valid}")
-            
-            if password_valid:
-                print("SUCCESS: Authentication passed")
-                return user
-            else:
-                print("FAILED: Password check failed")
-                
         except User.DoesNotExist:
-            print(f"FAILED: No user found with email: {email}")
+            logs.event(logger, 'auth.login.failed', logging.WARNING, reason='unknown_email', email=email)
             return None
-            
+
+        if user.check_password(password):
+            logs.event(logger, 'auth.login.succeeded', user_id=user.id)
+            return user
+
+        logs.event(logger, 'auth.login.failed', logging.WARNING, reason='bad_password', user_id=user.id)
         return None
 
     def get_user(self, user_id):
-        try:
-            return User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            return None
\ No newline at end of file
+        return cached_user(user_id)
+
+
+class UserCache:
+    """
+    Small in-process LRU of User rows with a short TTL.
+
+    Saves and deletes of a user evict it in this process (users.signals);
+    other processes see the change once their entry expires.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        # Sessions and tokens carry the id as a string
+        user_id = User._meta.pk.to_python(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                # Callers get their own copy, so one request can't modify another's user
+                return copy.copy(entry[1])
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        with self._lock:
+            self._entries[user_id] = (now + getattr(settings, 'USER_CACHE_TTL', 30), user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > getattr(settings, 'USER_CACHE_SIZE', 1024):
+                self._entries.popitem(last=False)
+        return copy.copy(user)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def cached_user(user_id):
+    """The User with ``user_id`` (None if gone), served from ``user_cache`` when fresh."""
+    return user_cache.get(user_id)
+
+
+class ClaimsUser(TokenUser):
+    """
+    ``request.user`` built from the claims of a ClaimsRefreshToken (users.tokens).
+
+    Enough for permission checks and ``user_id`` filters without a query.
+    Code that needs the model instance (to save it as a foreign key, say)
+    calls ``full_user()``.
+    """
+
+    @cached_property
+    def id(self):
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    def _claim(self, name):
+        if name in self.token:
+            return self.token[name]
+        # Tokens issued before the claim existed
+        return getattr(self.instance, name)
+
+    @cached_property
+    def email(self):
+        return self._claim('email')
+
+    @cached_property
+    def role(self):
+        return self._claim('role')
+
+    @cached_property
+    def is_staff(self):
+        return self._claim('is_staff')
+
+    @cached_property
+    def is_superuser(self):
+        return self._claim('is_superuser')
+
+    @cached_property
+    def instance(self):
+        user = cached_user(self.id)
+        if user is None:
+            # Deleted since the token was issued; the token no longer stands for anyone
+            raise AuthenticationFailed("User not found", code='user_not_found')
+        return user
+
+
+def full_user(user):
+    """
+    The User model instance behind ``request.user``, whatever authenticated it.
+
+    Raises AuthenticationFailed (a 401) if the token's user has been deleted.
+    """
+    return user.instance if isinstance(user, ClaimsUser) else user
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that trusts the token's claims instead of loading the
+    user row on every request.
+
+    Opt in per view with ``authentication_classes``. Role or staff changes,
+    and deactivations, take effect when the user's access token is next
+    issued, which is at most ACCESS_TOKEN_LIFETIME later.
+    """
+
+    def get_user(self, validated_token):
+        # The parent rejects tokens without a user id claim
+        super().get_user(validated_token)
+        return ClaimsUser(validated_token)
\ No newline at end of file
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users import otp
+
+
+class Command(BaseCommand):
+    help = "Delete expired password-reset OTPs (run periodically, e.g. from cron)."
+
+    def handle(self, *args, **options):
+        deleted = otp.purge()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired OTPs."))
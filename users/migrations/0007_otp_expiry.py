@@ -0,0 +1,37 @@
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def set_expiry(apps, schema_editor):
+    PasswordResetOTP = apps.get_model('users', 'PasswordResetOTP')
+    ttl = datetime.timedelta(seconds=getattr(settings, 'OTP_TTL_SECONDS', 600))
+    for otp in PasswordResetOTP.objects.filter(expires_at__isnull=True).only('created_at'):
+        otp.expires_at = otp.created_at + ttl
+        otp.save(update_fields=['expires_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_remove_user_is_verified_remove_user_otp_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordresetotp',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.RunPython(set_expiry, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='passwordresetotp',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresetotp',
+            index=models.Index(fields=['user', 'expires_at'], name='otp_user_expires_idx'),
+        ),
+    ]
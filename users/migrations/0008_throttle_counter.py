@@ -0,0 +1,26 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_otp_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100)),
+                ('window', models.BigIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['window'], name='throttle_window_idx')],
+                'constraints': [models.UniqueConstraint(fields=('key', 'window'), name='unique_throttle_key_window')],
+            },
+        ),
+    ]
@@ -59,10 +59,42 @@ class PasswordResetOTP(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     otp = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set on first save; `purge_otps` deletes rows past it
+    expires_at = models.DateTimeField(db_index=True)
     is_verified = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # users.otp verifies a code against the user's unexpired rows; this table is the only store
+            models.Index(fields=['user', 'expires_at'], name='otp_user_expires_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.expires_at is None:
+            self.expires_at = timezone.now() + datetime.timedelta(seconds=otp_ttl())
+        super().save(*args, **kwargs)
+
     def is_expired(self):
-        return timezone.now() > self.created_at + datetime.timedelta(minutes=10)
+        return timezone.now() > self.expires_at
 
     def __str__(self):
-        return f"{self.user} - {self.otp}"
\ No newline at end of file
+        return f"{self.user} - {self.otp}"
+
+
+def otp_ttl():
+    return getattr(settings, 'OTP_TTL_SECONDS', 600)
+
+
+class ThrottleCounter(models.Model):
+    """Hits per key and fixed window, for users.throttling.DatabaseCounterStore."""
+    key = models.CharField(max_length=100)
+    window = models.BigIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'window'], name='unique_throttle_key_window'),
+        ]
+        indexes = [
+            models.Index(fields=['window'], name='throttle_window_idx'),
+        ]
@@ -0,0 +1,56 @@
+"""
+Password-reset OTP store.
+
+Codes live in the PasswordResetOTP table only. Verifying a correct code is
+one conditional UPDATE on the indexed (user, expires_at) rows, which also
+marks it used, so a code can't be verified twice even by two concurrent
+requests. Only a failed attempt costs a second query, to tell an expired
+code from a wrong one. ``purge_otps`` deletes expired rows so the table
+stays bounded.
+
+Nothing is cached. A per-process cache would let one worker keep trusting
+a code (or its "verified" flag) after another worker replaced or cleared
+it, so the table is the one place verification state is read from.
+
+Issuing a new code for a user discards their previous ones, so each user
+holds at most one live code.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PasswordResetOTP
+
+VALID = 'valid'
+INVALID = 'invalid'
+EXPIRED = 'expired'
+
+
+def issue(user, code):
+    """Store ``code`` as ``user``'s only OTP and return the row."""
+    with transaction.atomic():
+        PasswordResetOTP.objects.filter(user=user).delete()
+        return PasswordResetOTP.objects.create(user=user, otp=code)
+
+
+def verify(user, code):
+    """Check ``code`` and mark it verified; returns VALID, INVALID or EXPIRED."""
+    now = timezone.now()
+    codes = PasswordResetOTP.objects.filter(user=user, otp=code, is_verified=False)
+    if codes.filter(expires_at__gt=now).update(is_verified=True):
+        return VALID
+    return EXPIRED if codes.exists() else INVALID
+
+
+def is_verified(user):
+    """Whether ``user`` verified a code that hasn't expired yet."""
+    return PasswordResetOTP.objects.filter(user=user, is_verified=True, expires_at__gt=timezone.now()).exists()
+
+
+def clear(user):
+    PasswordResetOTP.objects.filter(user=user).delete()
+
+
+def purge(now=None):
+    """Delete expired codes; returns how many rows went."""
+    deleted, _ = PasswordResetOTP.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
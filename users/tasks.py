@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.mail import send_mail
+from django.utils import timezone
+
+from .models import PasswordResetOTP, otp_ttl
+
+# Background jobs for the users app; queued with core.jobs.enqueue. Payloads
+# are stored in the Job table and shown in the admin, so they carry ids
+# rather than secrets.
+
+
+def _validity(seconds):
+    """``seconds`` as shown in the email: "10 minutes", or "90 seconds" when not whole minutes."""
+    minutes, rest = divmod(seconds, 60)
+    if rest or not minutes:
+        return f"{seconds} seconds"
+    return "1 minute" if minutes == 1 else f"{minutes} minutes"
+
+
+def send_otp_email(user_id):
+    # The code is read when the email goes out, so the payload never holds it
+    otp = (
+        PasswordResetOTP.objects.filter(user_id=user_id, is_verified=False, expires_at__gt=timezone.now())
+        .select_related('user')
+        .first()
+    )
+    if otp is None:
+        # Used, expired or cleared before the worker got to it
+        return
+    send_mail(
+        subject="Password Reset OTP",
+        message=f"Your OTP is {otp.otp}. It is valid for {_validity(otp_ttl())}.",
+        from_email=settings.EMAIL_HOST_USER,
+        recipient_list=[otp.user.email],  # Send to the user's email
+        fail_silently=False,
+    )
@@ -1,3 +1,318 @@
-from django.test import TestCase
+import json
+import logging
+from contextlib import redirect_stdout
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import jobs, logs
+from core.models import DeadJob, Job
+from hotels.models import Booking, HotelDataModel
+from users import otp
+from users.authentication import user_cache
+from users.models import PasswordResetOTP, ThrottleCounter, User
+from users.throttling import EmailRateThrottle
+from users.tokens import ClaimsRefreshToken
+from users.views import LoginView
+
+
+def always_fails(**kwargs):
+    raise RuntimeError("smtp down")
+
+
+class OTPEmailJobTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='guest@example.com')
+
+    def test_send_otp_queues_the_email(self):
+        response = self.client.post('/forgot-password/send-otp/', {'email': 'guest@example.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'users.tasks.send_otp_email')
+        # The code itself never reaches the queue (or DeadJob, or the admin)
+        self.assertEqual(job.payload, {'user_id': self.user.id})
+
+        self.assertEqual(jobs.run_pending(), 1)
+        otp = PasswordResetOTP.objects.get(user=self.user).otp
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['guest@example.com'])
+        self.assertIn(otp, mail.outbox[0].body)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(OTP_TTL_SECONDS=300)
+    def test_email_states_the_configured_lifetime(self):
+        otp.issue(self.user, '111111')
+        jobs.enqueue('users.tasks.send_otp_email', user_id=self.user.id)
+        jobs.run_pending()
+        self.assertIn('valid for 5 minutes', mail.outbox[0].body)
+
+    def test_used_codes_are_not_emailed(self):
+        otp.issue(self.user, '111111')
+        jobs.enqueue('users.tasks.send_otp_email', user_id=self.user.id)
+        otp.verify(self.user, '111111')
+        jobs.run_pending()
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(JOBS_BACKOFF_SECONDS=60)
+    def test_failures_back_off_then_dead_letter(self):
+        jobs.enqueue('users.tests.always_fails', max_attempts=3, email='guest@example.com')
+
+        self.assertEqual(jobs.run_pending(), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=40))
+        self.assertIn('smtp down', job.last_error)
+        # Not due yet
+        self.assertEqual(jobs.run_pending(), 0)
+
+        with self.assertLogs('core.jobs', 'WARNING') as captured:
+            for _ in range(2):
+                Job.objects.update(run_at=timezone.now())
+                jobs.run_pending()
+        self.assertEqual([(record.msg, record.levelname) for record in captured.records],
+                         [('job.retry', 'WARNING'), ('job.dead', 'ERROR')])
+        self.assertFalse(Job.objects.exists())
+        dead = DeadJob.objects.get()
+        self.assertEqual((dead.task, dead.attempts), ('users.tests.always_fails', 3))
+        self.assertEqual(dead.payload, {'email': 'guest@example.com'})
+
+        jobs.requeue(DeadJob.objects.all())
+        self.assertEqual(Job.objects.get().attempts, 0)
+        self.assertFalse(DeadJob.objects.exists())
+
+    def test_stale_claims_are_retried(self):
+        job = jobs.enqueue('users.tasks.send_otp_email', user_id=self.user.id)
+        self.assertEqual(jobs.claim('dead-worker').id, job.id)
+        self.assertIsNone(jobs.claim('other-worker'))
+
+        later = timezone.now() + timedelta(hours=1)
+        reclaimed = jobs.claim('other-worker', now=later)
+        self.assertEqual((reclaimed.id, reclaimed.locked_by, reclaimed.attempts), (job.id, 'other-worker', 2))
+
+
+class OTPStoreTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='guest@example.com')
+
+    def _verify(self, code):
+        return self.client.post('/forgot-password/verify-otp/', {'email': 'guest@example.com', 'otp': code})
+
+    def test_reset_flow(self):
+        otp.issue(self.user, '111111')
+        self.assertEqual(self._verify('222222').json(), {'error': 'Invalid OTP'})
+        # User lookup and the conditional update that checks and marks the code
+        with self.assertNumQueries(2):
+            self.assertEqual(self._verify('111111').status_code, 200)
+        # A verified code can't be used twice
+        self.assertEqual(self._verify('111111').status_code, 400)
+
+        response = self.client.post('/forgot-password/reset-password/', {
+            'email': 'guest@example.com', 'password': 'new-secret', 'confirm_password': 'new-secret',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(PasswordResetOTP.objects.exists())
+
+        # The reset consumed the verification; the email alone can't replay it
+        response = self.client.post('/forgot-password/reset-password/', {
+            'email': 'guest@example.com', 'password': 'another-secret', 'confirm_password': 'another-secret',
+        })
+        self.assertEqual(response.json(), {'error': 'OTP not verified'})
+
+    def test_new_code_replaces_old(self):
+        otp.issue(self.user, '111111')
+        otp.issue(self.user, '222222')
+        self.assertEqual(PasswordResetOTP.objects.filter(user=self.user).count(), 1)
+
+        self.assertEqual(otp.verify(self.user, '111111'), otp.INVALID)
+        self.assertFalse(otp.is_verified(self.user))
+        self.assertEqual(otp.verify(self.user, '222222'), otp.VALID)
+        self.assertTrue(otp.is_verified(self.user))
+
+    def test_verification_is_read_from_the_table(self):
+        # Another worker clearing or replacing the code is seen at once
+        otp.issue(self.user, '111111')
+        otp.verify(self.user, '111111')
+        PasswordResetOTP.objects.filter(user=self.user).delete()
+        self.assertFalse(otp.is_verified(self.user))
+
+        PasswordResetOTP.objects.create(user=self.user, otp='333333')
+        self.assertEqual(otp.verify(self.user, '333333'), otp.VALID)
+
+    def test_expired_codes_are_rejected_and_purged(self):
+        otp.issue(self.user, '111111')
+        PasswordResetOTP.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self._verify('111111').json(), {'error': 'OTP expired'})
+
+        call_command('purge_otps', stdout=StringIO())
+        self.assertFalse(PasswordResetOTP.objects.exists())
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(email='guest@example.com', role='Hotel')
+        self.hotel = HotelDataModel.objects.create(
+            name='Taj', city='Kochi', area='Fort', description='-', total_rooms=5,
+        )
+        self.client = APIClient()
+
+    def _authorize(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+
+    def test_requests_are_authenticated_from_claims(self):
+        self._authorize(ClaimsRefreshToken.for_user(self.user))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/bookings/')
+        self.assertEqual(response.status_code, 200)
+        # Bookings join their hotel's owner, but the requesting user is never loaded
+        self.assertFalse([q for q in queries if 'FROM "users_user"' in q['sql']])
+
+        response = self.client.post('/api/bookings/', {
+            'hotel': self.hotel.id, 'check_in': '2030-01-01', 'check_out': '2030-01-02', 'number_of_guests': 2,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Booking.objects.get().user, self.user)
+
+    def test_tokens_without_claims_fall_back_to_the_user_row(self):
+        self._authorize(RefreshToken.for_user(self.user))
+        response = self.client.get('/api/hotel-dashboard/bookings/')
+        self.assertEqual(response.status_code, 200)
+        request_user = response.wsgi_request.user
+        self.assertEqual((request_user.id, request_user.role), (self.user.id, 'Hotel'))
+
+    def test_tokens_of_deleted_users_are_rejected_when_the_user_is_needed(self):
+        self._authorize(ClaimsRefreshToken.for_user(self.user))
+        self.assertEqual(self.client.get('/api/bookings/').status_code, 200)
+        self.user.delete()
+        response = self.client.post('/api/bookings/', {
+            'hotel': self.hotel.id, 'check_in': '2030-01-01', 'check_out': '2030-01-02', 'number_of_guests': 2,
+        })
+        self.assertEqual((response.status_code, response.json()), (401, {'detail': 'User not found'}))
+        self.assertFalse(Booking.objects.exists())
+
+    def test_user_cache_is_bounded_and_evicted_on_save(self):
+        with override_settings(USER_CACHE_SIZE=1):
+            other = User.objects.create_user(email='other@example.com')
+            self.assertEqual(user_cache.get(self.user.pk).email, 'guest@example.com')
+            with self.assertNumQueries(0):
+                user_cache.get(str(self.user.pk))
+            user_cache.get(other.pk)
+            with self.assertNumQueries(1):
+                user_cache.get(self.user.pk)
+
+        self.user.email = 'renamed@example.com'
+        self.user.save()
+        self.assertEqual(user_cache.get(self.user.pk).email, 'renamed@example.com')
+
+
+@override_settings(REST_FRAMEWORK={
+    'DEFAULT_THROTTLE_RATES': {'login_ip': '5/min', 'login_email': '3/min'},
+})
+class AuthThrottleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def _login(self, email, **extra):
+        return self.client.post('/login/', {'email': email, 'password': 'wrong'}, **extra)
+
+    def test_login_is_limited_per_email_before_any_lookup(self):
+        for _ in range(3):
+            self.assertEqual(self._login('guest@example.com').status_code, 400)
+        with self.assertNumQueries(0):
+            response = self._login('GUEST@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # Other accounts from the same address still get through
+        self.assertEqual(self._login('other@example.com').status_code, 400)
+
+    def test_login_is_limited_per_ip(self):
+        for index in range(5):
+            self.assertEqual(self._login(f'user{index}@example.com').status_code, 400)
+        self.assertEqual(self._login('user9@example.com').status_code, 429)
+        self.assertEqual(self._login('user9@example.com', REMOTE_ADDR='10.0.0.2').status_code, 400)
+
+    @override_settings(THROTTLE_STORE='users.throttling.DatabaseCounterStore')
+    def test_database_store_slides_over_window_boundaries(self):
+        throttle = EmailRateThrottle()
+        view = LoginView()
+        now = [6000.0]
+        throttle.timer = lambda: now[0]
+
+        class FakeRequest:
+            data = {'email': 'guest@example.com'}
+
+        for _ in range(3):
+            self.assertTrue(throttle.allow_request(FakeRequest, view))
+        self.assertFalse(throttle.allow_request(FakeRequest, view))
+        # 30s into the next window half of the previous one still counts: 4 * 0.5 + 1 = 3
+        now[0] = 6090.0
+        self.assertTrue(throttle.allow_request(FakeRequest, view))
+        self.assertFalse(throttle.allow_request(FakeRequest, view))
+        # Two windows on, the old counts are gone
+        now[0] = 6200.0
+        self.assertTrue(throttle.allow_request(FakeRequest, view))
+        self.assertEqual(ThrottleCounter.objects.count(), 1)
+
+
+class StructuredLoggingTests(TestCase):
+
+    def test_login_logs_structured_events_without_printing(self):
+        User.objects.create_user(email='guest@example.com')
+        stdout = StringIO()
+        with redirect_stdout(stdout), self.assertLogs('users.authentication', 'INFO') as captured:
+            APIClient().post('/login/', {'email': 'guest@example.com', 'password': 'wrong'})
+        self.assertEqual(stdout.getvalue(), '')
+
+        record = captured.records[0]
+        self.assertEqual((record.msg, record.data['reason']), ('auth.login.failed', 'bad_password'))
+        self.assertNotIn('password', json.loads(logs.JSONFormatter().format(record)))
+
+    def test_formatter_redacts_secrets_and_masks_emails(self):
+        logger = logging.getLogger('users.tests')
+        record = logger.makeRecord(
+            logger.name, logging.INFO, __file__, 0, 'otp.issued', None, None,
+            extra={'data': {'otp': '123456', 'email': 'guest@example.com', 'nested': {'Token': 'abc'}}},
+        )
+        entry = json.loads(logs.JSONFormatter().format(record))
+        self.assertEqual(entry['event'], 'otp.issued')
+        self.assertEqual(entry['otp'], logs.REDACTED)
+        self.assertEqual(entry['email'], 'g***@example.com')
+        self.assertEqual(entry['nested'], {'Token': logs.REDACTED})
+
+    def test_queueing_handler_samples_and_writes_in_background(self):
+        stream = StringIO()
+        target = logging.StreamHandler(stream)
+        handler = logs.QueueingHandler(target=target)
+        handler.setFormatter(logs.JSONFormatter())
+        handler.addFilter(logs.SamplingFilter({'noisy': 0.0}))
+        logger = logging.getLogger('users.tests.queueing')
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            logs.event(logger, 'noisy', value=1)
+            logs.event(logger, 'noisy', logging.WARNING, value=2)
+            logs.event(logger, 'quiet', value=3)
+        finally:
+            logger.removeHandler(handler)
+            handler.flush_and_stop()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([(line['event'], line['value']) for line in lines], [('noisy', 2), ('quiet', 3)])
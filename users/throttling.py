@@ -0,0 +1,151 @@
+"""
+Sliding-window rate limits for the auth endpoints.
+
+Each throttle counts hits per key (client IP or submitted email) in fixed
+windows of the rate's period. It estimates the rate over the last full
+period by weighting the previous window by how much of it still overlaps::
+
+    estimate = previous * (1 - elapsed / period) + current
+
+This smooths out the burst a plain fixed window allows at its boundary,
+while storing only two counters per key.
+
+Views opt in with ``throttle_classes`` and a ``throttle_scope``. Rates come
+from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] under ``<scope>_ip`` and
+``<scope>_email``; a missing rate disables that throttle. DRF runs
+throttles in ``initial()``, before the handler, so a rejected request costs
+two counter operations: no user lookup and no password hash.
+
+Counters live in the store named by THROTTLE_STORE. CacheCounterStore uses
+the cache alias THROTTLE_CACHE_ALIAS (local memory, file, Redis...).
+DatabaseCounterStore keeps them in the ThrottleCounter table, which works
+across processes without a shared cache.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .models import ThrottleCounter
+
+
+class CacheCounterStore:
+
+    def hit(self, key, window, ttl):
+        """Count a hit in ``window``; returns (hits in the previous window, hits in this one)."""
+        cache = caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+        current_key = f'{key}:{window}'
+        cache.add(current_key, 0, timeout=ttl)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(current_key, 1, timeout=ttl)
+            current = 1
+        return cache.get(f'{key}:{window - 1}', 0), current
+
+
+class DatabaseCounterStore:
+
+    def hit(self, key, window, ttl):
+        with transaction.atomic():
+            updated = ThrottleCounter.objects.filter(key=key, window=window).update(count=F('count') + 1)
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        ThrottleCounter.objects.create(key=key, window=window, count=1)
+                except IntegrityError:
+                    # Another request created the row first
+                    ThrottleCounter.objects.filter(key=key, window=window).update(count=F('count') + 1)
+                else:
+                    # A new window started: drop windows nobody can still read. Keys of one
+                    # scope and kind share a period, so their window numbers are comparable.
+                    group = key.rsplit(':', 1)[0] + ':'
+                    ThrottleCounter.objects.filter(window__lt=window - 1, key__startswith=group).delete()
+            counts = dict(
+                ThrottleCounter.objects.filter(key=key, window__in=[window - 1, window])
+                .values_list('window', 'count')
+            )
+        return counts.get(window - 1, 0), counts.get(window, 0)
+
+
+_stores = {}
+
+
+def get_store():
+    path = getattr(settings, 'THROTTLE_STORE', 'users.throttling.CacheCounterStore')
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Base class; subclasses name the key ``kind`` and how to read it from the request."""
+    kind = None
+    timer = time.time
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return None
+        return api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}_{self.kind}')
+
+    def allow_request(self, request, view):
+        rate = self.get_rate(view)
+        if rate is None:
+            return True
+        key = self.get_key(request)
+        if not key:
+            return True
+
+        num_requests, period = self.parse_rate(rate)
+        now = self.timer()
+        window = int(now // period)
+        elapsed = now - window * period
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        previous, current = get_store().hit(
+            f'throttle:{view.throttle_scope}:{self.kind}:{digest}', window, ttl=2 * period,
+        )
+
+        estimate = previous * (1 - elapsed / period) + current
+        if estimate <= num_requests:
+            return True
+        self.retry_after = period - elapsed
+        return False
+
+    def wait(self):
+        return getattr(self, 'retry_after', None)
+
+    @staticmethod
+    def parse_rate(rate):
+        num, period = rate.split('/')
+        return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+class IPRateThrottle(SlidingWindowThrottle):
+    kind = 'ip'
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailRateThrottle(SlidingWindowThrottle):
+    kind = 'email'
+
+    def get_key(self, request):
+        try:
+            email = request.data.get('email')
+        except AttributeError:
+            return None
+        if not isinstance(email, str):
+            return None
+        return email.strip().lower() or None
@@ -0,0 +1,14 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Copied into the access token, where users.authentication.ClaimsUser reads them
+USER_CLAIMS = ('email', 'role', 'is_staff', 'is_superuser')
+
+
+class ClaimsRefreshToken(RefreshToken):
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
@@ -3,12 +3,15 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.conf import settings  # ← Add this import
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.db import transaction
+import logging
 import random
 
-from .models import PasswordResetOTP
+from core import jobs, logs
+
+from . import otp as otp_store
+from .throttling import EmailRateThrottle, IPRateThrottle
+from .tokens import ClaimsRefreshToken
 from .serializers import (
     SendOTPSerializer,
     VerifyOTPSerializer,
@@ -19,16 +22,20 @@ from .serializers import (
 )
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 class RegisterViewset(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, EmailRateThrottle]
+    throttle_scope = 'register'
 
     def create(self, request):
         serializer = RegisterSerializer(data=request.data)
 
         if serializer.is_valid():
             user_obj = serializer.save()
-            refresh = RefreshToken.for_user(user_obj)
+            logs.event(logger, 'user.registered', user_id=user_obj.id, role=user_obj.role)
+            refresh = ClaimsRefreshToken.for_user(user_obj)
             return Response(
                 {
                     "message": "User registered successfully",
@@ -46,6 +53,8 @@ class RegisterViewset(viewsets.ViewSet):
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [IPRateThrottle, EmailRateThrottle]
+    throttle_scope = 'login'
 
     def post(self, request):
         serializer = LoginSerializer(
@@ -55,7 +64,7 @@ class LoginView(APIView):
 
         if serializer.is_valid():
             user = serializer.validated_data["user"]
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
 
             return Response({
                 "message": "Login successful",
@@ -75,10 +84,10 @@ class LoginView(APIView):
 
 class SendOTPView(APIView):
     permission_classes = [AllowAny]  # ← Add this
+    throttle_classes = [IPRateThrottle, EmailRateThrottle]
+    throttle_scope = 'otp_send'
     
     def post(self, request):
-        print(f"📨 Received request data: {request.data}")  # Debug log
-        
         serializer = SendOTPSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
@@ -86,32 +95,19 @@ class SendOTPView(APIView):
         user = User.objects.get(email=email)
         otp = str(random.randint(100000, 999999))
 
-        # Save OTP to database
-        PasswordResetOTP.objects.create(user=user, otp=otp)
-        print(f"💾 OTP saved to database: {otp} for {email}")  # Debug log
-
-        # Send email
-        try:
-            send_mail(
-                subject="Password Reset OTP",
-                message=f"Your OTP is {otp}. It is valid for 10 minutes.",
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=[email],  # Send to the user's email
-                fail_silently=False,
-            )
-            print(f"✅ Email sent successfully to {email} with OTP: {otp}")  # Debug log
-            return Response({"message": "OTP sent successfully"}, status=status.HTTP_200_OK)
-        
-        except Exception as e:
-            print(f"❌ Email sending failed: {str(e)}")  # Debug log
-            return Response(
-                {"error": f"Failed to send email: {str(e)}"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        # Save OTP to database; the email is sent by a background worker
+        # (core.jobs) so the request doesn't wait on SMTP
+        with transaction.atomic():
+            otp_store.issue(user, otp)
+            jobs.enqueue('users.tasks.send_otp_email', user_id=user.id)
+        logs.event(logger, 'otp.issued', user_id=user.id)
+        return Response({"message": "OTP sent successfully"}, status=status.HTTP_200_OK)
 
 
 class VerifyOTPView(APIView):
     permission_classes = [AllowAny]  # ← Add this
+    throttle_classes = [IPRateThrottle, EmailRateThrottle]
+    throttle_scope = 'otp_verify'
     
     def post(self, request):
         serializer = VerifyOTPSerializer(data=request.data)
@@ -120,18 +116,12 @@ class VerifyOTPView(APIView):
         user = User.objects.get(email=serializer.validated_data["email"])
         otp = serializer.validated_data["otp"]
 
-        try:
-            otp_obj = PasswordResetOTP.objects.filter(
-                user=user, otp=otp, is_verified=False
-            ).latest("created_at")
-        except PasswordResetOTP.DoesNotExist:
-            return Response({"error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST)
-
-        if otp_obj.is_expired():
+        result = otp_store.verify(user, otp)
+        logs.event(logger, 'otp.verify', user_id=user.id, result=result)
+        if result == otp_store.EXPIRED:
             return Response({"error": "OTP expired"}, status=status.HTTP_400_BAD_REQUEST)
-
-        otp_obj.is_verified = True
-        otp_obj.save()
+        if result != otp_store.VALID:
+            return Response({"error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({"message": "OTP verified"}, status=status.HTTP_200_OK)
 
@@ -145,7 +135,7 @@ class ResetPasswordView(APIView):
 
         user = User.objects.get(email=serializer.validated_data["email"])
 
-        if not PasswordResetOTP.objects.filter(user=user, is_verified=True).exists():
+        if not otp_store.is_verified(user):
             return Response(
                 {"error": "OTP not verified"}, status=status.HTTP_400_BAD_REQUEST
             )
@@ -153,7 +143,8 @@ class ResetPasswordView(APIView):
         user.set_password(serializer.validated_data["password"])
         user.save()
 
-        PasswordResetOTP.objects.filter(user=user).delete()
+        otp_store.clear(user)
+        logs.event(logger, 'auth.password_reset', user_id=user.id)
 
         return Response(
             {"message": "Password reset successful"}, status=status.HTTP_200_OK
@@ -166,5 +157,6 @@ class UpdateRoleView(APIView):
         serializer = UserRoleUpdateSerializer(request.user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            logs.event(logger, 'user.role_updated', user_id=request.user.id, role=serializer.data['role'])
             return Response({"message": "Role updated successfully", "role": serializer.data['role']}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file